@@ -3,46 +3,31 @@
 # Genera todos los conjuntos y diccionarios necesarios para el modelo Gurobi
 # a partir de OpenStreetMap para Las Condes, Santiago, y del calendario 2025.
 
-import osmnx as ox
 import geopandas as gpd
 import pandas as pd
-import calendar
-from collections import defaultdict
+import os
+import sys
+
+# calendario compartido con entrega_3 (entrega_3/calendario.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "entrega_3"))
+from calendario import construir_calendario, agrupar, primero
+# extractos de OSM con cache en disco (OSM_OFFLINE=1 para no usar la red)
+from cache_osm import features
 
 def build_calendar(year=2025):
-    # 1) Calendario base
-    D = list(range(1, 366))                     # días 1…365
+    # 1) Calendario base: vectores dia -> mes / semana ISO / prohibido (calendario.py)
+    cal = construir_calendario(year, 365)
+    D = cal['dia'].tolist()                     # días 1…365
     Hn = list(range(22, 24)) + list(range(0, 10))# horas nocturnas
     B  = [1,2,3,4,5,6]                          # bloques diurnos
     W  = list(range(1, 53))                     # semanas ISO
     S  = list(range(1, 13))                     # meses 1…12
 
-    sigma_d = {}           # día → mes
-    sigma_w = {}           # semana → mes (primer día)
-    W_w     = defaultdict(list)  # semana → lista de días
-    Dproh   = []           # miércoles/domingos
-
-    cal = calendar.Calendar()
-    d_counter = 0
-    for m in S:
-        for week in cal.monthdatescalendar(year, m):
-            iso_w = week[0].isocalendar()[1]
-            if iso_w not in W: 
-                continue
-            for date in week:
-                if date.year == year and date.month == m:
-                    d_counter += 1
-                    d = d_counter
-                    sigma_d[d] = m
-                    W_w[iso_w].append(d)
-                    if date.weekday() in (2, 6):  # mié=2, dom=6
-                        Dproh.append(d)
-            if iso_w not in sigma_w and W_w[iso_w]:
-                sigma_w[iso_w] = m
-
-    assert d_counter == 365, "Error: calendario incompleto"
-    Dproh = sorted(set(Dproh))
-    return D, Dproh, Hn, B, W, S, sigma_d, sigma_w, dict(W_w)
+    sigma_d = dict(zip(D, cal['mes'].tolist()))             # día → mes
+    sigma_w = {w: m for w, m in primero(cal['semana'], cal['mes']).items() if w in W}  # semana → mes (primer día)
+    W_w     = {w: dias.tolist() for w, dias in agrupar(cal['semana']).items() if w in W}  # semana → lista de días
+    Dproh   = cal['dia'][cal['proh']].tolist()  # miércoles/domingos
+    return D, Dproh, Hn, B, W, S, sigma_d, sigma_w, W_w
 
 def build_ugas(place="Las Condes, Santiago Metropolitan Region, Chile"):
     # 2) Descarga y filtra vegetación real
@@ -51,7 +36,7 @@ def build_ugas(place="Las Condes, Santiago Metropolitan Region, Chile"):
         'landuse': ['grass','meadow','orchard'],
         'natural': ['grassland','wood']
     }
-    gdf_green = ox.geometries_from_place(place, tags_green)
+    gdf_green = features(place, tags_green)
     gdf_green = gdf_green[gdf_green.geometry.type.isin(['Polygon','MultiPolygon'])]
 
     # 3) Descarga y filtra polígonos a excluir (edificios, caminos, parkings…)
@@ -60,7 +45,7 @@ def build_ugas(place="Las Condes, Santiago Metropolitan Region, Chile"):
         'highway': ['pedestrian','footway','path'],
         'landuse': ['residential','industrial','parking']
     }
-    gdf_excl = ox.geometries_from_place(place, tags_excl)
+    gdf_excl = features(place, tags_excl)
     gdf_excl = gdf_excl[gdf_excl.geometry.type.isin(['Polygon','MultiPolygon'])]
 
     # 4) Resta geométrica para limpiar vegetación
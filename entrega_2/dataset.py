@@ -2,10 +2,14 @@
 # ---------------------------------------------------------------------------
 # 0) LIBRERÍAS
 # ---------------------------------------------------------------------------
-import calendar
+import os
+import sys
 from collections import defaultdict
 from typing import List, Dict, Tuple
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "entrega_3"))
+from calendario import construir_calendario, agrupar, primero
+
 # ----------------------------------------------------------------------------
 # 1) CONJUNTOS CALENDARIO
 #    ────────────────
@@ -18,6 +22,8 @@ from typing import List, Dict, Tuple
 #    * σw  : semana→mes
 #    * Ww  : semana→lista de días
 #    * Dproh : miércoles y domingos (restricción municipal)
+#    * Ds  : mes→lista de días
+#    (vectores de entrega_3/calendario.py, compartido con entrega_3)
 # ----------------------------------------------------------------------------
 D         : List[int]              = list(range(1, 366))
 Hn        : List[int]              = list(range(22, 24)) + list(range(0, 10))
@@ -28,27 +34,16 @@ sigma_d   : Dict[int, int]         = {}        # d → mes
 sigma_w   : Dict[int, int]         = {}        # w → mes
 W_w       : Dict[int, List[int]]   = defaultdict(list)
 Dproh     : List[int]              = []        # miércoles / domingos
+D_s       : Dict[int, List[int]]   = {}        # s → días del mes
 
 def _build_calendar(year: int = 2025) -> None:
-    """Llena sigma_d, sigmaw, Ww y Dproh de forma consistente."""
-    cal = calendar.Calendar()
-    d_counter = 0
-    for m in S:
-        for week in cal.monthdatescalendar(year, m):
-            iso_w = week[0].isocalendar()[1]
-            if iso_w not in W:
-                continue
-            for date in week:
-                if date.year == year and date.month == m:
-                    d_counter += 1
-                    d = d_counter
-                    sigma_d[d] = m
-                    W_w[iso_w].append(d)
-                    if date.weekday() in (2, 6):   # mié, dom
-                        Dproh.append(d)
-            if iso_w not in sigma_w:
-                sigma_w[iso_w] = m
-    assert d_counter == 365, "Año incompleto"
+    """Llena sigma_d, sigmaw, Ww, Dproh y D_s desde los vectores de calendario.py."""
+    cal = construir_calendario(year, len(D))
+    sigma_d.update(zip(D, cal['mes'].tolist()))
+    sigma_w.update((w, m) for w, m in primero(cal['semana'], cal['mes']).items() if w in W)
+    W_w.update((w, dias.tolist()) for w, dias in agrupar(cal['semana']).items() if w in W)
+    D_s.update((s, dias.tolist()) for s, dias in agrupar(cal['mes']).items())
+    Dproh.extend(cal['dia'][cal['proh']].tolist())
 
 _build_calendar()
 
@@ -5,6 +5,10 @@ from gurobipy import GRB
 from dataset import *
 m = gp.Model('Municipal_Riego_10_0')
 
+# (R9) con visitas acumuladas: cada ventana de 14 dias es una diferencia de
+# dos terminos en vez de una suma de 14 (no ceros lineales en el horizonte)
+R9_ACUMULADA = False
+
 # ------------------------- VARIABLES ----------------------------
 # x[i,d,h]: Riego nocturno en UGA i, día d, hora h
 x = m.addVars( [(i,d,h) for i in Z for d in D for h in Hn if calle[i]==0],
@@ -65,26 +69,26 @@ m.addConstrs( X[i,d,b] == 0
 for s in S:
     lhs = gp.quicksum(qpot[i,d,h]
                       for i in Z if calle[i]==0
-                      for d in D if sigma_d[d]==s
+                      for d in D_s[s]
                       for h in Hn) \
         + gp.quicksum(Qpot[i,d,b]
                       for i in Z if calle[i]==0
-                      for d in D if sigma_d[d]==s
+                      for d in D_s[s]
                       for b in B) \
         + gp.quicksum(vlav[i,d]
                       for i in Z if calle[i]==1
-                      for d in D if sigma_d[d]==s)
+                      for d in D_s[s])
     m.addConstr(lhs <= A_pot[s], name=f'R4_{s}')
 
 # (R5a) Balance grises
 for s in S:
     lhs = gp.quicksum(qgris[i,d,h]
                       for i in Z if calle[i]==0
-                      for d in D if sigma_d[d]==s
+                      for d in D_s[s]
                       for h in Hn) \
         + gp.quicksum(Qgris[i,d,b]
                       for i in Z if calle[i]==0
-                      for d in D if sigma_d[d]==s
+                      for d in D_s[s]
                       for b in B)
     m.addConstr(lhs <= A_gris[s], name=f'R5a_{s}')
 
@@ -145,11 +149,22 @@ for i in Z:
                         name=f'R8c_{i}_{w}')
 
 # (R9) Lavado cada 14 días
-m.addConstrs(
-    gp.quicksum(y[i,d_] for d_ in range(d-13, d+1)) >= 1
-    for i in Z if calle[i]==1
-    for d in range(14, 366)
-)
+if R9_ACUMULADA:
+    # cvis[i,d]: Visitas acumuladas de lavado en UGA i hasta el día d
+    cvis = m.addVars( [(i,d) for i in Z if calle[i]==1 for d in D],
+                      lb=0.0, name='cvis')
+    m.addConstrs( cvis[i,d] == (cvis[i,d-1] if d > 1 else 0) + y[i,d]
+                  for i in Z if calle[i]==1
+                  for d in D )
+    m.addConstrs( cvis[i,d] - (cvis[i,d-14] if d > 14 else 0) >= 1
+                  for i in Z if calle[i]==1
+                  for d in range(14, 366) )
+else:
+    m.addConstrs(
+        gp.quicksum(y[i,d_] for d_ in range(d-13, d+1)) >= 1
+        for i in Z if calle[i]==1
+        for d in range(14, 366)
+    )
 
 # --------------------- FUNCIÓN OBJETIVO -------------------------
 cost_riego = c_pot * gp.quicksum(qpot.values()) + \
@@ -0,0 +1,94 @@
+# -------------------------------------------------------------
+#  Agregacion de zonas identicas
+#  Las zonas de riego solo se acoplan a traves de la funcion objetivo,
+#  asi que dos zonas con los mismos parametros (area, grupo, ET, umbrales
+#  de humedad) tienen el mismo subproblema. Se resuelve una representante
+#  por clase con su peso (nro. de zonas) en el objetivo, y la solucion se
+#  copia a cada zona de la clase: la desagregacion es exacta.
+# -------------------------------------------------------------
+from collections import defaultdict
+
+from modelo import por_zona, matriz_et
+from solucion import Solucion, ejes_familias
+
+
+def firma_zona(datos, z, set_P=None):
+    """Todo lo que define el subproblema de riego de la zona z."""
+    pars = datos['pars']
+    set_P = set(datos['P']) if set_P is None else set_P
+    et = matriz_et(datos['ET_dict'], [z], datos['D'])
+    return (
+        float(datos['A'][z]),
+        z in set_P,
+        por_zona(pars['omega^{min}_z'], z),
+        por_zona(pars['omega^{max}_z'], z),
+        et.tobytes(),
+    )
+
+
+def clases_equivalencia(datos):
+    """
+    return : lista de clases (listas de uga_id en el orden de G); la
+             primera zona de cada clase es su representante
+    """
+    clases = defaultdict(list)
+    set_P = set(datos['P'])
+    for z in datos['G']:
+        clases[firma_zona(datos, z, set_P)].append(z)
+    return list(clases.values())
+
+
+def agregar_zonas(datos):
+    """
+    Reduce G a una representante por clase.
+
+    return : (datos_agregados, clases)
+             datos_agregados es una copia de datos con G, P, N reducidos y
+             'peso' = {representante: nro. de zonas de la clase}
+    """
+    clases = clases_equivalencia(datos)
+    reps = [c[0] for c in clases]
+    set_reps = set(reps)
+    agregados = dict(datos)
+    agregados['G'] = reps
+    agregados['P'] = [z for z in datos['P'] if z in set_reps]
+    agregados['N'] = [z for z in datos['N'] if z in set_reps]
+    peso_previo = datos.get('peso', {})
+    agregados['peso'] = {c[0]: sum(peso_previo.get(z, 1) for z in c) for c in clases}
+    return agregados, clases
+
+
+def expandir(sol, clases, datos):
+    """
+    Copia la solucion de cada representante a todas las zonas de su clase.
+
+    sol    : Solucion sobre los datos agregados
+    datos  : datos originales (sin agregar)
+    return : Solucion sobre los ejes originales, mismo objetivo y cota
+    """
+    representante = {z: c[0] for c in clases for z in c}
+    ejes = ejes_familias(datos)
+    arreglos = {}
+    for f, arr in sol.arreglos.items():
+        if f in ("ell", "wwash"):
+            arreglos[f] = arr
+            continue
+        pos = {z: i for i, z in enumerate(sol.ejes[f][0])}
+        arreglos[f] = arr[[pos[representante[z]] for z in ejes[f][0]]]
+    return Solucion(arreglos, ejes, sol.objetivo, sol.cota)
+
+
+def reporte_agregacion(datos, clases):
+    """Resumen de la agregacion: zonas originales, clases y factor de reduccion."""
+    nG, nC = len(datos['G']), len(clases)
+    print(f"Zonas de riego: {nG}  ->  clases: {nC}  (factor {nG / max(nC, 1):.1f}x)")
+    tam = defaultdict(int)
+    for c in clases:
+        tam[len(c)] += 1
+    print("  tamano de clase : nro. de clases  " + ", ".join(f"{k}: {v}" for k, v in sorted(tam.items())))
+
+
+if __name__ == "__main__":
+    from cargar_datos import cargar_datos
+    datos = cargar_datos()
+    reporte_agregacion(datos, clases_equivalencia(datos))
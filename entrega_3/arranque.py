@@ -0,0 +1,110 @@
+# -------------------------------------------------------------
+#  MIP start desde corridas anteriores
+#  Lee una solucion previa (CSV completo de variables o solo el de
+#  lavado), opcionalmente la corre al calendario de otro año y la deja
+#  como atributo Start de las variables del modelo. Lo que no se conoce
+#  queda sin valor (GRB.UNDEFINED) y Gurobi completa el arranque parcial.
+# -------------------------------------------------------------
+import datetime as dt
+
+import gurobipy as gp #type: ignore
+from gurobipy import GRB #type: ignore
+import numpy as np #type: ignore
+import pandas as pd #type: ignore
+
+from solucion import Solucion, NOMBRES
+
+# Familias que se fijan como arranque: decisiones enteras y caudales.
+# omega y u quedan determinadas por ellas y Gurobi las completa.
+FAMILIAS_ARRANQUE = ["y", "vpot", "vpozo", "I", "ell", "wwash"]
+
+
+def leer_variables_csv(ruta, datos):
+    """
+    Solucion desde el CSV completo de variables (vars_solucion_optima.csv,
+    columnas var, value con nombres tipo "y[1001,5,22]").
+    Las claves que no existen en datos (zonas, dias u horas nuevas) se
+    ignoran; lo que no aparece en el archivo queda en NaN.
+    """
+    df = pd.read_csv(ruta)
+    partes = df['var'].str.extract(r'^(\w+)\[(.*)\]$')
+    sol = Solucion.vacia(datos, valor=np.nan)
+    for f, ejes in sol.ejes.items():
+        filas = partes[0] == NOMBRES.get(f, f)
+        if not filas.any():
+            continue
+        claves = partes.loc[filas, 1].str.split(',', expand=True)
+        valores = df.loc[filas, 'value'].to_numpy(dtype=float)
+        pos, validas = [], np.ones(len(valores), dtype=bool)
+        for k, eje in enumerate(ejes):
+            p = claves[k].map({str(e): i for i, e in enumerate(eje)})
+            validas &= p.notna().to_numpy()
+            pos.append(p)
+        pos = tuple(p.to_numpy()[validas].astype(int) for p in pos)
+        sol.arreglos[f][pos] = valores[validas]
+    return sol
+
+
+def leer_lavado_csv(ruta, datos):
+    """
+    Solucion parcial desde ell_solution.csv (uga_id, day, ell_m3):
+    ell y wwash (= hubo lavado) conocidos, el resto en NaN.
+    """
+    df = pd.read_csv(ruta, dtype={'uga_id': str})
+    sol = Solucion.vacia(datos, valor=np.nan)
+    pos_L = {str(l): i for i, l in enumerate(datos['L'])}
+    pos_D = {str(d): i for i, d in enumerate(datos['D'])}
+    i = df['uga_id'].map(pos_L)
+    j = df['day'].astype(str).map(pos_D)
+    ok = (i.notna() & j.notna()).to_numpy()
+    i, j = i.to_numpy()[ok].astype(int), j.to_numpy()[ok].astype(int)
+    ell = df['ell_m3'].to_numpy(dtype=float)[ok]
+    sol.arreglos['ell'][:] = 0.0
+    sol.arreglos['wwash'][:] = 0.0
+    sol.arreglos['ell'][i, j] = ell
+    sol.arreglos['wwash'][i, j] = (ell > 1e-6).astype(float)
+    return sol
+
+
+def desfase_semanal(anio_origen, anio_destino):
+    """
+    Dias que hay que restar a un dia del año de anio_origen para caer en
+    el mismo dia de la semana en anio_destino (el mas cercano, -3..3).
+    Asi los dias prohibidos, que van por dia de la semana, calzan.
+    """
+    delta = (dt.date(anio_destino, 1, 1).weekday() - dt.date(anio_origen, 1, 1).weekday()) % 7
+    return delta - 7 if delta > 3 else delta
+
+
+def desplazar(sol, dias):
+    """
+    Corre la solucion `dias` posiciones hacia atras en el eje D
+    (dia d -> d - dias); los dias que quedan sin dato van en NaN.
+    """
+    arreglos = {}
+    for f, a in sol.arreglos.items():
+        b = np.full_like(a, np.nan)
+        if dias >= 0:
+            b[:, :a.shape[1] - dias] = a[:, dias:]
+        else:
+            b[:, -dias:] = a[:, :dias]
+        arreglos[f] = b
+    return Solucion(arreglos, sol.ejes)
+
+
+def aplicar_arranque(m, variables, sol, familias=FAMILIAS_ARRANQUE):
+    """
+    Deja los valores de sol (sobre los ejes originales) como Start de las
+    variables del modelo. Funciona con cualquier constructor y con el
+    modelo agregado (solo se leen las zonas representantes).
+    """
+    for f in familias:
+        v = variables[f]
+        if isinstance(v, gp.tupledict):
+            if len(v):
+                valores = sol.arreglos[f].ravel()
+                m.setAttr("Start", list(v.values()),
+                          np.where(np.isnan(valores), GRB.UNDEFINED, valores).tolist())
+        else:
+            v.fijar_start(sol.arreglos[f], sol.ejes[f])
+    m.update()
@@ -0,0 +1,79 @@
+# -------------------------------------------------------------
+#  Benchmark de la formulacion de R8: "ventanas" vs "acumulada"
+#  Por cada horizonte construye el modelo con las dos formulaciones de
+#  la cobertura de lavado (modelo.COBERTURAS) y compara filas, columnas
+#  y no ceros (total y de R8, con perfil.RegistroFamilias), el tiempo de
+#  construccion y el de la relajacion lineal, y que el optimo de la
+#  relajacion sea el mismo.
+#  Con --solo-lavado se arma solo el bloque de lavado (G vacio), que no
+#  depende de la ET y admite horizontes de mas de un año.
+#
+#  Uso:
+#    python benchmark_cobertura.py --zonas 20 --dias 91 182 365
+#    python benchmark_cobertura.py --solo-lavado --dias 365 730 1460
+# -------------------------------------------------------------
+import argparse
+import time
+
+import gurobipy as gp #type: ignore
+
+from benchmark_construccion import instancia
+from modelo import construir_modelo, COBERTURAS
+from perfil import RegistroFamilias
+
+
+def _datos(n_zonas, n_dias, solo_lavado):
+    if not solo_lavado:
+        return instancia(n_zonas, n_dias)
+    datos = instancia()
+    D = list(range(1, n_dias + 1))
+    return dict(datos, G=[], P=[], N=[], D=D, D_proh=[], pars=dict(datos['pars'], D=n_dias))
+
+
+def medir(datos, cobertura, metodo="disperso", repeticiones=3, env=None):
+    """Tamaño del modelo y mejor tiempo de la relajacion lineal de `repeticiones`."""
+    registro = RegistroFamilias()
+    t0 = time.perf_counter()
+    m, _ = construir_modelo(datos, metodo=metodo, env=env, registro=registro, cobertura=cobertura)
+    t_build = time.perf_counter() - t0
+    r8 = registro.familias.get("R8", {})
+    lp = m.relax()
+    lp.Params.Threads = 1
+    t_lp, objetivo = float("inf"), None
+    for _ in range(repeticiones):
+        lp.reset()
+        lp.optimize()
+        t_lp = min(t_lp, lp.Runtime)
+        objetivo = lp.ObjVal if lp.SolCount else None
+    fila = {"cobertura": cobertura, "vars": m.NumVars, "filas": m.NumConstrs, "nnz": m.NumNZs,
+            "nnz_R8": r8.get("nnz", 0), "filas_R8": r8.get("filas", 0),
+            "t_build_s": t_build, "t_lp_s": t_lp, "obj_lp": objetivo}
+    lp.dispose()
+    m.dispose()
+    return fila
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--zonas", type=int, default=None)
+    ap.add_argument("--dias", type=int, nargs="+", default=[365])
+    ap.add_argument("--constructor", default="disperso")
+    ap.add_argument("--repeticiones", type=int, default=3)
+    ap.add_argument("--solo-lavado", action="store_true")
+    args = ap.parse_args()
+
+    print(f"{'dias':>6} {'cobertura':<10} {'filas':>10} {'nnz':>10} {'nnz R8':>10} "
+          f"{'build [s]':>10} {'LP [s]':>9} {'obj LP':>14}")
+    with gp.Env(params={"OutputFlag": 0}) as env:
+        for n_dias in args.dias:
+            datos = _datos(args.zonas, n_dias, args.solo_lavado)
+            res = [medir(datos, c, args.constructor, args.repeticiones, env) for c in COBERTURAS]
+            for r in res:
+                print(f"{n_dias:>6} {r['cobertura']:<10} {r['filas']:>10} {r['nnz']:>10} {r['nnz_R8']:>10} "
+                      f"{r['t_build_s']:>10.2f} {r['t_lp_s']:>9.3f} {r['obj_lp'] if r['obj_lp'] is not None else float('nan'):>14,.4f}")
+            v, a = res
+            iguales = v['obj_lp'] is not None and a['obj_lp'] is not None and \
+                abs(v['obj_lp'] - a['obj_lp']) <= 1e-6 * max(1.0, abs(v['obj_lp']))
+            print(f"{'':>6} acumulada: no ceros de R8 {v['nnz_R8'] / max(a['nnz_R8'], 1):.1f}x menos, "
+                  f"tiempo LP {a['t_lp_s'] / max(v['t_lp_s'], 1e-9):.2f}x el de ventanas, "
+                  f"misma relajacion: {'si' if iguales else 'NO'}")
@@ -0,0 +1,117 @@
+# -------------------------------------------------------------
+#  Benchmark de construccion: "bucles" vs "matricial"
+#
+#  Uso:
+#    python benchmark_construccion.py                 # instancia completa
+#    python benchmark_construccion.py --zonas 20 --dias 60
+#    python benchmark_construccion.py --verificar --zonas 6 --dias 30
+#
+#  Cada constructor corre en un proceso aparte para que el pico de
+#  memoria (ru_maxrss) de uno no contamine al otro.
+# -------------------------------------------------------------
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import numpy as np #type: ignore
+
+
+def instancia(n_zonas=None, n_dias=None):
+    """Recorta los datos de cargar_datos.py a las primeras n_zonas / n_dias."""
+    from cargar_datos import cargar_datos
+    ps = cargar_datos()
+    G = ps['G'][:n_zonas] if n_zonas else list(ps['G'])
+    D = ps['D'][:n_dias] if n_dias else list(ps['D'])
+    pars = dict(ps['pars'], D=len(D))
+    return dict(
+        G=G, L=list(ps['L']),
+        P=[z for z in ps['P'] if z in set(G)], N=[z for z in ps['N'] if z in set(G)],
+        D=D, H=list(ps['H']), H_noc=list(ps['H_noc']),
+        D_proh=[d for d in ps['D_proh'] if d <= len(D)],
+        A=ps['A'], beta_z=ps['beta_z'], pars=pars, ET_dict=ps['ET_dict'],
+    )
+
+
+def _medir(metodo, n_zonas, n_dias):
+    """Se ejecuta en el proceso hijo: construye una vez y reporta."""
+    from modelo import construir_modelo
+    datos = instancia(n_zonas, n_dias)
+    t0 = time.perf_counter()
+    m, _ = construir_modelo(datos, metodo=metodo)
+    m.update()
+    t_build = time.perf_counter() - t0
+    pico_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "metodo": metodo, "t_build_s": round(t_build, 3),
+        "pico_rss_mb": round(pico_kb / 1024, 1),
+        "vars": m.NumVars, "filas": m.NumConstrs, "nnz": m.NumNZs,
+    }))
+
+
+def _forma_canonica(m):
+    """Columnas (lb, ub, tipo, obj) y multiconjunto de filas (sentido, rhs, coeficientes)."""
+    m.update()
+    vs = m.getVars()
+    cols = list(zip(m.getAttr("LB", vs), m.getAttr("UB", vs),
+                    m.getAttr("VType", vs), m.getAttr("Obj", vs)))
+    A = m.getA().tocsr()
+    cs = m.getConstrs()
+    sentidos, rhs = m.getAttr("Sense", cs), m.getAttr("RHS", cs)
+    filas = Counter()
+    for i in range(A.shape[0]):
+        ini, fin = A.indptr[i], A.indptr[i + 1]
+        orden = np.argsort(A.indices[ini:fin])
+        coefs = tuple(zip(A.indices[ini:fin][orden].tolist(),
+                          np.round(A.data[ini:fin][orden], 9).tolist()))
+        filas[(sentidos[i], round(rhs[i], 9), coefs)] += 1
+    return cols, filas
+
+
+def verificar(n_zonas, n_dias):
+    """Construye ambos modelos y compara columna a columna y fila a fila."""
+    from modelo import construir_modelo
+    datos = instancia(n_zonas, n_dias)
+    m1, _ = construir_modelo(datos, metodo="bucles")
+    m2, _ = construir_modelo(datos, metodo="matricial")
+    c1, f1 = _forma_canonica(m1)
+    c2, f2 = _forma_canonica(m2)
+    print(f"columnas: {len(c1)} vs {len(c2)}  ->  {'iguales' if c1 == c2 else 'DISTINTAS'}")
+    print(f"filas   : {sum(f1.values())} vs {sum(f2.values())}  ->  {'iguales' if f1 == f2 else 'DISTINTAS'}")
+    print(f"sentido objetivo: {m1.ModelSense} vs {m2.ModelSense}")
+    return c1 == c2 and f1 == f2 and m1.ModelSense == m2.ModelSense
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--zonas", type=int, default=None)
+    ap.add_argument("--dias", type=int, default=None)
+    ap.add_argument("--verificar", action="store_true")
+    ap.add_argument("--_hijo", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._hijo:
+        _medir(args._hijo, args.zonas, args.dias)
+        sys.exit(0)
+    if args.verificar:
+        sys.exit(0 if verificar(args.zonas, args.dias) else 1)
+
+    res = {}
+    for metodo in ["bucles", "matricial"]:
+        cmd = [sys.executable, __file__, "--_hijo", metodo]
+        if args.zonas:
+            cmd += ["--zonas", str(args.zonas)]
+        if args.dias:
+            cmd += ["--dias", str(args.dias)]
+        salida = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        res[metodo] = json.loads(salida.strip().splitlines()[-1])
+
+    print(f"{'metodo':<10} {'build [s]':>10} {'pico RSS [MB]':>14} {'vars':>10} {'filas':>10} {'nnz':>10}")
+    for r in res.values():
+        print(f"{r['metodo']:<10} {r['t_build_s']:>10.2f} {r['pico_rss_mb']:>14.1f} {r['vars']:>10} {r['filas']:>10} {r['nnz']:>10}")
+    b, mt = res["bucles"], res["matricial"]
+    print(f"\nSpeedup construccion: {b['t_build_s'] / mt['t_build_s']:.1f}x   "
+          f"memoria: {b['pico_rss_mb'] / mt['pico_rss_mb']:.1f}x menos")
@@ -0,0 +1,267 @@
+# -------------------------------------------------------------
+#  Benchmark por fases sobre instancias sinteticas
+#
+#  Uso:
+#    python benchmark_sintetico.py                            # juguete y chica
+#    python benchmark_sintetico.py --tamanos actual x10 --constructor disperso diario
+#    python benchmark_sintetico.py --sectores 5 --zonas-por-sector 40 --tramos 6 --dias 90
+#    python benchmark_sintetico.py --estricto                 # sale con 1 si hay regresiones
+#
+#  Cada instancia se genera con la forma de zonas.csv (sectores, zonas
+#  por sector, reparto P/N, tramos de lavado, areas y sub-tipos) y los
+#  parametros de params.yaml con el horizonte pedido, con semilla fija.
+#  Cada corrida va en un proceso aparte (como benchmark_construccion.py)
+#  y mide por separado las fases:
+#    carga        : cargar_datos sobre los archivos generados (sin cache)
+#    construccion : construir_modelo
+#    resolucion   : optimize (Seed y Threads fijos)
+#    extraccion   : Solucion.desde_variables
+#    reporte      : indicadores, ell_solution.csv y solucion .npz
+#                   (+ graficos con --graficos)
+#  Los resultados se agregan a benchmarks/historial.jsonl (local a cada
+#  maquina, fuera de git: ver .gitignore); una fase que
+#  tarda mas de TOLERANCIA veces la mediana de las ultimas VENTANA
+#  corridas comparables (misma instancia, constructor y maquina) se
+#  marca como regresion.
+# -------------------------------------------------------------
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np #type: ignore
+import pandas as pd #type: ignore
+import yaml #type: ignore
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+RUTA_PARAMS = os.path.join(BASE, "params.yaml")
+HISTORIAL = os.path.join(BASE, "benchmarks", "historial.jsonl")
+
+# Inventario actual: 3 sectores, ~77 zonas de riego por sector, 13 % P, 14 tramos
+TAMANOS = {
+    "juguete": dict(sectores=1, zonas_por_sector=2, tramos=1, dias=14),
+    "chica":   dict(sectores=3, zonas_por_sector=10, tramos=3, dias=60),
+    "actual":  dict(sectores=3, zonas_por_sector=77, tramos=14, dias=365),
+    "x10":     dict(sectores=30, zonas_por_sector=77, tramos=140, dias=365),
+}
+SUB_TIPOS = ["Área Verde", "Bandejón", "Jardines", "Plaza", "Plazoleta", "Parque",
+             "Otros", "Veredón", "Paseo", "Cerros", "Rotonda"]
+# A_m2 de zonas.csv: mediana ~5.100 m2, media ~7.700 m2 (lognormal)
+AREA_MEDIANA, AREA_SIGMA = 5088.8, 0.92
+COLUMNAS = ["uga_id", "sector", "sub_tipo", "type", "uga_group", "A_m2"]
+FASES = ("carga", "construccion", "resolucion", "extraccion", "reporte")
+TOLERANCIA = 1.25
+MIN_SEGUNDOS = 0.05   # diferencias menores no cuentan como regresion
+VENTANA = 5
+
+
+def generar_instancia(directorio, sectores=3, zonas_por_sector=77, frac_P=0.13, tramos=14, dias=365,
+                      semilla=0, ruta_params=RUTA_PARAMS):
+    """
+    Escribe <directorio>/zonas.csv y <directorio>/params.yaml.
+
+    Las zonas de riego del sector s van de s*base+1 (base = 1000 mientras
+    haya menos de 1000 zonas por sector) y los tramos de 101 en adelante,
+    como en zonas.csv.
+
+    return : (ruta_params, ruta_zonas)
+    """
+    base = 10 ** max(3, len(str(zonas_por_sector)))
+    if 100 + tramos >= base:
+        raise ValueError(f"Demasiados tramos ({tramos}) para ids de zona desde {base}")
+    rng = np.random.default_rng(semilla)
+    n_P = int(round(frac_P * zonas_por_sector))
+    filas = []
+    for s in range(1, sectores + 1):
+        grupos = rng.permutation(["P"] * n_P + ["N"] * (zonas_por_sector - n_P))
+        tipos = rng.choice(SUB_TIPOS, size=zonas_por_sector)
+        areas = np.round(rng.lognormal(np.log(AREA_MEDIANA), AREA_SIGMA, size=zonas_por_sector), 1)
+        for i in range(zonas_por_sector):
+            filas.append((s * base + i + 1, f"S{s}", f"{tipos[i]}_P{i + 1}", "irr", grupos[i], areas[i]))
+    for i in range(1, tramos + 1):
+        filas.append((100 + i, "Tramos", f"lav_{i:02d}", "lav", "", ""))
+    ruta_zonas = os.path.join(directorio, "zonas.csv")
+    pd.DataFrame(filas, columns=COLUMNAS).to_csv(ruta_zonas, index=False)
+
+    with open(ruta_params, encoding="utf-8") as fh:
+        cfg = yaml.safe_load(fh)
+    cfg['D'] = dias
+    if isinstance(cfg['D_proh'], list):
+        cfg['D_proh'] = [d for d in cfg['D_proh'] if d <= dias]
+    ruta = os.path.join(directorio, "params.yaml")
+    with open(ruta, "w", encoding="utf-8") as fh:
+        yaml.safe_dump(cfg, fh, allow_unicode=True, sort_keys=False)
+    return ruta, ruta_zonas
+
+
+def _medir(spec, metodo, params, graficos):
+    """Se ejecuta en el proceso hijo: una corrida completa, fase por fase."""
+    import gurobipy as gp #type: ignore
+    from cargar_datos import cargar_datos
+    from modelo import construir_modelo
+    from solucion import Solucion
+    from indicadores import cubo_kpi, tabla_lavado
+    from exportacion import guardar_solucion
+    from reportes import generar_reportes
+
+    t = dict.fromkeys(FASES)
+    res = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        rutas = generar_instancia(tmp, **spec)
+        t0 = time.perf_counter()
+        datos = cargar_datos(*rutas, directorio=None)
+        t['carga'] = time.perf_counter() - t0
+
+        with gp.Env(params={"OutputFlag": 0}) as env:
+            t0 = time.perf_counter()
+            m, v = construir_modelo(datos, metodo=metodo, env=env)
+            m.update()
+            t['construccion'] = time.perf_counter() - t0
+            res.update(vars=m.NumVars, filas=m.NumConstrs, nnz=m.NumNZs)
+            for k, val in params.items():
+                m.setParam(k, val)
+            try:
+                t0 = time.perf_counter()
+                m.optimize()
+                t['resolucion'] = time.perf_counter() - t0
+            except gp.GurobiError as e:
+                res['error'] = str(e)
+            if m.SolCount:
+                res.update(estado=m.Status, objetivo=m.ObjVal, gap=m.MIPGap if m.IsMIP else 0.0)
+                t0 = time.perf_counter()
+                sol = Solucion.desde_variables(v, datos, m)
+                t['extraccion'] = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                kpi = cubo_kpi(sol, datos)
+                tabla_lavado(sol, datos).to_csv(os.path.join(tmp, "ell_solution.csv"), index=False)
+                guardar_solucion(sol, os.path.join(tmp, "vars_solucion_optima"))
+                if graficos:
+                    generar_reportes(kpi, datos, tmp, procesos=0)
+                t['reporte'] = time.perf_counter() - t0
+            m.dispose()
+    res['tiempos'] = t
+    res['pico_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(res))
+
+
+def _maquina():
+    import gurobipy as gp #type: ignore
+    return {'host': platform.node(), 'cpus': os.cpu_count(), 'python': platform.python_version(),
+            'gurobi': ".".join(map(str, gp.gurobi.version()))}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def leer_historial(ruta=HISTORIAL):
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding="utf-8") as fh:
+        return [json.loads(linea) for linea in fh if linea.strip()]
+
+
+def regresiones(corrida, historial, tolerancia=TOLERANCIA, ventana=VENTANA):
+    """
+    Fases de la corrida mas lentas que tolerancia x la mediana de las
+    ultimas `ventana` corridas comparables.
+
+    return : dict fase -> (segundos, mediana historica)
+    """
+    comparables = [h for h in historial
+                   if h['instancia'] == corrida['instancia'] and h['constructor'] == corrida['constructor']
+                   and h['params'] == corrida['params'] and h['maquina'] == corrida['maquina']][-ventana:]
+    lentas = {}
+    for fase in FASES:
+        previos = [h['tiempos'][fase] for h in comparables if h['tiempos'].get(fase) is not None]
+        seg = corrida['tiempos'].get(fase)
+        if seg is None or not previos:
+            continue
+        mediana = float(np.median(previos))
+        if seg > tolerancia * mediana and seg - mediana > MIN_SEGUNDOS:
+            lentas[fase] = (seg, mediana)
+    return lentas
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tamanos", nargs="+", default=["juguete", "chica"], choices=list(TAMANOS))
+    ap.add_argument("--sectores", type=int, default=None)
+    ap.add_argument("--zonas-por-sector", type=int, default=None)
+    ap.add_argument("--frac-p", type=float, default=0.13)
+    ap.add_argument("--tramos", type=int, default=None)
+    ap.add_argument("--dias", type=int, default=None)
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("--constructor", nargs="+", default=["disperso"])
+    ap.add_argument("--time-limit", type=float, default=600)
+    ap.add_argument("--hilos", type=int, default=1)
+    ap.add_argument("--graficos", action="store_true")
+    ap.add_argument("--historial", default=HISTORIAL)
+    ap.add_argument("--no-guardar", action="store_true")
+    ap.add_argument("--estricto", action="store_true")
+    ap.add_argument("--_hijo", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._hijo:
+        hijo = json.loads(args._hijo)
+        _medir(hijo['instancia'], hijo['constructor'], hijo['params'], hijo['graficos'])
+        sys.exit(0)
+
+    # una instancia a medida si se da alguna dimension; si no, los tamaños pedidos
+    a_medida = {k: getattr(args, k) for k in ("sectores", "zonas_por_sector", "tramos", "dias")
+                if getattr(args, k) is not None}
+    instancias = {"a_medida": dict(TAMANOS["actual"], **a_medida)} if a_medida else \
+        {n: dict(TAMANOS[n]) for n in args.tamanos}
+    params = {"TimeLimit": args.time_limit, "Threads": args.hilos, "Seed": 0}
+    maquina, commit = _maquina(), _commit()
+    historial = leer_historial(args.historial)
+
+    corridas, hay_regresion = [], False
+    for nombre, spec in instancias.items():
+        spec.update(frac_P=args.frac_p, semilla=args.semilla)
+        for metodo in args.constructor:
+            hijo = dict(instancia=spec, constructor=metodo, params=params, graficos=args.graficos)
+            salida = subprocess.run([sys.executable, __file__, "--_hijo", json.dumps(hijo)],
+                                    capture_output=True, text=True, check=True).stdout
+            res = json.loads(salida.strip().splitlines()[-1])
+            corrida = dict(fecha=datetime.now().isoformat(timespec="seconds"), commit=commit,
+                           maquina=maquina, nombre=nombre, instancia=spec, constructor=metodo,
+                           params=params, graficos=args.graficos, **res)
+            corrida['regresiones'] = regresiones(corrida, historial)
+            hay_regresion |= bool(corrida['regresiones'])
+            corridas.append(corrida)
+
+    print(f"{'instancia':<10} {'constructor':<11} " + " ".join(f"{f:>13}" for f in FASES)
+          + f" {'vars':>9} {'RSS [MB]':>9} {'objetivo':>14}")
+    for c in corridas:
+        celdas = []
+        for f in FASES:
+            seg = c['tiempos'][f]
+            celdas.append(f"{'-' if seg is None else f'{seg:.3f}':>12}{'!' if f in c['regresiones'] else ' '}")
+        obj = c.get('objetivo')
+        print(f"{c['nombre']:<10} {c['constructor']:<11} " + " ".join(celdas)
+              + f" {c['vars']:>9} {c['pico_rss_mb']:>9.1f} {'-' if obj is None else f'{obj:,.2f}':>14}")
+        if c.get('error'):
+            print(f"  error: {c['error']}")
+        for f, (seg, med) in c['regresiones'].items():
+            print(f"  REGRESION {f}: {seg:.3f} s vs mediana {med:.3f} s ({seg / med:.2f}x)")
+
+    if not args.no_guardar:
+        os.makedirs(os.path.dirname(os.path.abspath(args.historial)), exist_ok=True)
+        with open(args.historial, "a", encoding="utf-8") as fh:
+            for c in corridas:
+                fh.write(json.dumps(c, ensure_ascii=False) + "\n")
+        print(f"\n{len(corridas)} corridas agregadas a {args.historial}")
+    if args.estricto and hay_regresion:
+        sys.exit(1)
@@ -0,0 +1,189 @@
+# -------------------------------------------------------------
+#  Cache en disco de modelos construidos
+#  La llave es un hash de todo lo que define el modelo: los datos
+#  (conjuntos, parametros, ET, pesos, estado de ventana), el constructor
+#  y el codigo que lo arma (modelo.py, indices.py) y lo guarda (este
+#  modulo, por el formato de la entrada) mas la version de
+#  gurobipy. Cada entrada guarda:
+#    <hash>.mps.gz  : el modelo (columnas en el mismo orden que addMVar)
+#    <hash>.json    : como rearmar las vistas (familia -> rango de
+#                     columnas, forma y ejes) sobre el modelo leido, y
+#                     los rangos de filas de m._balance (R5) y
+#                     m._humedad (R6) que usan replanificacion.py y
+#                     escenarios.py
+#  Si cambia cualquier insumo cambia el hash (invalidacion); las entradas
+#  menos usadas se borran al pasar de `max_entradas`.
+# -------------------------------------------------------------
+import hashlib
+import json
+import os
+import time
+
+import gurobipy as gp #type: ignore
+import numpy as np #type: ignore
+
+from cargar_datos import TablaET
+from modelo import construir_modelo, Vista, VistaUnion, VistaHoraria
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_modelos")
+FUENTES = ["modelo.py", "indices.py", "cache_modelo.py"]
+EXTENSION = ".mps.gz"
+
+
+def _canonico(obj):
+    """Forma canonica (ordenada, sin tipos de numpy) para hashear datos."""
+    if isinstance(obj, TablaET):
+        valores = hashlib.sha256(np.ascontiguousarray(obj.valores).tobytes()).hexdigest()
+        return ["TablaET", _canonico(obj.zonas), _canonico(obj.dias), list(obj.valores.shape), valores]
+    if isinstance(obj, dict):
+        return sorted(([_canonico(k), _canonico(v)] for k, v in obj.items()), key=repr)
+    if isinstance(obj, (list, tuple)):
+        return [_canonico(e) for e in obj]
+    if isinstance(obj, (set, frozenset)):
+        return sorted((_canonico(e) for e in obj), key=repr)
+    if isinstance(obj, np.ndarray):
+        return [list(obj.shape), _canonico(obj.ravel().tolist())]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def huella(datos, metodo):
+    """Hash sha256 de datos + constructor + codigo de los constructores."""
+    h = hashlib.sha256()
+    h.update(repr(_canonico(datos)).encode())
+    h.update(metodo.encode())
+    h.update(repr(gp.gurobi.version()).encode())
+    base = os.path.dirname(os.path.abspath(__file__))
+    for f in FUENTES:
+        with open(os.path.join(base, f), "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()
+
+
+# ------------------ vistas <-> json ----------------------------
+def _inicio(mvar):
+    return int(mvar.reshape(-1)[0].item().index) if mvar.size else 0
+
+
+def _a_json(vista):
+    if isinstance(vista, Vista):
+        return {"tipo": "vista", "inicio": _inicio(vista.mvar), "forma": list(vista.mvar.shape),
+                "ejes": vista.ejes, "completos": vista.completos}
+    if isinstance(vista, VistaUnion):
+        return {"tipo": "union", "vistas": [_a_json(v) for v in vista.vistas]}
+    if isinstance(vista, VistaHoraria):
+        return {"tipo": "horaria", "diaria": _a_json(vista.diaria), "H_r": vista.H_r,
+                "tasa": vista.tasa}
+    raise TypeError(f"Vista no soportada por la cache: {type(vista).__name__}")
+
+
+def _desde_json(spec, x):
+    if spec["tipo"] == "vista":
+        n = int(np.prod(spec["forma"]))
+        mvar = x[spec["inicio"]:spec["inicio"] + n].reshape(spec["forma"])
+        return Vista(mvar, spec["ejes"], completos=spec["completos"])
+    if spec["tipo"] == "union":
+        return VistaUnion([_desde_json(s, x) for s in spec["vistas"]])
+    return VistaHoraria(_desde_json(spec["diaria"], x), spec["H_r"], spec["tasa"])
+
+
+# ------------------ filas <-> json -----------------------------
+def _filas_a_json(filas):
+    """MConstr de agregar_filas (1-D, filas contiguas) -> {inicio, n}; None si no hay."""
+    if filas is None or not filas.size:
+        return None
+    return {"inicio": int(filas.tolist()[0].index), "n": int(filas.size)}
+
+
+def _filas_desde_json(spec, filas):
+    if spec is None:
+        return None
+    return gp.MConstr.fromlist(filas[spec["inicio"]:spec["inicio"] + spec["n"]])
+
+
+# ------------------ cache --------------------------------------
+def _rutas(directorio, clave):
+    return os.path.join(directorio, clave + EXTENSION), os.path.join(directorio, clave + ".json")
+
+
+def cargar(clave, env=None, directorio=DIRECTORIO):
+    """Modelo y vistas de la entrada `clave`, o None si no existe."""
+    mps, meta = _rutas(directorio, clave)
+    if not (os.path.exists(mps) and os.path.exists(meta)):
+        return None
+    with open(meta) as fh:
+        contenido = json.load(fh)
+    if not isinstance(contenido.get("filas"), dict):
+        return None                        # entrada de un formato anterior
+    m = gp.read(mps, env=env)
+    x = gp.MVar.fromlist(m.getVars())
+    v = {f: _desde_json(s, x) for f, s in contenido["vistas"].items()}
+    # filas con nombre propio del modelo (el MPS guarda el orden de las filas)
+    filas = m.getConstrs()
+    if "balance" in contenido["filas"]:
+        m._balance = _filas_desde_json(contenido["filas"]["balance"], filas)
+    m._humedad = {k: _filas_desde_json(s, filas) for k, s in contenido["filas"]["humedad"].items()}
+    ahora = time.time()
+    os.utime(mps, (ahora, ahora))          # marca de uso para el desalojo
+    os.utime(meta, (ahora, ahora))
+    return m, v
+
+
+def guardar(clave, m, v, metodo, directorio=DIRECTORIO):
+    """Escribe la entrada (primero a temporales, despues rename atomico)."""
+    os.makedirs(directorio, exist_ok=True)
+    m.update()
+    specs = {f: _a_json(vista) for f, vista in v.items()}
+    filas = {"humedad": {k: _filas_a_json(c) for k, c in m._humedad.items()}}
+    if hasattr(m, "_balance"):
+        filas["balance"] = _filas_a_json(m._balance)
+    mps, meta = _rutas(directorio, clave)
+    tmp_mps = os.path.join(directorio, f"tmp_{os.getpid()}_{clave}{EXTENSION}")
+    m.write(tmp_mps)
+    with open(meta + ".tmp", "w") as fh:
+        json.dump({"metodo": metodo, "creado": time.strftime("%Y-%m-%d %H:%M:%S"),
+                   "vars": m.NumVars, "filas": filas, "n_filas": m.NumConstrs, "vistas": specs}, fh)
+    os.replace(tmp_mps, mps)
+    os.replace(meta + ".tmp", meta)
+
+
+def desalojar(max_entradas=4, directorio=DIRECTORIO):
+    """Borra las entradas menos usadas recientemente sobre max_entradas."""
+    if not os.path.isdir(directorio):
+        return []
+    claves = [f[:-len(".json")] for f in os.listdir(directorio)
+              if f.endswith(".json") and os.path.exists(os.path.join(directorio, f[:-5] + EXTENSION))]
+    claves.sort(key=lambda c: os.path.getmtime(_rutas(directorio, c)[1]), reverse=True)
+    borradas = claves[max_entradas:]
+    for c in borradas:
+        for ruta in _rutas(directorio, c):
+            os.remove(ruta)
+    return borradas
+
+
+def construir_con_cache(datos, metodo="disperso", env=None, directorio=DIRECTORIO,
+                        max_entradas=4, verbose=True, registro=None, cobertura="ventanas"):
+    """
+    Igual que modelo.construir_modelo, pero reutiliza el modelo de una
+    corrida anterior con los mismos insumos (registro solo mide si hay
+    que construir; la formulacion de R8 entra en la llave). El modelo
+    leido trae tambien m._balance y m._humedad.
+
+    return : (modelo, dict de vistas por familia)
+    """
+    if metodo == "bucles":
+        raise ValueError("La cache no soporta el constructor 'bucles' (usa tupledicts)")
+    t0 = time.perf_counter()
+    clave = huella(datos, metodo if cobertura == "ventanas" else f"{metodo}+{cobertura}")
+    res = cargar(clave, env=env, directorio=directorio)
+    if res is not None:
+        if verbose:
+            print(f"Modelo leido de la cache ({clave[:12]}) en {time.perf_counter() - t0:.1f} s")
+        return res
+    m, v = construir_modelo(datos, metodo=metodo, env=env, registro=registro, cobertura=cobertura)
+    guardar(clave, m, v, metodo, directorio=directorio)
+    desalojar(max_entradas, directorio=directorio)
+    if verbose:
+        print(f"Modelo construido y guardado en la cache ({clave[:12]}) en {time.perf_counter() - t0:.1f} s")
+    return m, v
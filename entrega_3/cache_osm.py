@@ -0,0 +1,264 @@
+# -------------------------------------------------------------
+#  Cache en disco de los extractos de OpenStreetMap
+#  openstreet_las_condes.py y entrega_2 (e2.py, data1.py) descargaban
+#  en cada corrida las areas verdes, las exclusiones y la red de calles.
+#  Aqui cada consulta se guarda una vez:
+#    <clave>.json            : que se pidio (lugar, tags o network_type),
+#                              cuando, con que osmnx, sha256 de cada
+#                              parquet y columnas guardadas como JSON
+#    <clave>*.parquet        : el GeoDataFrame ya parseado (GeoParquet);
+#                              los grafos se guardan como nodos + aristas
+#    http/<clave>/           : respuestas crudas de Nominatim / Overpass
+#                              (cache propia de osmnx, por entrada)
+#  La clave es un hash del lugar y de los tags, asi que la misma consulta
+#  lee siempre los mismos archivos (corridas reproducibles). Las entradas
+#  con mas de `ttl_dias` se vuelven a descargar y las menos usadas se
+#  borran al pasar de `max_entradas`. Con offline=True (o OSM_OFFLINE=1)
+#  nunca se usa la red: sin entrada en la cache es un error, y una
+#  entrada vencida se usa igual con un aviso.
+#
+#  Uso: python cache_osm.py [--offline] [--listar] [--max-entradas N]
+# -------------------------------------------------------------
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import geopandas as gpd #type: ignore
+import osmnx as ox #type: ignore
+import pandas as pd #type: ignore
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_osm")
+TTL_DIAS = 30
+MAX_ENTRADAS = 16
+OFFLINE = os.environ.get("OSM_OFFLINE", "") not in ("", "0")
+LUGAR = "Las Condes, Santiago Metropolitan Region, Chile"
+
+
+def _canonico(tags):
+    """Tags con llaves ordenadas y listas ordenadas (mismo hash para el mismo pedido)."""
+    return {k: sorted(v) if isinstance(v, (list, tuple, set)) else v for k, v in sorted(tags.items())}
+
+
+def clave(tipo, lugar, consulta):
+    """sha256 de (tipo, lugar, tags / network_type)."""
+    texto = json.dumps([tipo, lugar, consulta], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def _sha256(ruta):
+    h = hashlib.sha256()
+    with open(ruta, "rb") as fh:
+        for bloque in iter(lambda: fh.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+# ------------------ GeoDataFrame <-> GeoParquet ----------------
+def _columnas_json(gdf):
+    """Columnas object con valores que parquet no guarda (listas, dicts, tipos mezclados)."""
+    columnas = []
+    for c in gdf.columns:
+        if c == gdf.geometry.name or gdf[c].dtype != object:
+            continue
+        valores = gdf[c].dropna()
+        if not valores.map(lambda x: isinstance(x, str)).all():
+            columnas.append(c)
+    return columnas
+
+
+def _escribir(gdf, ruta):
+    """Escribe el GeoParquet (a temporal y rename) y devuelve las columnas pasadas a JSON."""
+    columnas = _columnas_json(gdf)
+    if columnas:
+        gdf = gdf.copy()
+        for c in columnas:
+            gdf[c] = gdf[c].map(lambda x: None if _vacio(x) else json.dumps(x, default=str))
+    tmp = f"{ruta}.tmp_{os.getpid()}"
+    gdf.to_parquet(tmp)
+    os.replace(tmp, ruta)
+    return columnas
+
+
+def _vacio(x):
+    return not isinstance(x, (list, tuple, dict, set)) and pd.isna(x)
+
+
+def _leer(ruta, columnas):
+    gdf = gpd.read_parquet(ruta)
+    for c in columnas:
+        gdf[c] = gdf[c].map(lambda x: json.loads(x) if isinstance(x, str) else x)
+    return gdf
+
+
+# ------------------ entradas -----------------------------------
+def _meta(directorio, k):
+    return os.path.join(directorio, k + ".json")
+
+
+def _entrada(directorio, k):
+    """Metadatos de la entrada si esta completa e integra, si no None."""
+    ruta = _meta(directorio, k)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding="utf-8") as fh:
+        meta = json.load(fh)
+    for nombre, sha in meta['archivos'].items():
+        archivo = os.path.join(directorio, nombre)
+        if not os.path.exists(archivo) or _sha256(archivo) != sha:
+            return None
+    return meta
+
+
+def _borrar(directorio, k):
+    for nombre in os.listdir(directorio):
+        if nombre.startswith(k):
+            os.remove(os.path.join(directorio, nombre))
+    shutil.rmtree(os.path.join(directorio, "http", k), ignore_errors=True)
+
+
+def _descargar(k, directorio, funcion, *args, **kwargs):
+    """Llama a osmnx con su cache http apuntando a la carpeta de la entrada."""
+    http = os.path.join(directorio, "http", k)
+    shutil.rmtree(http, ignore_errors=True)          # si se renueva, no reusar respuestas viejas
+    previo = (ox.settings.use_cache, ox.settings.cache_folder)
+    ox.settings.use_cache, ox.settings.cache_folder = True, http
+    try:
+        return funcion(*args, **kwargs)
+    finally:
+        ox.settings.use_cache, ox.settings.cache_folder = previo
+
+
+def _obtener(tipo, lugar, consulta, descargar, guardar, cargar, ttl_dias, offline, directorio, verbose):
+    k = clave(tipo, lugar, consulta)
+    meta = _entrada(directorio, k)
+    offline = OFFLINE if offline is None else offline
+    if meta is not None:
+        edad_dias = (time.time() - meta['creado']) / 86400
+        if edad_dias <= ttl_dias or offline:
+            if offline and edad_dias > ttl_dias and verbose:
+                print(f"Aviso: {tipo} de {lugar!r} tiene {edad_dias:.0f} dias (TTL {ttl_dias}); "
+                      f"se usa igual por el modo offline")
+            ahora = time.time()
+            os.utime(_meta(directorio, k), (ahora, ahora))       # marca de uso para el desalojo
+            if verbose:
+                print(f"OSM {tipo} de la cache ({k[:12]}, {time.strftime('%Y-%m-%d', time.localtime(meta['creado']))})")
+            return cargar(meta)
+    if offline:
+        raise RuntimeError(f"Modo offline y {tipo} de {lugar!r} no esta en la cache ({directorio})")
+
+    t0 = time.perf_counter()
+    os.makedirs(directorio, exist_ok=True)
+    _borrar(directorio, k)
+    datos = _descargar(k, directorio, descargar)
+    meta = dict(tipo=tipo, lugar=lugar, consulta=consulta, creado=time.time(),
+                osmnx=ox.__version__, **guardar(datos, k))
+    meta['archivos'] = {n: _sha256(os.path.join(directorio, n)) for n in meta['archivos']}
+    tmp = _meta(directorio, k) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, ensure_ascii=False, indent=1, default=str)
+    os.replace(tmp, _meta(directorio, k))
+    desalojar(MAX_ENTRADAS, directorio)
+    if verbose:
+        print(f"OSM {tipo} descargado y guardado ({k[:12]}) en {time.perf_counter() - t0:.1f} s")
+    # se devuelve lo leido de la cache: la primera corrida ve lo mismo que las siguientes
+    return cargar(meta)
+
+
+def features(lugar, tags, ttl_dias=TTL_DIAS, offline=None, directorio=DIRECTORIO, verbose=True):
+    """
+    Como ox.features_from_place(lugar, tags), pero desde la cache.
+
+    tags    : dict de tags OSM (el orden de llaves y listas no cambia la clave)
+    offline : True = nunca descargar; None = OFFLINE (variable OSM_OFFLINE)
+    return  : GeoDataFrame (EPSG:4326, indice (element, id) de osmnx)
+    """
+    consulta = _canonico(tags)
+    ruta = os.path.join(directorio, clave("features", lugar, consulta) + ".parquet")
+    # osmnx < 1.3 lo llamaba geometries_from_place
+    funcion = getattr(ox, "features_from_place", None) or ox.geometries_from_place
+
+    def guardar(gdf, k):
+        return dict(archivos=[os.path.basename(ruta)], columnas_json=_escribir(gdf, ruta))
+
+    def cargar(meta):
+        return _leer(ruta, meta['columnas_json'])
+
+    return _obtener("features", lugar, consulta, lambda: funcion(lugar, tags), guardar, cargar,
+                    ttl_dias, offline, directorio, verbose)
+
+
+def grafo(lugar, network_type="drive", ttl_dias=TTL_DIAS, offline=None, directorio=DIRECTORIO, verbose=True):
+    """
+    Como ox.graph_from_place(lugar, network_type=...), pero desde la cache
+    (nodos y aristas en GeoParquet, se rearma con ox.graph_from_gdfs).
+
+    return : MultiDiGraph de osmnx
+    """
+    consulta = {"network_type": network_type}
+    k = clave("grafo", lugar, consulta)
+    nodos, aristas = k + "_nodos.parquet", k + "_aristas.parquet"
+
+    def guardar(G, k):
+        gdf_nodos, gdf_aristas = ox.graph_to_gdfs(G)
+        return dict(archivos=[nodos, aristas], atributos=dict(G.graph),
+                    columnas_json={nodos: _escribir(gdf_nodos, os.path.join(directorio, nodos)),
+                                   aristas: _escribir(gdf_aristas, os.path.join(directorio, aristas))})
+
+    def cargar(meta):
+        col = meta['columnas_json']
+        return ox.graph_from_gdfs(_leer(os.path.join(directorio, nodos), col[nodos]),
+                                  _leer(os.path.join(directorio, aristas), col[aristas]),
+                                  graph_attrs=meta['atributos'])
+
+    return _obtener("grafo", lugar, consulta, lambda: ox.graph_from_place(lugar, network_type=network_type),
+                    guardar, cargar, ttl_dias, offline, directorio, verbose)
+
+
+# ------------------ mantencion ---------------------------------
+def entradas(directorio=DIRECTORIO):
+    """Metadatos de todas las entradas, de la mas a la menos usada."""
+    if not os.path.isdir(directorio):
+        return []
+    metas = []
+    for nombre in os.listdir(directorio):
+        if nombre.endswith(".json"):
+            with open(os.path.join(directorio, nombre), encoding="utf-8") as fh:
+                meta = json.load(fh)
+            meta['clave'] = nombre[:-len(".json")]
+            meta['uso'] = os.path.getmtime(os.path.join(directorio, nombre))
+            metas.append(meta)
+    return sorted(metas, key=lambda m: m['uso'], reverse=True)
+
+
+def desalojar(max_entradas=MAX_ENTRADAS, directorio=DIRECTORIO):
+    """Borra las entradas menos usadas recientemente sobre max_entradas."""
+    borradas = [m['clave'] for m in entradas(directorio)[max_entradas:]]
+    for k in borradas:
+        _borrar(directorio, k)
+    return borradas
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lugar", default=LUGAR)
+    ap.add_argument("--offline", action="store_true", help="no usar la red")
+    ap.add_argument("--listar", action="store_true", help="solo mostrar las entradas")
+    ap.add_argument("--max-entradas", type=int, default=None, help="desalojar hasta dejar N entradas")
+    args = ap.parse_args()
+
+    if args.max_entradas is not None:
+        print(f"Borradas: {desalojar(args.max_entradas)}")
+    if not args.listar:
+        # precarga lo que usan openstreet_las_condes.py y entrega_2
+        from openstreet_las_condes import TAGS_VERDE, TAGS_EXCLUSION
+        t0 = time.perf_counter()
+        features(args.lugar, TAGS_VERDE, offline=args.offline)
+        features(args.lugar, TAGS_EXCLUSION, offline=args.offline)
+        grafo(args.lugar, "drive", offline=args.offline)
+        print(f"Extractos listos en {time.perf_counter() - t0:.1f} s")
+    for m in entradas():
+        edad = (time.time() - m['creado']) / 86400
+        print(f"  {m['clave'][:12]}  {m['tipo']:8s} {edad:5.1f} dias  {m['lugar']}  {m['consulta']}")
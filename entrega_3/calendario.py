@@ -0,0 +1,91 @@
+# -------------------------------------------------------------
+#  Calendario y ET como arreglos numpy
+#  Un solo lugar para el dia -> (fecha, mes, semana ISO, dia de la
+#  semana, dia prohibido) y para la ET diaria por zona, compartido por
+#  entrega_2 (build_calendar) y entrega_3 (cargar_datos, construccion_et).
+#  Todo se calcula con operaciones vectoriales: el dia d del horizonte es
+#  la posicion d-1 de cada vector.
+# -------------------------------------------------------------
+import numpy as np #type: ignore
+
+DIAS_PROH_SEMANA = (2, 6)   # miércoles y domingos (0 = lunes)
+
+
+def construir_calendario(anio=2025, n_dias=365, dias_proh=DIAS_PROH_SEMANA):
+    """
+    anio      : año del dia 1
+    n_dias    : largo del horizonte (puede pasar al año siguiente)
+    dias_proh : dias de la semana sin riego (0 = lunes ... 6 = domingo)
+    return    : dict de vectores de largo n_dias:
+                dia (1..n), fecha (datetime64[D]), mes (1-12), semana (ISO),
+                dia_semana (0 = lunes), proh (bool)
+    """
+    fecha = np.datetime64(f"{anio:04d}-01-01") + np.arange(n_dias)
+    dias_epoca = fecha.astype(np.int64)                 # 1970-01-01 fue jueves
+    dia_semana = (dias_epoca + 3) % 7
+    # semana ISO: la del jueves de la misma semana, contada desde su año
+    jueves = fecha - dia_semana + 3
+    inicio = jueves.astype('datetime64[Y]').astype('datetime64[D]')
+    return {
+        'dia': np.arange(1, n_dias + 1),
+        'fecha': fecha,
+        'mes': fecha.astype('datetime64[M]').astype(np.int64) % 12 + 1,
+        'semana': (jueves - inicio).astype(np.int64) // 7 + 1,
+        'dia_semana': dia_semana,
+        'proh': np.isin(dia_semana, dias_proh),
+    }
+
+
+def meses_30_dias(n_dias):
+    """Mes de cada dia contando meses de 30 dias (los dias 361-365 quedan en el 13)."""
+    return np.arange(n_dias) // 30 + 1
+
+
+def agrupar(valores):
+    """
+    Dias (1..n) de cada valor de un vector del calendario, p. ej.
+    agrupar(cal['mes']) -> {1: [1..31], 2: [32..59], ...}
+
+    return : dict {valor: arreglo de dias} en orden creciente de dia
+    """
+    valores = np.asarray(valores)
+    orden = np.argsort(valores, kind='stable')
+    claves, inicios = np.unique(valores[orden], return_index=True)
+    return dict(zip(claves.tolist(), np.split(orden + 1, inicios[1:])))
+
+
+def primero(valores, atributo):
+    """{valor: atributo del primer dia con ese valor}, p. ej. semana -> mes."""
+    claves, idx = np.unique(np.asarray(valores), return_index=True)
+    return dict(zip(claves.tolist(), np.asarray(atributo)[idx].tolist()))
+
+
+def et_diaria(mensual, mes, Kc=1.0, resto=None):
+    """
+    mensual : {mes: ET de referencia en mm/dia}
+    mes     : vector mes de cada dia (construir_calendario o meses_30_dias)
+    Kc      : coeficiente de cultivo comun
+    resto   : ET de los meses que no estan en `mensual` (None -> error)
+    return  : vector ET diaria (mm/dia)
+    """
+    tabla = np.full(int(np.max(mes, initial=12)) + 1, np.nan)
+    for m, v in mensual.items():
+        tabla[int(m)] = float(v)
+    if resto is not None:
+        tabla[np.isnan(tabla)] = float(resto)
+    et = tabla[np.asarray(mes, dtype=np.int64)]
+    if np.isnan(et).any():
+        faltan = sorted(set(np.asarray(mes)[np.isnan(et)].tolist()))
+        raise ValueError(f"Falta la ET de los meses {faltan}")
+    return et * Kc
+
+
+def et_zonas(serie, Kc_zona=None):
+    """
+    ET (zonas x dias): una fila comun (1 x D) si no hay Kc por zona, o el
+    producto exterior Kc_zona x serie.
+    """
+    serie = np.asarray(serie, dtype=float)
+    if Kc_zona is None:
+        return serie[None, :]
+    return np.multiply.outer(np.asarray(Kc_zona, dtype=float), serie)
@@ -0,0 +1,292 @@
+# -------------------------------------------------------------
+#  Lectura de datos: params.yaml + zonas.csv -> dict `datos`
+#  Reemplaza las listas pegadas a mano en params_and_sets.py:
+#    zonas.csv   : una fila por UGA (type irr -> G, lav -> L; uga_group
+#                  P/N y A_m2 para las de riego)
+#    params.yaml : horizonte, parametros y, por zona si se quiere,
+#                  omega^{min}_z, omega^{max}_z y ET_{z,d}
+#  El calendario (mes de cada dia, dias prohibidos) sale de calendario.py.
+#  Lo leido se guarda como arreglos tipados (.npz) en cache_datos/, con
+#  llave = hash de ambos archivos y de este modulo; la siguiente carga
+#  solo lee el .npz y arma los conjuntos. Si la ET sale de los CSV de una
+#  estacion (et_referencia.py) sus hashes se guardan junto a los arreglos
+#  y la cache se descarta cuando cambian.
+# -------------------------------------------------------------
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np #type: ignore
+import pandas as pd #type: ignore
+import yaml #type: ignore
+
+from calendario import DIAS_PROH_SEMANA, construir_calendario, meses_30_dias, et_diaria, et_zonas
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+RUTA_PARAMS = os.path.join(BASE, "params.yaml")
+RUTA_ZONAS = os.path.join(BASE, "zonas.csv")
+DIRECTORIO = os.path.join(BASE, "cache_datos")
+
+UMBRALES = ('omega^{min}_z', 'omega^{max}_z')
+CLAVE_ET = 'ET_{z,d}'
+POR_DEFECTO = 'por_defecto'
+
+
+class TablaET(Mapping):
+    """
+    ET_dict de solo lectura sobre un arreglo (zonas x dias).
+
+    Si la ET es la misma para todas las zonas se guarda una sola fila.
+    Se usa igual que el diccionario {(uga_id, dia): ET}, y ademas
+    `arreglo(G, D)` entrega la matriz densa sin recorrer celda a celda.
+    """
+
+    def __init__(self, zonas, dias, valores):
+        self.zonas = list(zonas)
+        self.dias = list(dias)
+        self.valores = np.asarray(valores, dtype=float).reshape(-1, len(self.dias))
+        self._pos_z = {z: i for i, z in enumerate(self.zonas)}
+        self._pos_d = {d: j for j, d in enumerate(self.dias)}
+
+    def _fila(self, z):
+        i = self._pos_z[z]
+        return i if self.valores.shape[0] > 1 else 0
+
+    def __getitem__(self, clave):
+        z, d = clave
+        return float(self.valores[self._fila(z), self._pos_d[d]])
+
+    def __iter__(self):
+        return ((z, d) for z in self.zonas for d in self.dias)
+
+    def __len__(self):
+        return len(self.zonas) * len(self.dias)
+
+    def __contains__(self, clave):
+        try:
+            z, d = clave
+        except (TypeError, ValueError):
+            return False
+        return z in self._pos_z and d in self._pos_d
+
+    def arreglo(self, G, D):
+        """Matriz (len(G) x len(D)) con ET[z, d]."""
+        filas = np.array([self._fila(z) for z in G], dtype=int)
+        cols = np.array([self._pos_d[d] for d in D], dtype=int)
+        return self.valores[np.ix_(filas, cols)]
+
+
+# ------------------ parametros por zona ------------------------
+def _meses(spec, n_dias):
+    """Mes de cada dia segun el calendario de la especificacion mensual."""
+    calendario = spec.get('calendario', 'real')
+    if calendario == "30dias":
+        return meses_30_dias(n_dias)
+    if calendario == "real":
+        return construir_calendario(int(spec.get('anio', 2025)), n_dias)['mes']
+    raise ValueError(f"calendario desconocido: {calendario!r} (opciones: '30dias', 'real')")
+
+
+def _ruta(ruta):
+    return ruta if os.path.isabs(ruta) else os.path.join(BASE, ruta)
+
+
+def _archivos_estacion(spec):
+    """CSV de estacion citados en la especificacion de ET (rutas absolutas)."""
+    if not isinstance(spec, dict):
+        return []
+    if 'estacion' in spec:
+        archivos = spec['estacion'].get('archivos', [])
+        return [_ruta(a) for a in ([archivos] if isinstance(archivos, str) else archivos)]
+    return [a for v in spec.values() for a in _archivos_estacion(v)]
+
+
+def _serie_et(spec, D, nombre):
+    """
+    ET de una zona (o comun) en D: numero, {mensual: ..., Kc: ...},
+    {estacion: {...}, Kc: ..., anio: ...} (et_referencia.py) o {dia: valor}.
+    """
+    if isinstance(spec, (int, float)):
+        return np.full(len(D), float(spec))
+    if not isinstance(spec, dict):
+        raise ValueError(f"{CLAVE_ET} de {nombre}: se esperaba un numero o un mapping, no {spec!r}")
+    if 'mensual' in spec:
+        try:
+            return et_diaria(spec['mensual'], _meses(spec, len(D)), float(spec.get('Kc', 1.0)),
+                             spec.get('resto'))
+        except ValueError as e:
+            raise ValueError(f"{CLAVE_ET} de {nombre}: {e} (o declara 'resto')") from None
+    if 'estacion' in spec:
+        from et_referencia import et0_estacion, serie_horizonte
+        est = dict(spec['estacion'])
+        archivos = _archivos_estacion(spec)
+        est.pop('archivos', None)
+        columnas = est.pop('columnas', None)
+        fechas, diaria = et0_estacion(archivos, est, columnas)
+        anio = spec.get('anio')
+        return serie_horizonte(fechas, diaria, len(D), None if anio is None else int(anio)) \
+            * float(spec.get('Kc', 1.0))
+    por_dia = {int(k): float(v) for k, v in spec.items()}
+    faltan = [d for d in D if d not in por_dia]
+    if faltan:
+        raise ValueError(f"{CLAVE_ET} de {nombre}: faltan {len(faltan)} dias (primero: {faltan[0]})")
+    return np.array([por_dia[d] for d in D], dtype=float)
+
+
+def _es_por_zona(spec):
+    return isinstance(spec, dict) and 'mensual' not in spec and 'estacion' not in spec
+
+
+def _tabla_et(spec, G, D):
+    """Arreglo de ET: (1 x D) si es comun a todas las zonas, (G x D) si no."""
+    if not _es_por_zona(spec):
+        Kc = spec.get('Kc') if isinstance(spec, dict) else None
+        if isinstance(Kc, dict):                        # Kc por zona sobre una ET comun
+            base = _serie_et(dict(spec, Kc=1.0), D, "todas las zonas")
+            return et_zonas(base, _por_zona(Kc, G, 'Kc'))
+        return et_zonas(_serie_et(spec, D, "todas las zonas"))
+    spec = {str(k): v for k, v in spec.items()}
+    defecto = spec.get(POR_DEFECTO)
+    comun = _serie_et(defecto, D, POR_DEFECTO) if defecto is not None else None
+    _sin_zona(spec, G, CLAVE_ET, comun is not None)
+    ET = np.empty((len(G), len(D)))
+    for i, z in enumerate(G):
+        ET[i] = _serie_et(spec[z], D, z) if z in spec else comun
+    return ET
+
+
+def _por_zona(spec, G, clave):
+    """Escalar o arreglo por zona (en el orden de G)."""
+    if not isinstance(spec, dict):
+        return np.asarray(float(spec))
+    spec = {str(k): float(v) for k, v in spec.items()}
+    _sin_zona(spec, G, clave, POR_DEFECTO in spec)
+    return np.array([spec.get(z, spec.get(POR_DEFECTO)) for z in G], dtype=float)
+
+
+def _sin_zona(spec, G, clave, hay_defecto):
+    """Valida las llaves de un mapping por zona."""
+    conocidas = set(G)
+    extra = [k for k in spec if k != POR_DEFECTO and k not in conocidas]
+    if extra:
+        raise ValueError(f"{clave}: uga_id que no son zonas de riego: {extra[:5]}")
+    if not hay_defecto:
+        faltan = [z for z in G if z not in spec]
+        if faltan:
+            raise ValueError(f"{clave}: faltan {len(faltan)} zonas (primera: {faltan[0]}); "
+                             f"agrega '{POR_DEFECTO}'")
+
+
+# ------------------ lectura y cache ----------------------------
+def leer_zonas(ruta=RUTA_ZONAS):
+    """zonas.csv validado: uga_id unicos, grupo P/N y area > 0 en las de riego."""
+    zonas = pd.read_csv(ruta, dtype={'uga_id': str, 'type': str, 'uga_group': str},
+                        skipinitialspace=True)
+    zonas['uga_id'] = zonas['uga_id'].str.strip()
+    repetidas = zonas['uga_id'][zonas['uga_id'].duplicated()]
+    if len(repetidas):
+        raise ValueError(f"{ruta}: uga_id repetidos: {repetidas.head().tolist()}")
+    tipos = set(zonas['type']) - {'irr', 'lav'}
+    if tipos:
+        raise ValueError(f"{ruta}: type desconocido {sorted(tipos)} (opciones: irr, lav)")
+    riego = zonas[zonas['type'] == 'irr']
+    malas = riego[~riego['uga_group'].isin(['P', 'N']) | ~(riego['A_m2'] > 0)]
+    if len(malas):
+        raise ValueError(f"{ruta}: zonas de riego sin grupo P/N o sin area: {malas['uga_id'].head().tolist()}")
+    return zonas
+
+
+def _parsear(ruta_params, ruta_zonas):
+    """Lee ambos archivos y devuelve los arreglos que se guardan en la cache."""
+    with open(ruta_params, encoding="utf-8") as fh:
+        cfg = yaml.safe_load(fh)
+    zonas = leer_zonas(ruta_zonas)
+    riego = zonas[zonas['type'] == 'irr']
+    G = riego['uga_id'].tolist()
+    D = list(range(1, int(cfg['D']) + 1))
+    pars = {k: v for k, v in cfg.items() if k not in UMBRALES + (CLAVE_ET,)}
+    if isinstance(pars['D_proh'], dict):                # {anio: ..., dias_semana: [...]}
+        cal = construir_calendario(int(pars['D_proh'].get('anio', 2025)), len(D),
+                                   pars['D_proh'].get('dias_semana', DIAS_PROH_SEMANA))
+        pars['D_proh'] = cal['dia'][cal['proh']].tolist()
+    return {
+        'G': np.array(G, dtype=str),
+        'grupo': riego['uga_group'].to_numpy(dtype=str),
+        'A': riego['A_m2'].to_numpy(dtype=float),
+        'L': zonas.loc[zonas['type'] == 'lav', 'uga_id'].to_numpy(dtype=str),
+        'ET': _tabla_et(cfg[CLAVE_ET], G, D),
+        'omega_min': _por_zona(cfg[UMBRALES[0]], G, UMBRALES[0]),
+        'omega_max': _por_zona(cfg[UMBRALES[1]], G, UMBRALES[1]),
+        'pars': np.array(json.dumps(pars)),
+        'fuentes': np.array(json.dumps(_huellas(_archivos_estacion(cfg[CLAVE_ET])))),
+    }
+
+
+def _huellas(rutas):
+    """{ruta: sha256} de los archivos que no entran en la llave (CSV de estacion)."""
+    huellas = {}
+    for ruta in rutas:
+        with open(ruta, "rb") as fh:
+            huellas[ruta] = hashlib.sha256(fh.read()).hexdigest()
+    return huellas
+
+
+def _llave(ruta_params, ruta_zonas):
+    h = hashlib.sha256()
+    for ruta in (ruta_params, ruta_zonas, os.path.abspath(__file__)):
+        with open(ruta, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()
+
+
+def _arreglos(ruta_params, ruta_zonas, directorio):
+    """Arreglos leidos de la cache, o parseados y guardados si no estan."""
+    if directorio is None:
+        return _parsear(ruta_params, ruta_zonas)
+    ruta = os.path.join(directorio, _llave(ruta_params, ruta_zonas) + ".npz")
+    if os.path.exists(ruta):
+        with np.load(ruta) as npz:
+            arr = {k: npz[k] for k in npz.files}
+        # los CSV de estacion se revisan aparte: si cambiaron se vuelve a parsear
+        fuentes = json.loads(arr['fuentes'].item())
+        if _huellas(fuentes) == fuentes:
+            return arr
+    arr = _parsear(ruta_params, ruta_zonas)
+    os.makedirs(directorio, exist_ok=True)
+    tmp = os.path.join(directorio, f"tmp_{os.getpid()}.npz")
+    np.savez(tmp, **arr)
+    os.replace(tmp, ruta)
+    return arr
+
+
+def _umbral_pars(arr, G):
+    return arr.item() if arr.ndim == 0 else dict(zip(G, arr.tolist()))
+
+
+def cargar_datos(ruta_params=RUTA_PARAMS, ruta_zonas=RUTA_ZONAS, directorio=DIRECTORIO):
+    """
+    ruta_params : params.yaml (horizonte, parametros, umbrales y ET)
+    ruta_zonas  : zonas.csv (uga_id, type, uga_group, A_m2)
+    directorio  : carpeta de la cache de arreglos; None para no usarla
+    return      : dict con G, L, P, N, D, H, H_noc, D_proh, A, beta_z,
+                  pars, ET_dict (lo que reciben los constructores de modelo.py)
+    """
+    arr = _arreglos(ruta_params, ruta_zonas, directorio)
+    pars = json.loads(arr['pars'].item())
+    G, L = arr['G'].tolist(), arr['L'].tolist()
+    D = list(range(1, int(pars['D']) + 1))
+    pars[UMBRALES[0]] = _umbral_pars(arr['omega_min'], G)
+    pars[UMBRALES[1]] = _umbral_pars(arr['omega_max'], G)
+    grupo = arr['grupo']
+    beta = pars['beta_m_m3pkm'] * pars['L_turno_km']
+    return dict(
+        G=G, L=L,
+        P=arr['G'][grupo == 'P'].tolist(), N=arr['G'][grupo == 'N'].tolist(),
+        D=D, H=list(range(int(pars['H']))),
+        H_noc=list(pars['H_noc']), D_proh=list(pars['D_proh']),
+        A=dict(zip(G, arr['A'].tolist())),
+        beta_z={l: beta for l in L},
+        pars=pars,
+        ET_dict=TablaET(G, D, arr['ET']),
+    )
@@ -2,30 +2,24 @@
 #  ET constructor
 #  genera ET[(z,d)]  con d = 1…365  (mm/día)               |
 # ---------------------------------------------------------
-import datetime as dt
 import pandas as pd
 
-def build_ET_dict(irr_zones, month_et):
+from calendario import construir_calendario, et_diaria, et_zonas
+from cargar_datos import TablaET
+
+def build_ET_dict(irr_zones, month_et, Kc_zona=None, anio=2025):
     """
     irr_zones : lista de uga_id (irrigables) -> ['1001', '1002', …]
     month_et  : dict {1: mm, 2: mm, … 12: mm}  (mm/día)
+    Kc_zona   : opcional, coeficiente por zona (mismo orden que irr_zones)
+    anio      : año del calendario (2025 = año no bisiesto)
 
-    return     : dict {(z,d): mm}
+    return     : TablaET, se usa como dict {(z,d): mm} y guarda la matriz zonas x días
     """
-    # Pre-calculo: día calendario → mes (1–12)
-    day_to_month = {
-        d: (dt.date(2025, 1, 1) + dt.timedelta(days=d-1)).month   # 2025 = año no bisiesto
-        for d in range(1, 366)
-    }
-
-    # Construye el diccionario completo
-    ET = {}
-    for z in irr_zones:
-        for d in range(1, 366):
-            m = day_to_month[d]
-            # Si quisieras factor zona: multiplica aquí
-            ET[z, d] = month_et[m]             # * ajuste_zona[z]   # <--
-    return ET
+    # Mes de cada día calendario y ET diaria, vectorizados (calendario.py)
+    cal = construir_calendario(anio, 365)
+    ET = et_zonas(et_diaria(month_et, cal['mes']), Kc_zona)
+    return TablaET(irr_zones, cal['dia'].tolist(), ET)
 
 def load_irrigation_zones(csv_file='zonas.csv'):
     """
@@ -0,0 +1,106 @@
+# -------------------------------------------------------------
+#  Descomposicion por zona del modelo anual
+#  Las zonas de riego solo se acoplan a traves de la funcion objetivo
+#  (R1-R6 son por zona) y el bloque de lavado (ell, wwash, R7-R8) no
+#  comparte variables con el riego. Entonces el MILP se separa en:
+#    - un subproblema por zona de riego  (G = [z], L = [])
+#    - un subproblema de lavado          (G = [],  L = L)
+#  que se resuelven en paralelo en procesos separados, cada uno con su
+#  propio Env de Gurobi. La suma de los optimos es el optimo del modelo
+#  completo y la suma de las cotas es una cota valida.
+#  Con riego="dp" las zonas se resuelven en bloque con programacion
+#  dinamica (programacion_dinamica.py) y solo el lavado va a Gurobi.
+# -------------------------------------------------------------
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import gurobipy as gp #type: ignore
+
+from modelo import construir_modelo
+from solucion import Solucion, evaluar_objetivo
+from programacion_dinamica import resolver_dp
+
+
+def subproblemas(datos):
+    """
+    Separa datos en subproblemas independientes.
+
+    return : lista de (nombre, datos del subproblema)
+    """
+    set_P, set_N = set(datos['P']), set(datos['N'])
+    partes = []
+    for z in datos['G']:
+        s = dict(datos)
+        s['G'] = [z]
+        s['P'] = [z] if z in set_P else []
+        s['N'] = [z] if z in set_N else []
+        s['L'] = []
+        s['beta_z'] = {}
+        s['historia_ell'] = None
+        partes.append((f"zona {z}", s))
+    if datos['L']:
+        s = dict(datos)
+        s['G'], s['P'], s['N'] = [], [], []
+        s['omega_inicial'] = None
+        partes.append(("lavado", s))
+    return partes
+
+
+def _resolver_subproblema(args):
+    """Se ejecuta en el proceso hijo: construye, resuelve y devuelve la Solucion."""
+    nombre, datos, metodo, params = args
+    t0 = time.perf_counter()
+    with gp.Env(params={"OutputFlag": 0}) as env:
+        m, v = construir_modelo(datos, metodo=metodo, env=env)
+        for k, val in params.items():
+            m.setParam(k, val)
+        m.optimize()
+        if not m.SolCount:
+            raise RuntimeError(f"Subproblema {nombre} sin solucion (status {m.Status})")
+        sol = Solucion.desde_variables(v, datos, m)
+        m.dispose()
+    return nombre, sol, time.perf_counter() - t0
+
+
+def resolver_descompuesto(datos, metodo="disperso", params=None, procesos=None, riego="milp",
+                          verbose=True):
+    """
+    datos    : dict como en gurobi.py (puede venir agregado)
+    params   : parametros Gurobi por subproblema; por defecto Threads = 1
+               para no sobre-suscribir los nucleos
+    procesos : tamaño del pool (por defecto os.cpu_count())
+    riego    : "milp" (un MILP por zona) o "dp" (programacion dinamica exacta)
+    return   : Solucion sobre los ejes de datos; objetivo = suma de los
+               subproblemas y cota = suma de sus cotas
+    """
+    if riego not in ("milp", "dp"):
+        raise ValueError(f"riego desconocido: {riego!r} (opciones: 'milp', 'dp')")
+    params = dict({"Threads": 1}, **(params or {}))
+    partes = subproblemas(datos)
+    t0 = time.perf_counter()
+
+    sol = Solucion.vacia(datos)
+    cota = 0.0
+    if riego == "dp":
+        sol.insertar(resolver_dp(datos, verbose=verbose))
+        cota += evaluar_objetivo(sol, datos)
+        partes = [(nombre, s) for nombre, s in partes if not s['G']]
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(partes)))
+    # spawn: cada proceso parte limpio (Gurobi no es seguro tras un fork)
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=mp.get_context("spawn")) as pool:
+        tareas = [(nombre, s, metodo, params) for nombre, s in partes]
+        for nombre, parte, t in pool.map(_resolver_subproblema, tareas):
+            sol.insertar(parte)
+            cota += parte.cota if parte.cota is not None else parte.objetivo
+            if verbose:
+                print(f"  {nombre:<12} obj {parte.objetivo:>12,.2f}  {t:.1f} s")
+
+    sol.objetivo = evaluar_objetivo(sol, datos)
+    sol.cota = cota
+    if verbose:
+        gap = (sol.objetivo - cota) / max(abs(sol.objetivo), 1e-9)
+        print(f"Descomposicion: {len(partes)} subproblemas en {procesos} procesos, "
+              f"objetivo {sol.objetivo:,.2f} (gap {gap:.2%}) en {time.perf_counter() - t0:.1f} s")
+    return sol
@@ -0,0 +1,213 @@
+# -------------------------------------------------------------
+#  Barrido de escenarios de pesos y umbrales de humedad
+#  Un escenario solo cambia coeficientes de la funcion objetivo
+#  (alpha, beta, gamma, delta) y el lado derecho de R6
+#  (omega^{min}_z, omega^{max}_z), asi que el modelo se construye una
+#  vez y se modifica en el lugar entre escenarios:
+#    - modo "procesos"       : los escenarios se reparten entre procesos
+#                              (spawn, como descomposicion.py); cada uno
+#                              abre un Env con su presupuesto de hilos,
+#                              construye el modelo una sola vez y resuelve
+#                              sus escenarios en serie (la solucion anterior
+#                              queda como punto de partida del siguiente)
+#    - modo "multiescenario" : un solo modelo con NumScenarios de Gurobi
+#  Necesita un constructor matricial ("matricial", "disperso" o "diario").
+#
+#  Uso:
+#    python escenarios.py --alpha 1 10 100 --omega-min 70 75 --salida escenarios.csv
+#    python escenarios.py --gamma 0 1 --zonas 2 --dias 30 --procesos 2 --hilos 1
+# -------------------------------------------------------------
+import argparse
+import itertools
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import gurobipy as gp #type: ignore
+from gurobipy import GRB #type: ignore
+import numpy as np #type: ignore
+import pandas as pd #type: ignore
+
+from modelo import construir_modelo, por_zona, pesos_unitarios, columnas_objetivo, TERMINOS
+from solucion import Solucion
+from indicadores import cubo_kpi
+
+# umbral de humedad -> filas de R6 (m._humedad, modelo.py)
+UMBRALES = {'omega^{min}_z': 'omega_min', 'omega^{max}_z': 'omega_max'}
+MODOS = ("procesos", "multiescenario")
+
+
+def malla_escenarios(valores):
+    """
+    valores : dict parametro -> lista de valores,
+              p.ej. {'alpha': [1, 10], 'omega^{min}_z': [70, 75]}
+    return  : lista de escenarios (dict parametro -> valor), producto cartesiano
+    """
+    desconocidos = set(valores) - set(TERMINOS) - set(UMBRALES)
+    if desconocidos:
+        raise ValueError(f"Parametros que no se pueden barrer: {sorted(desconocidos)} "
+                         f"(opciones: {list(TERMINOS) + list(UMBRALES)})")
+    claves = list(valores)
+    return [dict(zip(claves, combo)) for combo in itertools.product(*(valores[k] for k in claves))]
+
+
+def aplicar_escenario(datos, escenario):
+    """datos con los pars del escenario (lo que no indica queda igual)."""
+    return dict(datos, pars=dict(datos['pars'], **escenario))
+
+
+def _preparar(datos, metodo, env):
+    """
+    Construye el modelo con todos los pesos en 1 y guarda, por termino de
+    la funcion objetivo, sus columnas con el coeficiente unitario.
+
+    return : (modelo, vistas, dict termino -> lista de (MVar, coeficientes))
+    """
+    m, v = construir_modelo(pesos_unitarios(datos), metodo=metodo, env=env)
+    if getattr(m, "_humedad", None) is None:
+        raise RuntimeError(f"El modelo {metodo!r} no trae las filas de R6 (m._humedad) "
+                           f"que se cambian por escenario")
+    return m, v, columnas_objetivo(m, v)
+
+
+def _fijar(m, unidades, datos, escenario, prefijo=""):
+    """
+    Carga en el modelo los coeficientes y lados derechos del escenario.
+    prefijo : "" (Obj, RHS) o "ScenN" (escenario m.Params.ScenarioNumber)
+    """
+    pars = dict(datos['pars'], **escenario)
+    for k, columnas in unidades.items():
+        peso = pars[k] if pars[k] is not None else 0.0
+        for mv, unidad in columnas:
+            mv.setAttr(prefijo + "Obj", peso * unidad)
+    n_dias = len(datos['D'])
+    for clave, nombre in UMBRALES.items():
+        filas = m._humedad[nombre]
+        if filas is not None:
+            por_z = np.array([por_zona(pars[clave], z) for z in datos['G']], dtype=float)
+            filas.setAttr(prefijo + "RHS", np.repeat(por_z, n_dias))
+
+
+def _fila(i, escenario, datos, sol, estado, segundos):
+    """Una fila de la tabla comparativa."""
+    fila = {'escenario': i, **escenario, 'estado': estado, 'segundos': segundos,
+            'objetivo': np.nan, 'cota': np.nan, 'gap': np.nan}
+    if sol is not None:
+        kpi = cubo_kpi(sol, aplicar_escenario(datos, escenario))
+        fila.update(objetivo=sol.objetivo, cota=sol.cota,
+                    gap=abs(sol.objetivo - sol.cota) / max(abs(sol.objetivo), 1e-9)
+                    if sol.cota is not None else np.nan,
+                    agua_total_m3=float(kpi['agua_zona'].sum()), **kpi['resumen'])
+    return fila
+
+
+def _resolver_lote(args):
+    """Se ejecuta en el proceso hijo: construye una vez y resuelve sus escenarios en serie."""
+    datos, lote, metodo, hilos, params = args
+    filas = []
+    with gp.Env(params={"OutputFlag": 0, "Threads": hilos}) as env:
+        m, v, unidades = _preparar(datos, metodo, env)
+        for k, val in params.items():
+            m.setParam(k, val)
+        for i, escenario in lote:
+            t0 = time.perf_counter()
+            _fijar(m, unidades, datos, escenario)
+            m.optimize()
+            sol = Solucion.desde_variables(v, datos, m) if m.SolCount else None
+            filas.append(_fila(i, escenario, datos, sol, m.Status, time.perf_counter() - t0))
+        m.dispose()
+    return filas
+
+
+def _resolver_multiescenario(datos, numerados, metodo, hilos, params):
+    """Todos los escenarios en un solo optimize (NumScenarios)."""
+    filas = []
+    with gp.Env(params={"OutputFlag": 0, "Threads": hilos}) as env:
+        m, v, unidades = _preparar(datos, metodo, env)
+        for k, val in params.items():
+            m.setParam(k, val)
+        _fijar(m, unidades, datos, {})
+        m.NumScenarios = len(numerados)
+        for s, (_, escenario) in enumerate(numerados):
+            m.Params.ScenarioNumber = s
+            _fijar(m, unidades, datos, escenario, prefijo="ScenN")
+        t0 = time.perf_counter()
+        m.optimize()
+        segundos = (time.perf_counter() - t0) / max(len(numerados), 1)
+        for s, (i, escenario) in enumerate(numerados):
+            m.Params.ScenarioNumber = s
+            hay = m.SolCount and m.ScenNObjVal < GRB.INFINITY
+            sol = Solucion.desde_variables(v, datos, m, atributo="ScenNX") if hay else None
+            filas.append(_fila(i, escenario, datos, sol, m.Status, segundos))
+        m.dispose()
+    return filas
+
+
+def barrer_escenarios(datos, escenarios, metodo="disperso", modo="procesos", procesos=None, hilos=1,
+                      params=None, verbose=True):
+    """
+    datos      : dict como en gurobi.py (puede venir agregado)
+    escenarios : lista de dicts parametro -> valor (malla_escenarios); lo que
+                 un escenario no indica queda como en datos['pars']
+    modo       : "procesos" o "multiescenario"
+    procesos   : tamaño del pool (por defecto os.cpu_count() // hilos)
+    hilos      : Threads de Gurobi por proceso
+    params     : otros parametros Gurobi por modelo (TimeLimit, MIPGap, ...)
+    return     : DataFrame con una fila por escenario: parametros, estado,
+                 segundos, objetivo, cota, gap e indicadores resumen
+    """
+    if modo not in MODOS:
+        raise ValueError(f"modo desconocido: {modo!r} (opciones: {', '.join(MODOS)})")
+    if metodo == "bucles":
+        raise ValueError("El barrido necesita un constructor matricial (matricial, disperso o diario)")
+    malla_escenarios({k: [v] for e in escenarios for k, v in e.items()})   # valida las claves
+    params = dict(params or {})
+    numerados = list(enumerate(escenarios))
+    t0 = time.perf_counter()
+
+    if modo == "multiescenario":
+        procesos = 1
+        filas = _resolver_multiescenario(datos, numerados, metodo, hilos, params)
+    else:
+        procesos = max(1, min(procesos or (os.cpu_count() or 1) // hilos or 1, len(numerados)))
+        lotes = [numerados[k::procesos] for k in range(procesos)]
+        # spawn: cada proceso parte limpio (Gurobi no es seguro tras un fork)
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=mp.get_context("spawn")) as pool:
+            tareas = [(datos, lote, metodo, hilos, params) for lote in lotes if lote]
+            filas = [f for parte in pool.map(_resolver_lote, tareas) for f in parte]
+
+    tabla = pd.DataFrame(filas).set_index('escenario').sort_index()
+    if verbose:
+        total = time.perf_counter() - t0
+        print(f"Escenarios: {len(tabla)} en {total:.1f} s con {procesos} procesos x {hilos} hilos "
+              f"({3600 * len(tabla) / max(total, 1e-9):,.0f} escenarios/h)")
+    return tabla
+
+
+if __name__ == "__main__":
+    from benchmark_construccion import instancia
+
+    ap = argparse.ArgumentParser()
+    for opcion, clave in [("--alpha", "alpha"), ("--beta", "beta"), ("--gamma", "gamma"),
+                          ("--delta", "delta"), ("--omega-min", "omega^{min}_z"),
+                          ("--omega-max", "omega^{max}_z")]:
+        ap.add_argument(opcion, dest=clave, type=float, nargs="+")
+    ap.add_argument("--constructor", default="disperso")
+    ap.add_argument("--modo", default="procesos", choices=MODOS)
+    ap.add_argument("--procesos", type=int, default=None)
+    ap.add_argument("--hilos", type=int, default=1)
+    ap.add_argument("--time-limit", type=float, default=None)
+    ap.add_argument("--zonas", type=int, default=None)
+    ap.add_argument("--dias", type=int, default=None)
+    ap.add_argument("--salida", default="escenarios.csv")
+    args = vars(ap.parse_args())
+
+    valores = {k: args[k] for k in list(TERMINOS) + list(UMBRALES) if args[k]}
+    tabla = barrer_escenarios(instancia(args["zonas"], args["dias"]), malla_escenarios(valores),
+                              metodo=args["constructor"], modo=args["modo"], procesos=args["procesos"],
+                              hilos=args["hilos"],
+                              params={"TimeLimit": args["time_limit"]} if args["time_limit"] else None)
+    print(tabla.to_string())
+    tabla.to_csv(args["salida"])
+    print(f"Tabla guardada en {args['salida']}")
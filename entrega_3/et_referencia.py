@@ -0,0 +1,305 @@
+# -------------------------------------------------------------
+#  ET de referencia FAO-56 Penman-Monteith desde una estacion local
+#  Reemplaza la tabla mensual leida de un grafico (month_ET x Kc_avg)
+#  por la ET0 calculada hora a hora con los registros de la estacion:
+#    leer_estacion : CSV horarios (uno o varios años) con fecha,
+#                    temperatura (°C), humedad relativa (%), viento (m/s a
+#                    `altura_viento` m) y radiacion global (W/m2 o MJ/m2/h)
+#    et0_horaria   : FAO-56 ec. 53 (Cn = 37, Cd = 0.34) vectorizada sobre
+#                    toda la serie; Ra horaria con la ec. 28 y G = 0.1 Rn
+#                    de dia / 0.5 Rn de noche
+#    et0_diaria    : suma por fecha (dias con menos de `min_horas` -> NaN)
+#    serie_horizonte / tabla_et : ET0 de los dias del horizonte, por Kc de
+#                    cada zona -> TablaET (zonas x dias) para modelo.py
+#  La serie diaria se guarda en cache_datos/ con llave = hash de los CSV,
+#  de las opciones y de este modulo. En params.yaml se usa con
+#    ET_{z,d}: {estacion: {archivos: [...], latitud: ...}, Kc: ..., anio: ...}
+#  (ver cargar_datos.py).
+#
+#  Uso: python et_referencia.py estacion_2019.csv estacion_2020.csv --anio 2020
+# -------------------------------------------------------------
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np #type: ignore
+import pandas as pd #type: ignore
+
+from cargar_datos import DIRECTORIO, TablaET
+from calendario import et_zonas
+
+# nombre de cada magnitud en los CSV (se puede cambiar con columnas=...)
+COLUMNAS = dict(fecha="fecha", temperatura="temp_c", humedad="hr_pct",
+                viento="viento_ms", radiacion="rad_wm2")
+# factor a MJ/m2/h de cada unidad de radiacion aceptada
+UNIDADES_RAD = {"W/m2": 0.0036, "MJ/m2/h": 1.0}
+# la marca de tiempo de cada registro es el inicio o el fin de su hora
+MARCAS = ("inicio", "fin")
+
+# estacion de referencia: Las Condes (Santiago), hora estandar UTC-4
+OPCIONES = dict(latitud=-33.41, longitud=-70.55, altitud=750.0, huso=-4.0,
+                altura_viento=2.0, unidad_rad="W/m2", marca="fin", min_horas=20)
+
+GSC = 0.0820          # constante solar, MJ/m2/min
+SIGMA_H = 2.043e-10   # Stefan-Boltzmann por hora, MJ/m2/h/K^4
+ALBEDO = 0.23
+RATIO_NOCHE = 0.8     # Rs/Rso antes de la primera hora de sol de la serie
+
+
+def _opciones(opciones):
+    op = dict(OPCIONES, **(opciones or {}))
+    extra = sorted(set(op) - set(OPCIONES))
+    if extra:
+        raise ValueError(f"opciones desconocidas: {extra} (opciones: {', '.join(OPCIONES)})")
+    if op['unidad_rad'] not in UNIDADES_RAD:
+        raise ValueError(f"unidad_rad desconocida: {op['unidad_rad']!r} "
+                         f"(opciones: {', '.join(map(repr, UNIDADES_RAD))})")
+    if op['marca'] not in MARCAS:
+        raise ValueError(f"marca desconocida: {op['marca']!r} (opciones: {', '.join(map(repr, MARCAS))})")
+    return op
+
+
+# ------------------ lectura ------------------------------------
+def leer_estacion(archivos, columnas=None):
+    """
+    archivos : ruta o lista de rutas de CSV horarios (se concatenan; una
+               hora repetida en varios archivos se queda con la ultima)
+    columnas : nombres de las columnas si no son los de COLUMNAS
+    return   : dict de vectores: fecha (datetime64[m]), temperatura,
+               humedad, viento, radiacion, en orden cronologico
+    """
+    if isinstance(archivos, (str, os.PathLike)):
+        archivos = [archivos]
+    col = dict(COLUMNAS, **(columnas or {}))
+    partes = []
+    for ruta in archivos:
+        df = pd.read_csv(ruta, usecols=list(col.values()), skipinitialspace=True)
+        partes.append(df.rename(columns={v: k for k, v in col.items()}))
+    if not partes:
+        raise ValueError("No se entregaron archivos de la estacion")
+    df = pd.concat(partes, ignore_index=True)
+    df['fecha'] = pd.to_datetime(df['fecha'])
+    df = df.drop_duplicates('fecha', keep='last').sort_values('fecha')
+    serie = {'fecha': df['fecha'].to_numpy().astype('datetime64[m]')}
+    for k in ('temperatura', 'humedad', 'viento', 'radiacion'):
+        serie[k] = pd.to_numeric(df[k], errors='coerce').to_numpy(dtype=float)
+    return serie
+
+
+# ------------------ FAO-56 -------------------------------------
+def _presion_vapor(T):
+    """e°(T) en kPa (ec. 11)."""
+    return 0.6108 * np.exp(17.27 * T / (T + 237.3))
+
+
+def radiacion_extraterrestre(medio, latitud, longitud, huso):
+    """
+    medio  : punto medio de cada hora (datetime64, hora estandar local)
+    return : (Ra en MJ/m2/h (ec. 28), seno de la altura del sol en el punto medio)
+    """
+    dia = medio.astype('datetime64[D]')
+    J = (dia - dia.astype('datetime64[Y]')).astype(np.int64) + 1
+    hora = (medio - dia).astype('timedelta64[m]').astype(np.int64) / 60.0
+    phi = np.radians(latitud)
+    dr = 1 + 0.033 * np.cos(2 * np.pi * J / 365)
+    delta = 0.409 * np.sin(2 * np.pi * J / 365 - 1.39)
+    b = 2 * np.pi * (J - 81) / 364
+    Sc = 0.1645 * np.sin(2 * b) - 0.1255 * np.cos(b) - 0.025 * np.sin(b)
+    # Lz y Lm en grados al oeste de Greenwich (ec. 31)
+    Lz, Lm = -15.0 * huso, -longitud
+    omega = np.pi / 12 * ((hora + 0.06667 * (Lz - Lm) + Sc) - 12)
+    omega_s = np.arccos(np.clip(-np.tan(phi) * np.tan(delta), -1.0, 1.0))
+    w1 = np.clip(omega - np.pi / 24, -omega_s, omega_s)
+    w2 = np.clip(omega + np.pi / 24, -omega_s, omega_s)
+    Ra = 12 * 60 / np.pi * GSC * dr * ((w2 - w1) * np.sin(phi) * np.sin(delta)
+                                      + np.cos(phi) * np.cos(delta) * (np.sin(w2) - np.sin(w1)))
+    sen_altura = np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.cos(omega)
+    return np.maximum(Ra, 0.0), sen_altura
+
+
+def _arrastrar(valores, validos, inicial):
+    """Ultimo valor valido hacia adelante (los primeros sin valor -> inicial)."""
+    idx = np.where(validos, np.arange(valores.size), -1)
+    np.maximum.accumulate(idx, out=idx)
+    return np.where(idx >= 0, valores[np.maximum(idx, 0)], inicial)
+
+
+def et0_horaria(serie, opciones=None):
+    """
+    serie    : dict de leer_estacion
+    opciones : cambios sobre OPCIONES (latitud, longitud, altitud, huso, ...)
+    return   : (punto medio de cada hora, ET0 en mm/h)
+    """
+    op = _opciones(opciones)
+    media_hora = np.timedelta64(30, 'm')
+    medio = serie['fecha'] + (-media_hora if op['marca'] == "fin" else media_hora)
+    T = serie['temperatura']
+    HR = np.clip(serie['humedad'], 0.0, 100.0)
+    z = op['altura_viento']
+    u2 = serie['viento'] * (4.87 / np.log(67.8 * z - 5.42)) if z != 2.0 else serie['viento']
+    Rs = np.maximum(serie['radiacion'], 0.0) * UNIDADES_RAD[op['unidad_rad']]
+
+    P = 101.3 * ((293 - 0.0065 * op['altitud']) / 293) ** 5.26
+    gamma = 0.665e-3 * P
+    es = _presion_vapor(T)
+    ea = es * HR / 100
+    Delta = 4098 * es / (T + 237.3) ** 2
+
+    Ra, sen_altura = radiacion_extraterrestre(medio, op['latitud'], op['longitud'], op['huso'])
+    Rso = (0.75 + 2e-5 * op['altitud']) * Ra
+    # Rs/Rso solo con el sol alto (> 0.3 rad); de noche se arrastra el de la ultima hora con sol
+    sol_alto = (sen_altura > np.sin(0.3)) & (Rso > 0)
+    ratio = np.clip(np.divide(Rs, Rso, out=np.zeros_like(Rs), where=Rso > 0), 0.3, 1.0)
+    ratio = _arrastrar(ratio, sol_alto, RATIO_NOCHE)
+    Rnl = SIGMA_H * (T + 273.16) ** 4 * (0.34 - 0.14 * np.sqrt(ea)) * (1.35 * ratio - 0.35)
+    Rn = (1 - ALBEDO) * Rs - Rnl
+    G = np.where(Ra > 0, 0.1, 0.5) * Rn
+
+    et0 = ((0.408 * Delta * (Rn - G) + gamma * 37 / (T + 273) * u2 * (es - ea))
+           / (Delta + gamma * (1 + 0.34 * u2)))
+    return medio, et0
+
+
+def et0_diaria(medio, et0, min_horas=OPCIONES['min_horas']):
+    """
+    medio, et0 : salida de et0_horaria
+    min_horas  : horas con dato necesarias para aceptar el dia; con menos
+                 de 24 se escala el promedio horario a 24 h
+    return     : (fechas datetime64[D] consecutivas, ET0 en mm/dia; NaN
+                 donde falta el dia)
+    """
+    ok = ~np.isnan(et0)
+    dia = medio.astype('datetime64[D]')
+    if not ok.any():
+        raise ValueError("La estacion no tiene ninguna hora con todos los datos")
+    inicio = dia[ok].min()
+    pos = (dia[ok] - inicio).astype(np.int64)
+    n = int(pos.max()) + 1
+    suma = np.bincount(pos, weights=et0[ok], minlength=n)
+    horas = np.bincount(pos, minlength=n)
+    diaria = np.full(n, np.nan)
+    completos = horas >= min_horas
+    diaria[completos] = np.maximum(suma[completos] * 24 / horas[completos], 0.0)
+    return inicio + np.arange(n), diaria
+
+
+# ------------------ horizonte del modelo -----------------------
+def serie_horizonte(fechas, diaria, n_dias, anio=None):
+    """
+    fechas, diaria : salida de et0_diaria
+    n_dias         : largo del horizonte (el dia d es la posicion d-1)
+    anio           : año del dia 1; None = climatologia (promedio de los
+                     años por mes-dia). Los dias sin dato en `anio` usan la
+                     climatologia y los que tampoco tienen se interpolan.
+    return         : vector ET0 (mm/dia) de largo n_dias
+    """
+    ok = ~np.isnan(diaria)
+    mes_dia = _mes_dia(fechas)
+    clima_suma = np.bincount(mes_dia[ok], weights=diaria[ok], minlength=1232)
+    clima_n = np.bincount(mes_dia[ok], minlength=1232)
+    clima = np.divide(clima_suma, clima_n, out=np.full(1232, np.nan), where=clima_n > 0)
+
+    dias = np.datetime64(f"{2025 if anio is None else anio:04d}-01-01") + np.arange(n_dias)
+    serie = clima[_mes_dia(dias)]
+    if anio is not None:
+        pos = (dias - fechas[0]).astype(np.int64)
+        dentro = (pos >= 0) & (pos < fechas.size)
+        propia = np.full(n_dias, np.nan)
+        propia[dentro] = diaria[pos[dentro]]
+        serie = np.where(np.isnan(propia), serie, propia)
+    faltan = np.isnan(serie)
+    if faltan.all():
+        raise ValueError("La estacion no tiene datos para ningun dia del horizonte")
+    if faltan.any():
+        x = np.arange(n_dias)
+        serie[faltan] = np.interp(x[faltan], x[~faltan], serie[~faltan])
+    return serie
+
+
+def _mes_dia(fechas):
+    """mes * 100 + dia de cada fecha (clave de la climatologia)."""
+    mes = fechas.astype('datetime64[M]')
+    return ((mes.astype(np.int64) % 12 + 1) * 100
+            + (fechas - mes.astype('datetime64[D]')).astype(np.int64) + 1)
+
+
+# ------------------ cache --------------------------------------
+def _llave(archivos, columnas, op):
+    h = hashlib.sha256()
+    for ruta in list(archivos) + [os.path.abspath(__file__)]:
+        with open(ruta, "rb") as fh:
+            h.update(fh.read())
+    h.update(json.dumps([dict(COLUMNAS, **(columnas or {})), op], sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def et0_estacion(archivos, opciones=None, columnas=None, directorio=DIRECTORIO):
+    """
+    ET0 diaria de la estacion, leida de la cache si los CSV y las opciones
+    no cambiaron.
+
+    directorio : carpeta de la cache; None para no usarla
+    return     : (fechas datetime64[D], ET0 en mm/dia)
+    """
+    if isinstance(archivos, (str, os.PathLike)):
+        archivos = [archivos]
+    op = _opciones(opciones)
+    ruta = None
+    if directorio is not None:
+        ruta = os.path.join(directorio, f"et0_{_llave(archivos, columnas, op)}.npz")
+        if os.path.exists(ruta):
+            with np.load(ruta) as npz:
+                return npz['fechas'], npz['et0']
+    medio, et0 = et0_horaria(leer_estacion(archivos, columnas), op)
+    fechas, diaria = et0_diaria(medio, et0, op['min_horas'])
+    if ruta is not None:
+        os.makedirs(directorio, exist_ok=True)
+        tmp = os.path.join(directorio, f"tmp_et0_{os.getpid()}.npz")
+        np.savez(tmp, fechas=fechas, et0=diaria)
+        os.replace(tmp, ruta)
+    return fechas, diaria
+
+
+def tabla_et(archivos, G, D, Kc=1.0, anio=None, opciones=None, columnas=None, directorio=DIRECTORIO):
+    """
+    archivos : CSV horarios de la estacion
+    G, D     : zonas y dias del modelo
+    Kc       : coeficiente de cultivo comun o {uga_id: Kc} con todas las zonas de G
+    anio     : año del dia 1 (None = climatologia de todos los años)
+    return   : TablaET, se usa como ET_dict en los datos del modelo
+    """
+    fechas, diaria = et0_estacion(archivos, opciones, columnas, directorio)
+    base = serie_horizonte(fechas, diaria, len(D), anio)
+    if isinstance(Kc, dict):
+        faltan = [z for z in G if z not in Kc]
+        if faltan:
+            raise ValueError(f"Kc: faltan {len(faltan)} zonas (primera: {faltan[0]})")
+        return TablaET(G, D, et_zonas(base, [Kc[z] for z in G]))
+    return TablaET(G, D, et_zonas(base * float(Kc)))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("archivos", nargs="+", help="CSV horarios de la estacion")
+    ap.add_argument("--anio", type=int, default=None, help="año del horizonte (por defecto climatologia)")
+    ap.add_argument("--dias", type=int, default=365)
+    ap.add_argument("--Kc", type=float, default=1.0)
+    for k in ("latitud", "longitud", "altitud", "huso", "altura_viento"):
+        ap.add_argument(f"--{k.replace('_', '-')}", type=float, default=OPCIONES[k])
+    ap.add_argument("--unidad-rad", choices=list(UNIDADES_RAD), default=OPCIONES['unidad_rad'])
+    ap.add_argument("--marca", choices=MARCAS, default=OPCIONES['marca'])
+    ap.add_argument("--sin-cache", action="store_true")
+    args = ap.parse_args()
+
+    op = {k: getattr(args, k) for k in OPCIONES if k != "min_horas"}
+    t0 = time.perf_counter()
+    fechas, diaria = et0_estacion(args.archivos, op, directorio=None if args.sin_cache else DIRECTORIO)
+    t1 = time.perf_counter()
+    serie = serie_horizonte(fechas, diaria, args.dias, args.anio) * args.Kc
+    print(f"{fechas.size} dias de estacion ({fechas[0]} a {fechas[-1]}, {np.isnan(diaria).sum()} sin dato) "
+          f"en {t1 - t0:.3f} s")
+    mes = (np.datetime64(f"{args.anio or 2025:04d}-01-01") + np.arange(args.dias)).astype('datetime64[M]')
+    for m in np.unique(mes):
+        print(f"  {m}: ET {serie[mes == m].mean():.2f} mm/dia")
@@ -0,0 +1,134 @@
+# -------------------------------------------------------------
+#  Exportacion columnar de la solucion
+#  En vez de una fila de texto por variable (vars_solucion_optima.csv),
+#  cada familia se guarda dispersa (solo valores distintos de cero) en
+#  columnas binarias:
+#    zona, dia[, hora] : posicion en los ejes de la familia (enteros)
+#    valor             : float64
+#  mas las etiquetas de cada eje (uga_id, dia, hora) para decodificar.
+#  Formatos:
+#    "npz"     : un solo archivo <ruta>.npz (solo numpy)
+#    "parquet" : carpeta <ruta>/ con <familia>.parquet y ejes.json
+#                (requiere pyarrow o fastparquet)
+#  ell_solution.csv y vol_diario_por_fuente.csv se derivan de la
+#  solucion leida (indicadores.py).
+# -------------------------------------------------------------
+import importlib.util
+import json
+import os
+
+import numpy as np #type: ignore
+import pandas as pd #type: ignore
+
+from modelo import FAMILIAS
+from solucion import Solucion, ejes_familias
+
+COLUMNAS = ("zona", "dia", "hora")
+TIPOS = (np.int32, np.int16, np.int8)
+FORMATOS = ("npz", "parquet")
+
+
+def _columnas(arreglo):
+    """Coordenadas enteras y valores de las celdas distintas de cero."""
+    pos = np.nonzero(arreglo)
+    cols = {c: p.astype(t) for c, t, p in zip(COLUMNAS, TIPOS, pos)}
+    cols["valor"] = arreglo[pos]
+    return cols
+
+
+def _ruta(ruta, formato):
+    if formato not in FORMATOS:
+        raise ValueError(f"formato desconocido: {formato!r} (opciones: {', '.join(FORMATOS)})")
+    return ruta if formato == "parquet" or ruta.endswith(".npz") else ruta + ".npz"
+
+
+def _formato(ruta):
+    return "parquet" if os.path.isdir(ruta) else "npz"
+
+
+def _exigir_parquet():
+    if not any(importlib.util.find_spec(m) for m in ("pyarrow", "fastparquet")):
+        raise ImportError("El formato 'parquet' necesita pyarrow o fastparquet (pip install pyarrow); "
+                          "usa formato='npz'")
+
+
+def guardar_solucion(sol, ruta, formato="npz"):
+    """
+    sol     : Solucion
+    ruta    : destino sin extension (p.ej. "vars_solucion_optima")
+    formato : "npz" o "parquet"
+    return  : ruta escrita
+    """
+    ruta = _ruta(ruta, formato)
+    ejes = {f: [list(e) for e in sol.ejes[f]] for f in FAMILIAS}
+    if formato == "npz":
+        contenido = {"ejes": np.array(json.dumps(ejes, default=str))}
+        for f in FAMILIAS:
+            for c, v in _columnas(sol.arreglos[f]).items():
+                contenido[f"{f}.{c}"] = v
+        np.savez_compressed(ruta, **contenido)
+        return ruta
+    _exigir_parquet()
+    os.makedirs(ruta, exist_ok=True)
+    for f in FAMILIAS:
+        pd.DataFrame(_columnas(sol.arreglos[f])).to_parquet(os.path.join(ruta, f"{f}.parquet"), index=False)
+    with open(os.path.join(ruta, "ejes.json"), "w") as fh:
+        json.dump(ejes, fh, default=str)
+    return ruta
+
+
+def _leer_ejes(ruta):
+    if _formato(ruta) == "npz":
+        with np.load(ruta) as npz:
+            return json.loads(npz["ejes"].item())
+    with open(os.path.join(ruta, "ejes.json")) as fh:
+        return json.load(fh)
+
+
+def leer_familia(ruta, familia, etiquetas=False):
+    """
+    Una familia en formato largo: columnas zona, dia[, hora] (enteros) y valor.
+    etiquetas=True agrega uga_id, day[, hour] con las etiquetas de los ejes.
+    """
+    if _formato(ruta) == "npz":
+        with np.load(ruta) as npz:
+            cols = {k.split(".", 1)[1]: npz[k] for k in npz.files if k.startswith(familia + ".")}
+        df = pd.DataFrame(cols)
+    else:
+        df = pd.read_parquet(os.path.join(ruta, f"{familia}.parquet"))
+    if etiquetas:
+        ejes = _leer_ejes(ruta)[familia]
+        for c, nombre, eje in zip(COLUMNAS, ("uga_id", "day", "hour"), ejes):
+            df[nombre] = np.asarray(eje, dtype=object)[df[c].to_numpy()]
+    return df
+
+
+def leer_solucion(ruta, datos=None):
+    """
+    Solucion densa desde un archivo de guardar_solucion.
+
+    datos : si se entrega, la solucion se ubica en los ejes de datos; las
+            claves que no estan en datos se ignoran y lo que no estaba en
+            el archivo queda en NaN (igual que arranque.leer_variables_csv)
+    """
+    ejes = _leer_ejes(ruta)
+    guardada = Solucion({}, {f: tuple(ejes[f]) for f in FAMILIAS})
+    for f in FAMILIAS:
+        df = leer_familia(ruta, f)
+        arreglo = np.zeros([len(e) for e in ejes[f]])
+        arreglo[tuple(df[c].to_numpy() for c in COLUMNAS[:arreglo.ndim])] = df["valor"].to_numpy()
+        guardada.arreglos[f] = arreglo
+    if datos is None:
+        return guardada
+
+    sol = Solucion.vacia(datos, valor=np.nan)
+    destino = ejes_familias(datos)
+    for f in FAMILIAS:
+        origen, pos = [], []
+        for eje_archivo, eje_datos in zip(ejes[f], destino[f]):
+            indice = {str(e): i for i, e in enumerate(eje_datos)}
+            comunes = [(i, indice[str(e)]) for i, e in enumerate(eje_archivo) if str(e) in indice]
+            origen.append([i for i, _ in comunes])
+            pos.append([j for _, j in comunes])
+        sol.arreglos[f][np.ix_(*pos)] = guardada.arreglos[f][np.ix_(*origen)]
+    return sol
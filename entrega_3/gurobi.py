@@ -2,335 +2,261 @@
 # -------------------------------------------------------------
 #  Optimizacion de uso de agua en Las Condes - Modelo MILP
 # -------------------------------------------------------------
-import gurobipy as gp #type: ignore
-from gurobipy import GRB #type: ignore
-import pandas as pd #type: ignore
-import matplotlib.pyplot as plt #type: ignore
-from params_and_sets import G, L, P, N, D, H, H_noc, D_proh, A, beta_z, pars, ET_dict
-import numpy as np #type: ignore
-import seaborn as sns #type: ignore
-
-# -------------------------------------------------------------
-# 1. Construccion del modelo de optimizacion
-# -------------------------------------------------------------
-m = gp.Model("Modelo_Hidrico_Las_Condes")
-
-# -------------------- VARIABLES ------------------------------
-omega = m.addVars(G, D, name="omega", lb=0)
-y     = m.addVars(G, D, H, vtype=GRB.BINARY, name="y")
-vpot  = m.addVars(G, D, H, name="vpot",  lb=0)
-vpozo = m.addVars(P, D, H, name="vpozo", lb=0)
-I     = m.addVars(G, D, H, name="I",     lb=0)
-u     = m.addVars(G, D, name="u",        lb=0)
-
-ell   = m.addVars(L, D, name="ell",  lb=0)
-wwash = m.addVars(L, D, vtype=GRB.BINARY, name="w")
-
-# ------------- RESTRICCIONES DEL MODELO ---------------------
-# R1: No regar en dias prohibidos
-for z in G:
-    for d in D_proh:
-        for h in H:
-            m.addConstr(y[z,d,h]==0)
-            m.addConstr(vpot[z,d,h]==0)
-            if z in P:
-                m.addConstr(vpozo[z,d,h]==0)
-
-# R2: Riego solo en horario nocturno permitido
-for z in G:
-    for d in D:
-        for h in set(H)-set(H_noc):
-            m.addConstr(y[z,d,h]==0)
-
-# R3: Compatibilidad de fuentes de agua
-for z in N:
-    for d in D:
-        for h in H:
-            m.addConstr(vpozo.get((z,d,h),0)==0)
-for z in P:
-    for d in D:
-        for h in H:
-            m.addConstr(vpot[z,d,h]==0)
-
-# R4: Caudal total y restriccion Big-M
-M_val = pars['M_m3ph'] or 1e4
-for z in G:
-    for d in D:
-        for h in H:
-            m.addConstr(I[z,d,h]==vpot[z,d,h]+vpozo.get((z,d,h),0))
-            m.addConstr(I[z,d,h]<=M_val*y[z,d,h])
-
-# R5: Balance de humedad en el suelo
-for z in G:
-    for d in list(D)[:-1]:
-        et_value = ET_dict[z, d+1] #este valor de ET es el real y ya incluye el kc multiplicado por el et_o.
-        m.addConstr(
-            omega[z,d+1] ==
-            omega[z,d] +
-            pars['eta']*1000/A[z] * gp.quicksum(I[z,d,h] for h in H)
-            - et_value
-            + u[z,d]
-        )
-
-# R6: Limites de humedad
-for z in G:
-    for d in D:
-        m.addConstr(omega[z,d] >= pars['omega^{min}_z'] - u[z,d])
-        m.addConstr(omega[z,d] <= pars['omega^{max}_z'])
-
-# R7: Capacidad de lavado
-for d in D:
-    m.addConstr(gp.quicksum(wwash[z,d] for z in L) <= 1)
-    for z in L:
-        m.addConstr(ell[z,d] <= min(beta_z[z], pars['C_cam_m3']) * wwash[z,d])
-
-# R8: Cobertura de lavado en 14 dias
-for z in L:
-    for d in range(14, pars['D']+1):
-        m.addConstr(gp.quicksum(ell[z,dd] for dd in range(d-13, d+1)) >= beta_z[z])
+import os
 
-# ------------------- FUNCIoN OBJETIVO ------------------------
-obj  = pars['alpha']*u.sum()  if pars['alpha'] is not None else 0
-obj += pars['beta']*I.sum()   if pars['beta'] is not None else 0
-obj += pars['gamma']*y.sum()  if pars['gamma'] is not None else 0
-obj += pars['delta']*ell.sum() if pars['delta'] is not None else 0
-m.setObjective(obj, GRB.MINIMIZE)
-
-# -------------------------------------------------------------
-# 3. Resolucion del modelo
-# -------------------------------------------------------------
-m.Params.OutputFlag = 1
-m.Params.TimeLimit = 1800  # Límite de tiempo: 30 minutos (1800 segundos)
-m.optimize()
-
-# -------------------------------------------------------------
-# 4. Guardar resultados principales en archivos CSV
-# -------------------------------------------------------------
-
-# 4.1 Solucion de lavado
-ell_df = pd.DataFrame(
-    [(z, d, ell[z, d].X) for z in L for d in D],
-    columns=["uga_id", "day", "ell_m3"]
-)
-ell_df.to_csv("ell_solution.csv", index=False)
-print("Solucion de lavado guardada en ell_solution.csv")
-
-# 4.2 Todas las variables optimas
-df_vars = pd.DataFrame([
-    {"var": v.VarName, "value": v.X} for v in m.getVars()
-])
-df_vars.to_csv("vars_solucion_optima.csv", index=False)
-print("CSV completo de variables guardado en vars_solucion_optima.csv")
-
-# 4.3 Volumen diario por fuente
-records = []
-for d in D:
-    pot  = sum(vpot[z, d, h].X  for z in G for h in H)
-    pozo = sum(vpozo[z, d, h].X for z in P for h in H)
-    wash = sum(ell[l, d].X      for l in L)
-    records.append({"day": d, "potable": pot, "pozo": pozo, "lavado": wash})
-
-df_vol = pd.DataFrame(records).set_index("day")
-df_vol.to_csv("vol_diario_por_fuente.csv")
-print("CSV diario por fuente guardado en vol_diario_por_fuente.csv")
-
-# -------------------------------------------------------------
-# 5. Análisis por zona
-# -------------------------------------------------------------
-
-# 5.1 Agua total aplicada por zona de riego (top 10)
-agua_por_zona = pd.DataFrame([
-    {'uga_id': z, 'agua_total': sum(I[z, d, h].X for d in D for h in H)}
-    for z in G
-])
-agua_por_zona = agua_por_zona.sort_values('agua_total', ascending=False)
-plt.figure(figsize=(10, 4))
-plt.bar(agua_por_zona['uga_id'][:10], agua_por_zona['agua_total'][:10])
-plt.xlabel('Zona de riego (uga_id)')
-plt.ylabel('Agua total aplicada [m³]')
-plt.title('Top 10 zonas de riego con mayor consumo anual de agua')
-plt.tight_layout()
-plt.savefig('top10_agua_total_por_zona.png', dpi=150)
-plt.show()
-
-# 5.2 Días con déficit de humedad por zona (top 10)
-deficit_por_zona = pd.DataFrame([
-    {'uga_id': z, 'dias_deficit': sum(omega[z, d].X <= pars['omega^{min}_z'] + 1e-3 for d in D)}
-    for z in G
-])
-deficit_por_zona = deficit_por_zona.sort_values('dias_deficit', ascending=False)
-plt.figure(figsize=(10, 4))
-plt.bar(deficit_por_zona['uga_id'][:10], deficit_por_zona['dias_deficit'][:10])
-plt.xlabel('Zona de riego (uga_id)')
-plt.ylabel('Días con déficit de humedad')
-plt.title('Top 10 zonas con más días de déficit de humedad')
-plt.tight_layout()
-plt.savefig('top10_deficit_por_zona.png', dpi=150)
-plt.show()
-
-# 5.3 Lavados por zona de lavado (top 10)
-lavados_por_zona = pd.DataFrame([
-    {'uga_id': l, 'lavados': sum(wwash[l, d].X for d in D)}
-    for l in L
-])
-lavados_por_zona = lavados_por_zona.sort_values('lavados', ascending=False)
-plt.figure(figsize=(8, 4))
-plt.bar(lavados_por_zona['uga_id'][:10], lavados_por_zona['lavados'][:10])
-plt.xlabel('Zona de lavado (uga_id)')
-plt.ylabel('Cantidad de lavados en el año')
-plt.title('Top 10 zonas de lavado con más lavados')
-plt.tight_layout()
-plt.savefig('top10_lavados_por_zona.png', dpi=150)
-plt.show()
-
-# 5.4 Humedad final por zona
-humedad_final = pd.DataFrame([
-    {'uga_id': z, 'humedad_final': omega[z, D[-1]].X}
-    for z in G
-])
-plt.figure(figsize=(10, 4))
-plt.bar(humedad_final['uga_id'][:10], humedad_final['humedad_final'][:10])
-plt.xlabel('Zona de riego (uga_id)')
-plt.ylabel('Humedad final [mm]')
-plt.title('Humedad final en las 10 primeras zonas al terminar el año')
-plt.tight_layout()
-plt.savefig('top10_humedad_final_por_zona.png', dpi=150)
-plt.show()
+import pandas as pd #type: ignore
+from cargar_datos import cargar_datos
+from modelo import construir_modelo
+from indicadores import cubo_kpi, tabla_lavado
+from exportacion import guardar_solucion, leer_solucion
+from reportes import generar_reportes, esperar_reportes
+from indices import reporte_reduccion
+from agregacion import agregar_zonas, expandir, reporte_agregacion
+from solucion import Solucion, evaluar_objetivo
+from multiobjetivo import construir_jerarquico, reporte_niveles
+from horizonte_rodante import resolver_horizonte_rodante
+from descomposicion import resolver_descompuesto
+from heuristica import resolver_heuristica
+from cache_modelo import construir_con_cache
+from perfil import Perfil
+from telemetria import Telemetria, combinar
+from lavado import programar_lavado, fijar_lavado
+from arranque import leer_variables_csv, leer_lavado_csv, desfase_semanal, desplazar, aplicar_arranque
 
 # -------------------------------------------------------------
-# 6. Análisis por grupo
+# 0. Configuracion de la corrida
 # -------------------------------------------------------------
-
-# Ejemplo: crear el diccionario grupo_por_zona desde params_and_sets.py si no existe
-# (puedes generarlo desde zonas.csv y pegarlo en params_and_sets.py)
-grupo_por_zona = {}
-for z in G:
-    if z in N:
-        grupo_por_zona[z] = 'N'
-    elif z in P:
-        grupo_por_zona[z] = 'P'
+# Constructor del modelo (ver modelo.py):
+#   "bucles"    -> formulacion original, fila por fila
+#   "matricial" -> misma formulacion con la API matricial (mucho mas rapido)
+#   "disperso"  -> solo variables admisibles, sin filas fijadas a cero (indices.py)
+#   "diario"    -> como "disperso" con horas agregadas: horas de valvula y volumen por zona-dia
+CONSTRUCTOR = "disperso"
+# Formulacion de R8 (cobertura de lavado en 14 dias), solo modo "monolitico";
+# comparacion en benchmark_cobertura.py:
+#   "ventanas"  -> una fila por tramo y dia con los 14 ell de la ventana
+#   "acumulada" -> volumen acumulado por tramo; cada ventana es una diferencia
+#                  de dos terminos (no ceros lineales en el horizonte)
+COBERTURA_R8 = "ventanas"
+# Reusar el modelo construido en una corrida anterior con los mismos insumos
+# (cache_modelo.py, en entrega_3/cache_modelos/); solo modo "monolitico"
+USAR_CACHE = True
+# Agrupar zonas con parametros identicos y resolver una por clase (agregacion.py).
+# La solucion se copia a cada UGA, asi que los resultados salen por zona original.
+AGREGAR_ZONAS = True
+# Resolucion:
+#   "monolitico" -> el año completo en un solo MILP
+#   "rodante"    -> ventanas de VENTANA_DIAS + ANTICIPACION_DIAS (horizonte_rodante.py)
+#   "descompuesto" -> un MILP por zona + uno de lavado en paralelo (descomposicion.py)
+#   "heuristica"   -> plan goloso con numpy, sin Gurobi (heuristica.py)
+MODO_RESOLUCION = "monolitico"
+VENTANA_DIAS = 14
+ANTICIPACION_DIAS = 7
+PARAMS_VENTANA = {"TimeLimit": 60, "MIPGap": 1e-3}
+# Cota del modo "rodante" con la relajacion LP del modelo anual completo:
+# arma el modelo de todo el año (memoria del monolitico), por eso es opcional
+COTA_MONOLITICA = False
+COTA_TIME_LIMIT = 300        # segundos para esa relajacion
+PROCESOS = None  # None -> todos los nucleos
+PARAMS_SUBPROBLEMA = {"TimeLimit": 600, "MIPGap": 1e-4}
+# Funcion objetivo, solo modo "monolitico":
+#   "ponderado"  -> alpha*deficit + beta*riego + gamma*activaciones + delta*lavado
+#   "jerarquico" -> deficit, luego volumen, luego activaciones, con prioridades,
+#                   tolerancias y tiempo por nivel (multiobjetivo.NIVELES)
+OBJETIVO = "ponderado"
+# Lavado de calles en modo "monolitico" (lavado.py):
+#   "modelo"   -> R7-R8 con sus binarias dentro del MILP
+#   "fijo"     -> programa ciclico de lavado.py fijo en el MILP (solo decide el riego;
+#                 el bloque es independiente, asi que el optimo se mantiene si el
+#                 programa es optimo, lo que lavado.py informa)
+#   "arranque" -> el programa como MIP start de ell y wwash
+LAVADO = "modelo"
+# Riego por zona en modo "descompuesto": "milp" o "dp" (programacion_dinamica.py)
+RIEGO_SUBPROBLEMA = "milp"
+# MIP start desde una corrida anterior (arranque.py), solo modo "monolitico":
+#   None, "results/vars_solucion_optima.csv" (todas las variables)
+#   o "results/vars_solucion_optima.npz" / carpeta parquet (exportacion.py)
+#   o "results/ell_solution.csv" (solo lavado; el resto lo completa Gurobi)
+#   o "heuristica" (plan de heuristica.py)
+ARRANQUE = None
+# (año de la corrida anterior, año actual) para correr el calendario y que
+# calcen los dias de la semana; None si es el mismo año
+ARRANQUE_ANIOS = None
+# Formato de la solucion completa (exportacion.py):
+#   "npz" / "parquet" -> columnar y dispersa, por familia de variables
+#   "csv"             -> vars_solucion_optima.csv (una fila por variable)
+EXPORTAR_VARIABLES = "npz"
+# Graficos PNG (reportes.py, backend Agg, sin ventanas), en paralelo con
+# la escritura de resultados; PROCESOS_REPORTES = 0 los dibuja en este proceso
+GENERAR_REPORTES = True
+PROCESOS_REPORTES = None
+# Perfil de la corrida (perfil.py): tiempo de pared y CPU y memoria por fase,
+# filas / no ceros / tiempo por familia R1-R8 y presolve vs B&B, en perfil_corrida.json
+PERFIL = True
+# Telemetria de la resolucion (telemetria.py), solo modo "monolitico": serie de
+# incumbente / cota / gap / nodos / trabajo en telemetria.npz y cada incumbente
+# nuevo con agua total y dias con deficit en telemetria_incumbentes.jsonl
+TELEMETRIA = True
+TELEMETRIA_INTERVALO = 1.0   # segundos entre filas de la serie sin cambios
+
+# Datos de entrada (cargar_datos.py): parametros y zonas
+RUTA_PARAMS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "params.yaml")
+RUTA_ZONAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zonas.csv")
+
+# El resto solo corre como script: el modo "descompuesto" y los reportes
+# lanzan procesos (spawn) que vuelven a importar este archivo, y no deben
+# volver a leer los datos (les llegan en los argumentos).
+if __name__ == "__main__":
+    perfil = Perfil(PERFIL)
+    perfil.fase("datos")
+    datos = cargar_datos(RUTA_PARAMS, RUTA_ZONAS)
+    G, L = datos['G'], datos['L']
+
+    # -------------------------------------------------------------
+    # 1. Construccion del modelo de optimizacion
+    # -------------------------------------------------------------
+    perfil.fase("agregacion")
+    datos_modelo, clases = datos, None
+    if AGREGAR_ZONAS:
+        datos_modelo, clases = agregar_zonas(datos)
+        reporte_agregacion(datos, clases)
+    if CONSTRUCTOR in ("disperso", "diario"):
+        reporte_reduccion(datos_modelo, metodo=CONSTRUCTOR)
+
+    # -------------------------------------------------------------
+    # 3. Resolucion del modelo
+    # -------------------------------------------------------------
+    if OBJETIVO not in ("ponderado", "jerarquico"):
+        raise ValueError(f"OBJETIVO desconocido: {OBJETIVO!r}")
+    if OBJETIVO == "jerarquico" and MODO_RESOLUCION != "monolitico":
+        raise ValueError("OBJETIVO = 'jerarquico' solo esta disponible en modo 'monolitico'")
+    if LAVADO not in ("modelo", "fijo", "arranque"):
+        raise ValueError(f"LAVADO desconocido: {LAVADO!r}")
+    if MODO_RESOLUCION == "monolitico":
+        perfil.fase("construccion")
+        construir = construir_con_cache if USAR_CACHE and CONSTRUCTOR != "bucles" else construir_modelo
+        if OBJETIVO == "jerarquico":
+            m, variables = construir_jerarquico(datos_modelo, metodo=CONSTRUCTOR, construir=construir,
+                                                registro=perfil.registro, cobertura=COBERTURA_R8)
+        else:
+            m, variables = construir(datos_modelo, metodo=CONSTRUCTOR, registro=perfil.registro,
+                                     cobertura=COBERTURA_R8)
+        perfil.fase("arranque")
+        if ARRANQUE == "heuristica":
+            aplicar_arranque(m, variables, resolver_heuristica(datos_modelo))
+        elif ARRANQUE is not None:
+            if ARRANQUE.endswith("ell_solution.csv"):
+                leer = leer_lavado_csv
+            elif ARRANQUE.endswith(".csv"):
+                leer = leer_variables_csv
+            else:
+                leer = leer_solucion
+            previa = leer(ARRANQUE, datos)
+            if ARRANQUE_ANIOS is not None:
+                previa = desplazar(previa, desfase_semanal(*ARRANQUE_ANIOS))
+            aplicar_arranque(m, variables, previa)
+        if LAVADO == "fijo":
+            fijar_lavado(m, variables, programar_lavado(datos_modelo))
+        elif LAVADO == "arranque":
+            aplicar_arranque(m, variables, programar_lavado(datos_modelo), familias=["ell", "wwash"])
+        m.Params.OutputFlag = 1
+        m.Params.TimeLimit = 1800  # Límite de tiempo: 30 minutos (1800 segundos)
+        telemetria = Telemetria(variables, datos_modelo, intervalo=TELEMETRIA_INTERVALO) if TELEMETRIA else None
+        perfil.fase("resolucion")
+        try:
+            m.optimize(combinar(perfil.callback(), telemetria.callback() if telemetria else None))
+        finally:
+            if telemetria is not None:
+                telemetria.cerrar()
+        perfil.resolucion(m)
+        if telemetria is not None:
+            telemetria.rendimiento(m.Params.TimeLimit)
+            print(f"Telemetria guardada en {telemetria.guardar('telemetria.npz')}")
+        perfil.fase("extraccion")
+        sol = Solucion.desde_variables(variables, datos_modelo, m)
+        if OBJETIVO == "jerarquico":
+            reporte_niveles(m).to_csv("objetivo_jerarquico.csv", index=False)
+            sol.objetivo = evaluar_objetivo(sol, datos_modelo)
+    elif MODO_RESOLUCION == "rodante":
+        perfil.fase("resolucion")
+        sol = resolver_horizonte_rodante(datos_modelo, largo=VENTANA_DIAS,
+                                         anticipacion=ANTICIPACION_DIAS,
+                                         metodo=CONSTRUCTOR, params=PARAMS_VENTANA,
+                                         calcular_cota=COTA_MONOLITICA, tiempo_cota=COTA_TIME_LIMIT)
+    elif MODO_RESOLUCION == "descompuesto":
+        perfil.fase("resolucion")
+        sol = resolver_descompuesto(datos_modelo, metodo=CONSTRUCTOR,
+                                    params=PARAMS_SUBPROBLEMA, procesos=PROCESOS,
+                                    riego=RIEGO_SUBPROBLEMA)
+    elif MODO_RESOLUCION == "heuristica":
+        perfil.fase("resolucion")
+        sol = resolver_heuristica(datos_modelo)
     else:
-        grupo_por_zona[z] = 'Otro'
-
-# 1. Agua total aplicada por grupo de zonas de riego
-agua_por_grupo = {}
-for z in G:
-    grupo = grupo_por_zona[z]
-    agua = sum(I[z, d, h].X for d in D for h in H)
-    agua_por_grupo[grupo] = agua_por_grupo.get(grupo, 0) + agua
-
-plt.figure(figsize=(6,4))
-plt.bar(agua_por_grupo.keys(), agua_por_grupo.values())
-plt.xlabel('Grupo de zonas de riego')
-plt.ylabel('Agua total aplicada [m³]')
-plt.title('Consumo anual de agua por grupo de zonas')
-plt.tight_layout()
-plt.savefig('agua_total_por_grupo.png', dpi=150)
-plt.show()
-
-# 2. Días con déficit de humedad por grupo
-
-deficit_por_grupo = {}
-for z in G:
-    grupo = grupo_por_zona[z]
-    dias_deficit = sum(omega[z, d].X <= pars['omega^{min}_z'] + 1e-3 for d in D)
-    deficit_por_grupo[grupo] = deficit_por_grupo.get(grupo, 0) + dias_deficit
-
-plt.figure(figsize=(6,4))
-plt.bar(deficit_por_grupo.keys(), deficit_por_grupo.values())
-plt.xlabel('Grupo de zonas de riego')
-plt.ylabel('Total días con déficit de humedad')
-plt.title('Días con déficit de humedad por grupo de zonas')
-plt.tight_layout()
-plt.savefig('deficit_por_grupo.png', dpi=150)
-plt.show()
-
-# 3. Lavados por grupo de zonas de lavado
-# (Si tienes grupos para L, puedes adaptar esto. Aquí se agrupa todo como "Lavado")
-lavados_total = sum(sum(wwash[l, d].X for d in D) for l in L)
-plt.figure(figsize=(4,4))
-plt.bar(['Lavado'], [lavados_total])
-plt.xlabel('Grupo de zonas de lavado')
-plt.ylabel('Cantidad de lavados en el año')
-plt.title('Cantidad total de lavados')
-plt.tight_layout()
-plt.savefig('lavados_total.png', dpi=150)
-plt.show()
-
-# 4. Promedio diario de agua aplicada (todas las zonas)
-agua_diaria = [sum(I[z, d, h].X for z in G for h in H) for d in D]
-plt.figure(figsize=(8,4))
-plt.plot(range(1, len(D)+1), agua_diaria)
-plt.xlabel('Día del año')
-plt.ylabel('Agua total aplicada [m³]')
-plt.title('Agua total aplicada por día (todas las zonas)')
-plt.tight_layout()
-plt.savefig('agua_promedio_diaria.png', dpi=150)
-plt.show()
-
-# 5. Boxplot de agua aplicada por grupo
-# Prepara los datos para el boxplot
-data = []
-for z in G:
-    grupo = grupo_por_zona[z]
-    agua = sum(I[z, d, h].X for d in D for h in H)
-    data.append({'grupo': grupo, 'agua': agua})
-df_box = pd.DataFrame(data)
-plt.figure(figsize=(6,4))
-sns.boxplot(x='grupo', y='agua', data=df_box)
-plt.xlabel('Grupo de zonas de riego')
-plt.ylabel('Agua total aplicada [m³]')
-plt.title('Distribución de agua aplicada por grupo')
-plt.tight_layout()
-plt.savefig('boxplot_agua_por_grupo.png', dpi=150)
-plt.show()
-
-# -------------------------------------------------------------
-# 7. Análisis temporal
-# -------------------------------------------------------------
-
-# 7.2 Gráfico de volúmenes diarios por fuente
-plt.figure(figsize=(10, 4))
-df_vol.plot(kind="bar", stacked=True, width=1.0, ax=plt.gca(),
-            color={"potable": "steelblue", "pozo": "seagreen", "lavado": "darkorange"})
-plt.xlabel("Día del año (1–365)")
-plt.ylabel("Volumen [m³]")
-plt.title("Volumen diario por tipo de agua – Las Condes")
-plt.legend(title="Fuente", ncol=3, loc="upper right", fontsize=8)
-plt.tight_layout()
-plt.savefig("vol_diario_por_fuente.png", dpi=150)
-plt.show()
-
-# -------------------------------------------------------------
-# 8. Indicadores resumen para el informe
-# -------------------------------------------------------------
-# Máximo caudal horario observado
-max_flow = max(I[z, d, h].X for z in G for d in D for h in H)
-
-# Porcentaje de días‑UGA con déficit de humedad
-dias_def = sum(
-    omega[z, d].X <= pars['omega^{min}_z'] + 1e-3
-    for z in G for d in D
-)
-def_pct = 100 * dias_def / (len(G) * len(D))
-
-# Fracción y volumen anual de agua potable
-pot_total = df_vol['potable'].sum()          # m³ año‑1
-total_vol = df_vol[['potable', 'pozo', 'lavado']].sum().sum()
-pot_frac  = 100 * pot_total / total_vol      # %
-
-# Imprime resultados en consola
-print("\n----- Indicadores resumen -----")
-print(f"Máximo caudal horario: {max_flow:.1f} m³/h")
-print(f"Días con déficit sobre total: {def_pct:.2f} %")
-print(f"Potable anual: {pot_total/1e6:.2f} Mm³  ({pot_frac:.1f} % del total)")
-print("--------------------------------\n")
-
-# Exporta a CSV para usar en el informe
-pd.DataFrame({
-    'max_flow_m3ph':   [max_flow],
-    'dias_deficit_pct':[def_pct],
-    'potable_total_m3':[pot_total],
-    'potable_frac_pct':[pot_frac]
-}).to_csv("indicadores_resumen.csv", index=False)
-print("Indicadores resumen guardados en indicadores_resumen.csv")
\ No newline at end of file
+        raise ValueError(f"MODO_RESOLUCION desconocido: {MODO_RESOLUCION!r}")
+
+    perfil.fase("indicadores")
+    if clases is not None:
+        sol = expandir(sol, clases, datos)
+    # Todos los indicadores salen de los arreglos de la solucion (indicadores.py)
+    kpi = cubo_kpi(sol, datos)
+    # Los graficos se dibujan en otros procesos mientras se escriben los CSV
+    reportes = None
+    if GENERAR_REPORTES:
+        reportes = generar_reportes(kpi, datos, procesos=PROCESOS_REPORTES, esperar=False)
+
+    # -------------------------------------------------------------
+    # 4. Guardar resultados principales en archivos CSV
+    # -------------------------------------------------------------
+
+    # 4.1 Solucion de lavado
+    perfil.fase("escritura")
+    ell_df = tabla_lavado(sol, datos)
+    ell_df.to_csv("ell_solution.csv", index=False)
+    print("Solucion de lavado guardada en ell_solution.csv")
+
+    # 4.2 Todas las variables optimas
+    if EXPORTAR_VARIABLES == "csv":
+        df_vars = sol.tabla_variables()
+        df_vars.to_csv("vars_solucion_optima.csv", index=False)
+        print("CSV completo de variables guardado en vars_solucion_optima.csv")
+    else:
+        ruta = guardar_solucion(sol, "vars_solucion_optima", formato=EXPORTAR_VARIABLES)
+        print(f"Solucion completa guardada en {ruta} (leer con exportacion.leer_solucion)")
+
+    # 4.3 Volumen diario por fuente
+    df_vol = kpi['vol_diario']
+    df_vol.to_csv("vol_diario_por_fuente.csv")
+    print("CSV diario por fuente guardado en vol_diario_por_fuente.csv")
+
+    # -------------------------------------------------------------
+    # 5. Indicadores resumen para el informe
+    # -------------------------------------------------------------
+    # Máximo caudal horario, % de días‑UGA con déficit de humedad y
+    # fracción y volumen anual de agua potable (m³ año‑1)
+    max_flow = kpi['resumen']['max_flow_m3ph']
+    def_pct = kpi['resumen']['dias_deficit_pct']
+    pot_total = kpi['resumen']['potable_total_m3']
+    pot_frac = kpi['resumen']['potable_frac_pct']
+
+    # Imprime resultados en consola
+    print("\n----- Indicadores resumen -----")
+    print(f"Máximo caudal horario: {max_flow:.1f} m³/h")
+    print(f"Días con déficit sobre total: {def_pct:.2f} %")
+    print(f"Potable anual: {pot_total/1e6:.2f} Mm³  ({pot_frac:.1f} % del total)")
+    print("--------------------------------\n")
+
+    # Exporta a CSV para usar en el informe
+    pd.DataFrame({k: [v] for k, v in kpi['resumen'].items()}).to_csv("indicadores_resumen.csv", index=False)
+    print("Indicadores resumen guardados en indicadores_resumen.csv")
+
+    # -------------------------------------------------------------
+    # 6. Graficos por zona, por grupo y temporales (reportes.py)
+    # -------------------------------------------------------------
+    perfil.fase("graficos")
+    if reportes is not None:
+        rutas = esperar_reportes(reportes)
+        print(f"{len(rutas)} graficos guardados (PNG)")
+
+    ruta_perfil = perfil.guardar("perfil_corrida.json")
+    if ruta_perfil is not None:
+        print(f"Perfil de la corrida guardado en {ruta_perfil}")
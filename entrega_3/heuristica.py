@@ -0,0 +1,104 @@
+# -------------------------------------------------------------
+#  Heuristica golosa (solo numpy, sin Gurobi)
+#  Riego: se avanza dia a dia con todas las zonas a la vez. En un dia
+#  permitido se riega solo si, sin regar, omega caeria bajo omega_min
+#  antes del proximo dia permitido; en ese caso se repone hasta
+#  omega_max (o hasta lo que falta para terminar el año) usando las
+#  primeras horas de H_noc a caudal M. Si aun asi no alcanza, u cubre
+#  el deficit. Cumple R1-R6 por construccion.
+#  Lavado: rotacion entre las zonas de L, un camion por dia (R7), con
+#  ceil(beta_z / C_cam) pasadas por zona en cada ciclo (R8 si el ciclo
+#  cabe en 14 dias).
+#  Sirve para respuestas inmediatas y como MIP start (arranque.py).
+# -------------------------------------------------------------
+import numpy as np #type: ignore
+
+from modelo import tensores, repartir_horas
+from indices import indices_admisibles
+from solucion import Solucion, evaluar_objetivo
+
+
+def _riego(datos, sol):
+    pars = datos['pars']
+    t = tensores(datos)
+    idx = indices_admisibles(datos)
+    nG, nD = t['ET'].shape
+    if nG == 0 or nD == 0:
+        return
+    w_min, w_max = t['omega_min'], t['omega_max']
+    M = pars['M_m3ph'] or 1e4
+    horas = idx['horas']
+    coef = pars['eta'] * 1000 / t['A']           # mm por m3 en cada zona
+    ET = t['ET']
+
+    # dias en que el riego afecta la humedad: permitidos y no el ultimo
+    riega = np.zeros(nD, dtype=bool)
+    riega[idx['dias']] = True
+    riega[-1] = False
+    # proximo dia con riego posible estrictamente despues de d (o el ultimo dia)
+    proximo = np.full(nD, nD - 1)
+    sig = nD - 1
+    for d in range(nD - 1, -1, -1):
+        proximo[d] = sig
+        if riega[d]:
+            sig = d
+    # ET acumulada: cumET[k] = ET[:, 1..k]
+    cumET = np.concatenate([np.zeros((nG, 1)), np.cumsum(ET[:, 1:], axis=1)], axis=1)
+
+    omega, u = sol.arreglos['omega'], sol.arreglos['u']
+    I, y = sol.arreglos['I'], sol.arreglos['y']
+    omega[:, 0] = t['omega_inicial'] if t['omega_inicial'] is not None else w_max
+    for d in range(nD):
+        u[:, d] = np.maximum(w_min - omega[:, d], 0.0)
+        if d == nD - 1:
+            break
+        base = omega[:, d] + u[:, d]
+        ganancia = np.zeros(nG)
+        if riega[d]:
+            # sin regar hoy, ¿se llega al proximo dia de riego sobre omega_min?
+            falta = w_min - (base - (cumET[:, proximo[d]] - cumET[:, d]))
+            necesita = falta > 1e-9
+            hasta_fin = w_min + cumET[:, -1] - cumET[:, d] - base
+            tope = w_max - base + ET[:, d + 1]
+            ganancia = np.where(necesita, np.clip(np.minimum(hasta_fin, tope), 0.0, None), 0.0)
+            volumen = np.minimum(ganancia / coef, M * len(horas))
+            ganancia = volumen * coef
+            caudal = repartir_horas(volumen, M, len(horas))
+            I[:, d, horas] = caudal
+            y[:, d, horas] = caudal > 0
+        omega[:, d + 1] = base + ganancia - ET[:, d + 1]
+
+    # fuentes: I es vpot en zonas no P y vpozo en zonas P
+    sol.arreglos['vpot'][idx['zonas_pot']] = I[idx['zonas_pot']]
+    sol.arreglos['vpozo'][:] = I[t['idx_P']]
+
+
+def _lavado(datos, sol):
+    L, pars = datos['L'], datos['pars']
+    nD = len(datos['D'])
+    if not L or not nD:
+        return
+    beta = np.array([datos['beta_z'][l] for l in L], dtype=float)
+    cap = np.minimum(beta, pars['C_cam_m3'])
+    pasadas = np.ceil(beta / cap - 1e-9).astype(int)
+    ciclo = np.repeat(np.arange(len(L)), pasadas)
+    if len(ciclo) > 14:
+        print(f"Aviso: el ciclo de lavado dura {len(ciclo)} dias; R8 (14 dias) no se cumple")
+    zona = ciclo[np.arange(nD) % len(ciclo)]
+    dias = np.arange(nD)
+    sol.arreglos['wwash'][zona, dias] = 1.0
+    sol.arreglos['ell'][zona, dias] = (beta / pasadas)[zona]
+
+
+def resolver_heuristica(datos, verbose=True):
+    """
+    datos  : dict como en gurobi.py (puede venir agregado)
+    return : Solucion factible sobre los ejes de datos, con su objetivo
+    """
+    sol = Solucion.vacia(datos)
+    _riego(datos, sol)
+    _lavado(datos, sol)
+    sol.objetivo = evaluar_objetivo(sol, datos)
+    if verbose:
+        print(f"Heuristica: objetivo {sol.objetivo:,.2f}")
+    return sol
@@ -0,0 +1,126 @@
+# -------------------------------------------------------------
+#  Horizonte rodante para el modelo anual
+#  Se resuelven ventanas de `largo` dias mas `anticipacion` dias de
+#  mirada hacia adelante; solo se fijan las decisiones de los primeros
+#  `largo` dias y la ventana siguiente parte desde ahi con:
+#    - omega del primer dia fija al valor que dejo la ventana anterior
+#    - los lavados de los 13 dias previos como historia para R8
+#  En memoria solo vive el modelo de una ventana a la vez (salvo la cota
+#  opcional, que arma el modelo anual completo).
+# -------------------------------------------------------------
+import time
+
+import gurobipy as gp #type: ignore
+import numpy as np #type: ignore
+
+from modelo import construir_modelo
+from solucion import Solucion, evaluar_objetivo, FAMILIAS
+
+
+def datos_ventana(datos, inicio, fin, omega_inicial=None, historia_ell=None):
+    """
+    Recorta datos a los dias D[inicio:fin] (posiciones).
+
+    omega_inicial : dict {zona: humedad} para el primer dia, o None
+    historia_ell  : arreglo (|L|, 13) con ell de los 13 dias anteriores
+    """
+    D = datos['D'][inicio:fin]
+    set_D = set(D)
+    v = dict(datos)
+    v['D'] = D
+    v['D_proh'] = [d for d in datos['D_proh'] if d in set_D]
+    v['omega_inicial'] = omega_inicial
+    v['historia_ell'] = historia_ell
+    return v
+
+
+def cota_monolitica(datos, metodo="disperso", params=None, env=None, time_limit=300):
+    """
+    Cota inferior del modelo anual completo: su relajacion lineal.
+    Construye el modelo anual, asi que la memoria es la del monolitico.
+
+    time_limit : segundos para la relajacion (reemplaza el TimeLimit de params)
+    return     : cota, o None si no termino dentro del limite
+    """
+    m, _ = construir_modelo(datos, metodo=metodo, env=env)
+    m.update()
+    r = m.relax()
+    r.Params.OutputFlag = 0
+    for k, val in (params or {}).items():
+        if k != "TimeLimit":
+            r.setParam(k, val)
+    r.Params.TimeLimit = time_limit
+    r.optimize()
+    cota = r.ObjVal if r.Status == gp.GRB.OPTIMAL else None
+    r.dispose()
+    m.dispose()
+    return cota
+
+
+def resolver_horizonte_rodante(datos, largo=14, anticipacion=7, metodo="disperso",
+                               params=None, env=None, calcular_cota=False, tiempo_cota=300,
+                               verbose=True):
+    """
+    datos        : dict como en gurobi.py (puede venir agregado)
+    largo        : dias que se fijan por ventana
+    anticipacion : dias extra de mirada hacia adelante (no se fijan)
+    params       : parametros Gurobi por ventana, p.ej. {'TimeLimit': 60, 'MIPGap': 1e-3}
+    calcular_cota: True = al final resuelve la relajacion LP del modelo anual
+                   (cota_monolitica); ojo que construye el modelo completo y
+                   la memoria sube a la del monolitico
+    tiempo_cota  : TimeLimit de esa relajacion (segundos)
+    return       : Solucion sobre los ejes de datos; objetivo = valor de la
+                   solucion completa y cota = relajacion LP del modelo anual
+                   (None si no se pidio o no termino a tiempo)
+    """
+    if largo < 1:
+        raise ValueError("largo debe ser >= 1")
+    D = datos['D']
+    nD = len(D)
+    sol = Solucion.vacia(datos)
+    pos_G = {z: i for i, z in enumerate(datos['G'])}
+    omega_inicial, historia = None, np.zeros((len(datos['L']), 13))
+    t0 = time.perf_counter()
+
+    inicio = 0
+    while inicio < nD:
+        fin = min(inicio + largo + anticipacion, nD)
+        fijo = fin if fin == nD else inicio + largo
+        dv = datos_ventana(datos, inicio, fin, omega_inicial, historia)
+        m, v = construir_modelo(dv, metodo=metodo, env=env)
+        m.Params.OutputFlag = 0
+        for k, val in (params or {}).items():
+            m.setParam(k, val)
+        m.optimize()
+        if not m.SolCount:
+            raise RuntimeError(f"Ventana dias {D[inicio]}-{D[fin - 1]} sin solucion (status {m.Status})")
+        sv = Solucion.desde_variables(v, dv, m)
+
+        # fija los dias [inicio, fijo) en la solucion anual
+        n = fijo - inicio
+        for f in FAMILIAS:
+            sol.arreglos[f][:, inicio:fijo] = sv.arreglos[f][:, :n]
+        if fijo < nD:
+            omega_inicial = {z: sv.arreglos['omega'][pos_G[z], n] for z in datos['G']}
+            ell = sol.arreglos['ell']
+            historia = np.zeros((len(datos['L']), 13))
+            desde = max(0, fijo - 13)
+            historia[:, 13 - (fijo - desde):] = ell[:, desde:fijo]
+        if verbose:
+            print(f"  ventana dias {D[inicio]:>3}-{D[fin - 1]:>3}: fijados {n:>2} dias, "
+                  f"obj ventana {m.ObjVal:,.1f}, gap {m.MIPGap if m.IsMIP else 0:.2%}, "
+                  f"{time.perf_counter() - t0:.1f} s")
+        m.dispose()
+        inicio = fijo
+
+    sol.objetivo = evaluar_objetivo(sol, datos)
+    if calcular_cota:
+        sol.cota = cota_monolitica(datos, metodo=metodo, params=params, env=env, time_limit=tiempo_cota)
+    if verbose:
+        print(f"Horizonte rodante: objetivo {sol.objetivo:,.2f} en {time.perf_counter() - t0:.1f} s")
+        if sol.cota is not None:
+            gap = (sol.objetivo - sol.cota) / max(abs(sol.objetivo), 1e-9)
+            print(f"  cota monolitica (relajacion LP) {sol.cota:,.2f}  ->  gap {gap:.2%}")
+        elif calcular_cota:
+            print(f"  cota no disponible (la relajacion LP no termino en {tiempo_cota} s)")
+    return sol
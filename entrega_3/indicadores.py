@@ -0,0 +1,83 @@
+# -------------------------------------------------------------
+#  Cubo de indicadores de una solucion
+#  Todo sale de los arreglos densos de la Solucion (zona, dia, hora),
+#  que se leen de Gurobi una sola vez por familia: los totales por zona,
+#  dia y grupo, los deficits y los indicadores resumen son reducciones
+#  de numpy, sin recorrer variables una a una.
+# -------------------------------------------------------------
+import numpy as np #type: ignore
+import pandas as pd #type: ignore
+
+from modelo import tensores
+
+TOL_DEFICIT = 1e-3   # omega <= omega_min + TOL cuenta como dia con deficit
+
+
+def cubo_kpi(sol, datos):
+    """
+    sol    : Solucion sobre los ejes de datos (ya desagregada)
+    datos  : dict como en gurobi.py
+    return : dict con
+             I, vpot, vpozo, omega, ell, wwash : arreglos de la solucion
+             grupo          : 'N' / 'P' / 'Otro' por zona de riego
+             deficit        : bool (zona x dia), omega <= omega_min + tol
+             agua_zona, dias_deficit_zona, humedad_final : por zona
+             lavados_zona   : por zona de lavado
+             agua_dia       : por dia (todas las zonas)
+             vol_diario     : DataFrame por dia (potable, pozo, lavado)
+             agua_grupo, deficit_grupo : dict grupo -> total
+             resumen        : indicadores para el informe
+    """
+    a = sol.arreglos
+    G, D = datos['G'], datos['D']
+    t = tensores(datos)
+    I, omega = a['I'], a['omega']
+
+    grupo = np.full(len(G), 'Otro', dtype=object)
+    grupo[t['idx_P']] = 'P'
+    grupo[t['idx_N']] = 'N'          # como antes: N tiene prioridad sobre P
+    deficit = omega <= t['omega_min'][:, None] + TOL_DEFICIT
+    agua_zona = I.sum(axis=(1, 2))
+    dias_deficit_zona = deficit.sum(axis=1)
+
+    vol_diario = pd.DataFrame({
+        "day": D,
+        "potable": a['vpot'].sum(axis=(0, 2)),
+        "pozo": a['vpozo'].sum(axis=(0, 2)),
+        "lavado": a['ell'].sum(axis=0),
+    }).set_index("day")
+
+    grupos = pd.unique(grupo)                              # orden de aparicion en G
+    pot_total = float(vol_diario['potable'].sum())
+    total_vol = float(vol_diario.to_numpy().sum())
+    resumen = {
+        'max_flow_m3ph': float(I.max()) if I.size else 0.0,
+        'dias_deficit_pct': 100 * float(deficit.mean()) if deficit.size else 0.0,
+        'potable_total_m3': pot_total,
+        'potable_frac_pct': 100 * pot_total / total_vol if total_vol else 0.0,
+    }
+    return {
+        'I': I, 'vpot': a['vpot'], 'vpozo': a['vpozo'], 'omega': omega,
+        'ell': a['ell'], 'wwash': a['wwash'],
+        'grupo': grupo,
+        'deficit': deficit,
+        'agua_zona': agua_zona,
+        'dias_deficit_zona': dias_deficit_zona,
+        'humedad_final': omega[:, -1] if omega.size else np.zeros(len(G)),
+        'lavados_zona': a['wwash'].sum(axis=1),
+        'agua_dia': I.sum(axis=(0, 2)),
+        'vol_diario': vol_diario,
+        'agua_grupo': {g: float(agua_zona[grupo == g].sum()) for g in grupos},
+        'deficit_grupo': {g: int(dias_deficit_zona[grupo == g].sum()) for g in grupos},
+        'resumen': resumen,
+    }
+
+
+def tabla_lavado(sol, datos):
+    """Solucion de lavado en formato largo (uga_id, day, ell_m3)."""
+    L, D = datos['L'], datos['D']
+    return pd.DataFrame({
+        "uga_id": np.repeat(np.asarray(L, dtype=object), len(D)),
+        "day": np.tile(np.asarray(D), len(L)),
+        "ell_m3": sol.arreglos['ell'].ravel(),
+    })
@@ -0,0 +1,143 @@
+# -------------------------------------------------------------
+#  Indices admisibles del modelo MILP
+#  Solo existen variables de riego para las tuplas (zona, dia, hora)
+#  que el modelo original no fija a cero:
+#    - dias fuera de D_proh            (R1)
+#    - horas dentro de H_noc           (R2)
+#    - zonas P -> vpozo, resto -> vpot (R3)
+# -------------------------------------------------------------
+import numpy as np #type: ignore
+
+
+def indices_admisibles(datos):
+    """
+    datos  : dict con G, P, D, H, H_noc, D_proh (ver gurobi.py)
+    return : dict con posiciones (en G, D, H) y etiquetas admisibles
+             'dias', 'horas'      -> posiciones de dias/horas de riego
+             'zonas_pot'          -> posiciones en G de las zonas con vpot
+             'zonas_pozo'         -> posiciones en G de las zonas con vpozo (orden de P)
+             'D_riego', 'H_riego' -> etiquetas de esos dias/horas
+             'G_pot', 'G_pozo'    -> etiquetas de esas zonas
+    """
+    G, D, H = datos['G'], datos['D'], datos['H']
+    set_P = set(datos['P'])
+    set_proh = set(datos['D_proh'])
+    set_noc = set(datos['H_noc'])
+    pos_G = {z: i for i, z in enumerate(G)}
+    G_pozo = [z for z in datos['P'] if z in pos_G]
+    G_pot = [z for z in G if z not in set_P]
+    dias = [i for i, d in enumerate(D) if d not in set_proh]
+    horas = [i for i, h in enumerate(H) if h in set_noc]
+    return {
+        'dias':       np.array(dias, dtype=int),
+        'horas':      np.array(horas, dtype=int),
+        'zonas_pot':  np.array([pos_G[z] for z in G_pot], dtype=int),
+        'zonas_pozo': np.array([pos_G[z] for z in G_pozo], dtype=int),
+        'D_riego':    [D[i] for i in dias],
+        'H_riego':    [H[i] for i in horas],
+        'G_pot':      G_pot,
+        'G_pozo':     G_pozo,
+    }
+
+
+def conteo_denso(datos):
+    """Columnas y filas por familia de la formulacion original (bucles/matricial)."""
+    nG, nD, nH = len(datos['G']), len(datos['D']), len(datos['H'])
+    nP, nN, nL = len(datos['P']), len(datos['N']), len(datos['L'])
+    nproh = len([d for d in datos['D_proh'] if d in set(datos['D'])])
+    nnoc = len([h for h in datos['H'] if h in set(datos['H_noc'])])
+    n_vent = sum(1 for d in datos['D'] if d >= 14)
+    cols = {
+        'omega': nG * nD, 'y': nG * nD * nH, 'vpot': nG * nD * nH,
+        'vpozo': nP * nD * nH, 'I': nG * nD * nH, 'u': nG * nD,
+        'ell': nL * nD, 'wwash': nL * nD,
+    }
+    filas = {
+        'R1': (2 * nG + nP) * nproh * nH,
+        'R2': nG * nD * (nH - nnoc),
+        'R3': (nN + nP) * nD * nH,
+        'R4': 2 * nG * nD * nH,
+        'R5': nG * max(nD - 1, 0),
+        'R6': 2 * nG * nD,
+        'R7': nD + nL * nD,
+        'R8': nL * n_vent,
+    }
+    return cols, filas
+
+
+def conteo_disperso(datos):
+    """Columnas y filas por familia de construir_modelo_disperso."""
+    idx = indices_admisibles(datos)
+    nG, nD, nL = len(datos['G']), len(datos['D']), len(datos['L'])
+    ndh = len(idx['dias']) * len(idx['horas'])
+    n_vent = sum(1 for d in datos['D'] if d >= 14)
+    cols = {
+        'omega': nG * nD, 'y': nG * ndh, 'vpot': len(idx['zonas_pot']) * ndh,
+        'vpozo': len(idx['zonas_pozo']) * ndh, 'I': 0, 'u': nG * nD,
+        'ell': nL * nD, 'wwash': nL * nD,
+    }
+    filas = {
+        'R1': 0, 'R2': 0, 'R3': 0,
+        'R4': nG * ndh,
+        'R5': nG * max(nD - 1, 0),
+        'R6': 2 * nG * nD,
+        'R7': nD + nL * nD,
+        'R8': nL * n_vent,
+    }
+    return cols, filas
+
+
+def conteo_diario(datos):
+    """Columnas y filas por familia de construir_modelo_diario (horas agregadas)."""
+    idx = indices_admisibles(datos)
+    nG, nD, nL = len(datos['G']), len(datos['D']), len(datos['L'])
+    nd = len(idx['dias'])
+    n_vent = sum(1 for d in datos['D'] if d >= 14)
+    cols = {
+        'omega': nG * nD, 'y': nG * nd, 'vpot': len(idx['zonas_pot']) * nd,
+        'vpozo': len(idx['zonas_pozo']) * nd, 'I': 0, 'u': nG * nD,
+        'ell': nL * nD, 'wwash': nL * nD,
+    }
+    filas = {
+        'R1': 0, 'R2': 0, 'R3': 0,
+        'R4': nG * nd,
+        'R5': nG * max(nD - 1, 0),
+        'R6': 2 * nG * nD,
+        'R7': nD + nL * nD,
+        'R8': nL * n_vent,
+    }
+    return cols, filas
+
+
+CONTEOS = {"disperso": conteo_disperso, "diario": conteo_diario}
+
+
+def reporte_reduccion(datos, metodo="disperso", imprimir=True):
+    """
+    Tabla de columnas y filas eliminadas por la formulacion dispersa
+    (o la diaria) respecto de la original, por familia.
+
+    return : dict {'columnas': (denso, metodo), 'filas': (denso, metodo),
+                   'detalle': [(familia, denso, metodo), ...]}
+    """
+    cd, fd = conteo_denso(datos)
+    cs, fs = CONTEOS[metodo](datos)
+    detalle = [(k, cd[k], cs[k]) for k in cd] + [(k, fd[k], fs[k]) for k in fd]
+    tot_c = (sum(cd.values()), sum(cs.values()))
+    tot_f = (sum(fd.values()), sum(fs.values()))
+    if imprimir:
+        print(f"{'familia':<8} {'original':>12} {metodo:>12} {'eliminadas':>12}")
+        for k, a, b in detalle:
+            print(f"{k:<8} {a:>12,} {b:>12,} {a - b:>12,}")
+        for nombre, (a, b) in [("columnas", tot_c), ("filas", tot_f)]:
+            red = 100 * (a - b) / a if a else 0.0
+            print(f"{nombre:<8} {a:>12,} {b:>12,} {a - b:>12,}  ({red:.1f} % menos)")
+    return {'columnas': tot_c, 'filas': tot_f, 'detalle': detalle}
+
+
+if __name__ == "__main__":
+    from cargar_datos import cargar_datos
+    datos = cargar_datos()
+    for metodo in CONTEOS:
+        reporte_reduccion(datos, metodo=metodo)
+        print()
@@ -0,0 +1,334 @@
+# -------------------------------------------------------------
+#  Programacion del lavado de calles sin MILP
+#  El bloque de lavado (ell, wwash, R7-R8) no comparte variables con el
+#  riego, asi que se puede programar aparte:
+#    - R7 : un camion por dia, ell <= min(beta_z, C_cam_m3) * wwash
+#    - R8 : en cada ventana de 14 dias cada tramo recibe beta_z
+#  Cada tramo necesita k = ceil(beta_z / cap) pasadas de beta_z / k por
+#  ventana. Si las k de todos los tramos caben en 14 dias, un patron
+#  ciclico de 14 dias (cada dia: un tramo o ninguno) cumple R8 en toda
+#  ventana completa; se prueban los 14 desfases del patron, se elige el
+#  de menor volumen y se recorta en cada pasada lo que sobra en todas sus
+#  ventanas. Con historia de lavado (horizonte rodante) el primer ciclo
+#  respeta los plazos que deja la historia.
+#  Antes de programar se revisa la factibilidad (mas pasadas que dias de
+#  ventana, camion sin capacidad, plazos de la historia), y despues se
+#  compara el volumen con una cota inferior (ventanas disjuntas por tramo,
+#  el caso saturado de un camion por dia y, si no alcanza, la relajacion
+#  lineal del bloque) para certificar el optimo; con exacto=True lo que
+#  no se certifica se termina con el MILP del bloque (solo R7-R8).
+#  El programa se puede fijar en el MILP o dejar como MIP start (gurobi.py).
+# -------------------------------------------------------------
+import time
+
+import gurobipy as gp #type: ignore
+from gurobipy import GRB #type: ignore
+import numpy as np #type: ignore
+
+from modelo import construir_modelo, tensores
+from solucion import Solucion
+from arranque import aplicar_arranque
+
+VENTANA = 14   # dias de la ventana de R8
+TOL = 1e-6
+
+
+def _fines(datos):
+    """Posiciones en D donde termina una ventana de R8 (dias >= 14, como en modelo.py)."""
+    return np.flatnonzero(np.asarray(datos['D']) >= VENTANA)
+
+
+def _historia_en_ventana(historia, fines):
+    """
+    Volumen de la historia (|L| x 13, dias -13..-1) que cae en la ventana
+    que termina en cada posicion de fines.
+    """
+    acum = np.concatenate([np.zeros((historia.shape[0], 1)), np.cumsum(historia, axis=1)], axis=1)
+    return acum[:, -1:] - acum[:, np.minimum(fines, VENTANA - 1)]
+
+
+def cobertura(datos, ell):
+    """Volumen de cada ventana de R8 (|L| x ventanas), historia incluida."""
+    historia = tensores(datos)['historia_ell']
+    ext = np.concatenate([historia, ell], axis=1)
+    acum = np.concatenate([np.zeros((ext.shape[0], 1)), np.cumsum(ext, axis=1)], axis=1)
+    fines = _fines(datos)
+    return acum[:, fines + VENTANA] - acum[:, fines]
+
+
+def _pasadas(t):
+    """Pasadas por ventana y volumen por pasada de cada tramo."""
+    beta, cap = t['beta_lav'], t['cap_lav']
+    k = np.where(beta > TOL, np.ceil(beta / np.maximum(cap, TOL) - 1e-9), 0).astype(int)
+    return k, np.divide(beta, k, out=np.zeros_like(beta), where=k > 0)
+
+
+def _plazos(t, fines):
+    """
+    Para cada tramo, la ultima posicion en que puede hacer su primera
+    pasada (primera ventana que la historia no cubre) y cuantas pasadas
+    necesita hasta ahi; -1 si ninguna ventana lo exige.
+    """
+    beta = t['beta_lav']
+    falta = beta[:, None] - _historia_en_ventana(t['historia_ell'], fines)
+    exige = falta > TOL
+    plazo = np.where(exige.any(axis=1), fines[exige.argmax(axis=1)], -1)
+    faltante = falta[np.arange(len(beta)), exige.argmax(axis=1)]
+    necesarias = np.where(plazo >= 0, np.ceil(faltante / np.maximum(t['cap_lav'], TOL) - 1e-9), 0)
+    return plazo, necesarias.astype(int)
+
+
+def diagnosticar_lavado(datos):
+    """
+    Condiciones necesarias de factibilidad de R7-R8.
+
+    return : lista de problemas (vacia si no se detecta ninguno)
+    """
+    L, D = datos['L'], datos['D']
+    fines = _fines(datos)
+    if not L or not fines.size:
+        return []
+    t = tensores(datos)
+    problemas = [f"tramo {l}: beta_z = {b:g} m3 pero el camion no carga agua (C_cam_m3 = {datos['pars']['C_cam_m3']})"
+                 for l, b, c in zip(L, t['beta_lav'], t['cap_lav']) if b > TOL and c <= TOL]
+    if problemas:
+        return problemas
+    k, _ = _pasadas(t)
+    if (fines >= VENTANA - 1).any() and k.sum() > VENTANA:
+        problemas.append(f"{len(L)} tramos necesitan {k.sum()} pasadas de camion en cada ventana de "
+                         f"{VENTANA} dias y el camion hace una por dia (R7)")
+        return problemas
+    # plazos de la historia: las pasadas exigidas hasta la posicion e caben en e + 1 dias
+    plazo, necesarias = _plazos(t, fines)
+    for e in np.unique(plazo[plazo >= 0]):
+        n = necesarias[(plazo >= 0) & (plazo <= e)].sum()
+        if n > e + 1:
+            problemas.append(f"con la historia de lavado hay {n} pasadas que deben hacerse hasta "
+                             f"el dia {D[e]} y solo hay {e + 1} dias")
+            break
+    return problemas
+
+
+def verificar_lavado(datos, ell, wwash):
+    """
+    Revision exacta de R7-R8 sobre un programa (arreglos |L| x |D|).
+
+    return : lista de restricciones violadas (vacia si es factible)
+    """
+    t = tensores(datos)
+    errores = []
+    if not np.isin(wwash, (0.0, 1.0)).all():
+        errores.append("wwash no es binaria")
+    por_dia = wwash.sum(axis=0)
+    if (por_dia > 1 + TOL).any():
+        errores.append(f"R7: {int((por_dia > 1 + TOL).sum())} dias con mas de un camion")
+    if (ell > t['cap_lav'][:, None] * wwash + TOL).any() or (ell < -TOL).any():
+        errores.append("R7: ell fuera de [0, min(beta_z, C_cam_m3) * wwash]")
+    if ell.size:
+        corto = cobertura(datos, ell) < t['beta_lav'][:, None] - TOL
+        if corto.any():
+            errores.append(f"R8: {int(corto.sum())} ventanas de {VENTANA} dias sin beta_z")
+    return errores
+
+
+def _patron_plazos(k, plazo, necesarias):
+    """
+    Patron de VENTANA dias que respeta los plazos de la historia: cada
+    pasada va al ultimo dia libre antes de su plazo (de la mas holgada a la
+    mas urgente). None si no caben.
+    """
+    pasadas = []
+    for i in range(len(k)):
+        tope = min(plazo[i], VENTANA - 1) if plazo[i] >= 0 else VENTANA - 1
+        pasadas += [(tope, i)] * min(necesarias[i], k[i]) + [(VENTANA - 1, i)] * (k[i] - min(necesarias[i], k[i]))
+    patron = np.full(VENTANA, -1)
+    for tope, i in sorted(pasadas, reverse=True):
+        libres = np.flatnonzero(patron[:tope + 1] < 0)
+        if not libres.size:
+            return None
+        patron[libres[-1]] = i
+    return patron
+
+
+def _patron_compacto(k, q):
+    """Pasadas de mayor a menor volumen y los dias libres al final del ciclo."""
+    orden = np.argsort(-q, kind="stable")
+    pasadas = np.repeat(orden, k[orden])
+    return np.concatenate([pasadas, np.full(VENTANA - len(pasadas), -1)])
+
+
+def _programa(patron, fase, n_dias, q):
+    """Arreglos ell y wwash (|L| x n_dias) del patron repetido desde el desfase dado."""
+    tramo = patron[(np.arange(n_dias) + fase) % VENTANA]
+    dias = np.flatnonzero(tramo >= 0)
+    ell, wwash = np.zeros((len(q), n_dias)), np.zeros((len(q), n_dias))
+    wwash[tramo[dias], dias] = 1.0
+    ell[tramo[dias], dias] = q[tramo[dias]]
+    return ell, wwash
+
+
+def _recortar(t, fines, ell, wwash):
+    """
+    Baja cada pasada (de la ultima a la primera) lo que sobra en todas las
+    ventanas que la contienen; las que quedan en cero dejan libre el camion.
+    """
+    historia = t['historia_ell']
+    inicio = fines - VENTANA + 1
+    for l in range(ell.shape[0]):
+        dias = np.flatnonzero(wwash[l])
+        if not dias.size:
+            continue
+        ext = np.concatenate([historia[l], ell[l]])
+        acum = np.concatenate([[0.0], np.cumsum(ext)])
+        holgura = acum[fines + VENTANA] - acum[fines] - t['beta_lav'][l]
+        for p in dias[::-1]:
+            dentro = (inicio <= p) & (fines >= p)
+            baja = min(ell[l, p], holgura[dentro].min()) if dentro.any() else ell[l, p]
+            if baja > TOL:
+                ell[l, p] -= baja
+                holgura[dentro] -= baja
+        wwash[l, ell[l] <= TOL] = 0.0
+        ell[l, ell[l] <= TOL] = 0.0
+    return ell, wwash
+
+
+def _cota_ventanas(t, fines, n_dias):
+    """
+    Cota inferior del volumen: por tramo, la mayor suma de lo que le falta a
+    un conjunto de ventanas disjuntas (seleccion ponderada de intervalos).
+    """
+    falta = np.maximum(t['beta_lav'][:, None] - _historia_en_ventana(t['historia_ell'], fines), 0.0)
+    inicio = np.maximum(fines - VENTANA + 1, 0)
+    mejor = np.zeros((len(t['beta_lav']), n_dias + 1))
+    j = 0
+    for p in range(n_dias):
+        mejor[:, p + 1] = mejor[:, p]
+        if j < len(fines) and fines[j] == p:
+            mejor[:, p + 1] = np.maximum(mejor[:, p + 1], falta[:, j] + mejor[:, inicio[j]])
+            j += 1
+    return float(mejor[:, -1].sum())
+
+
+def _cota_saturada(t, fines, n_dias):
+    """
+    Caso saturado (una pasada por tramo, tantos tramos como dias de la
+    ventana, sin historia y todos los dias dentro de alguna ventana): cada
+    ventana contiene a cada tramo exactamente una vez, asi que el dia p y el
+    p + 14 lavan el mismo tramo y el volumen minimo es el del ciclo con los
+    tramos de menor beta_z en los n_dias % 14 dias sobrantes.
+    None si no es el caso.
+    """
+    k, q = _pasadas(t)
+    if (k.sum() != VENTANA or (k > 1).any() or t['historia_ell'].any()
+            or fines.size != n_dias - VENTANA + 1 or fines[0] != VENTANA - 1):
+        return None
+    return float((n_dias // VENTANA) * q.sum() + np.sort(q[k > 0])[:n_dias % VENTANA].sum())
+
+
+def _bloque(datos, env=None, arranque=None, relajar=False, params=None):
+    """
+    Resuelve con Gurobi solo el bloque de lavado, con delta = 1 para que el
+    objetivo sea el volumen: la relajacion lineal (cota) o el MILP exacto
+    con arranque como MIP start.
+
+    return : (volumen, cota, Solucion del MILP o None)
+    """
+    if env is None:
+        with gp.Env(params={"OutputFlag": 0}) as env:
+            return _bloque(datos, env, arranque, relajar, params)
+    s = dict(datos, G=[], P=[], N=[], omega_inicial=None, pars=dict(datos['pars'], delta=1.0))
+    m, v = construir_modelo(s, metodo="disperso", env=env)
+    if relajar:
+        r = m.relax()
+        m.dispose()
+        m = r
+    m.Params.OutputFlag = 0
+    for k, val in (params or {}).items():
+        m.setParam(k, val)
+    if arranque is not None and not relajar:
+        aplicar_arranque(m, v, arranque, familias=["ell", "wwash"])
+    m.optimize()
+    hay = m.SolCount > 0
+    volumen = m.ObjVal if hay else np.inf
+    cota = m.ObjBound if m.IsMIP else (m.ObjVal if m.Status == GRB.OPTIMAL else 0.0)
+    sol = Solucion.desde_variables(v, s, m) if hay and not relajar else None
+    m.dispose()
+    return volumen, cota, sol
+
+
+def programar_lavado(datos, certificar=True, exacto=False, params=None, env=None, verbose=True):
+    """
+    datos      : dict como en gurobi.py (puede venir agregado o ser una ventana
+                 del horizonte rodante, con historia_ell)
+    certificar : si el volumen no alcanza las cotas combinatorias, resolver
+                 la relajacion lineal del bloque para mejorar la cota
+    exacto     : si aun asi no se certifica el optimo, resolver el MILP del
+                 bloque (solo R7-R8) partiendo del programa ciclico
+    params     : parametros Gurobi de ese MILP (TimeLimit, MIPGap, ...)
+    return     : Solucion con ell y wwash (el resto de las familias en NaN,
+                 como MIP start parcial); objetivo y cota son el termino
+                 delta * lavado de la funcion objetivo
+    """
+    t0 = time.perf_counter()
+    problemas = diagnosticar_lavado(datos)
+    if problemas:
+        raise ValueError("Lavado infactible:\n  " + "\n  ".join(problemas))
+    L, n_dias = datos['L'], len(datos['D'])
+    sol = Solucion.vacia(datos, valor=np.nan)
+    sol.arreglos['ell'][:] = 0.0
+    sol.arreglos['wwash'][:] = 0.0
+    fines = _fines(datos)
+    if not L or not fines.size:
+        sol.objetivo = sol.cota = 0.0
+        return sol
+
+    t = tensores(datos)
+    k, q = _pasadas(t)
+    plazo, necesarias = _plazos(t, fines)
+    patrones = [p for p in (_patron_plazos(k, plazo, necesarias), _patron_compacto(k, q)) if p is not None]
+    mejor = None
+    for patron in patrones:
+        for fase in range(VENTANA):
+            ell, wwash = _programa(patron, fase, n_dias, q)
+            volumen = ell.sum()
+            if (mejor is None or volumen < mejor[0] - TOL) and not verificar_lavado(datos, ell, wwash):
+                mejor = (volumen, ell, wwash)
+    if mejor is None:
+        raise RuntimeError("No se encontro un programa ciclico de lavado con esta historia; "
+                           "deja R7-R8 en el MILP (LAVADO = 'modelo')")
+    ell, wwash = _recortar(t, fines, mejor[1], mejor[2])
+    sol.arreglos['ell'][:] = ell
+    sol.arreglos['wwash'][:] = wwash
+    volumen = float(ell.sum())
+
+    cota = max(_cota_ventanas(t, fines, n_dias), _cota_saturada(t, fines, n_dias) or 0.0)
+    metodo = "ciclico"
+    if volumen > cota + TOL and (certificar or exacto):
+        vol_milp, cota_bloque, exacta = _bloque(datos, env, arranque=sol, relajar=not exacto, params=params)
+        cota = max(cota, cota_bloque)
+        if exacta is not None and vol_milp < volumen - TOL:
+            sol.arreglos['ell'][:] = exacta.arreglos['ell']
+            sol.arreglos['wwash'][:] = np.round(exacta.arreglos['wwash'])
+            volumen, metodo = float(vol_milp), "MILP del bloque"
+    delta = datos['pars']['delta'] or 0.0
+    sol.objetivo, sol.cota = delta * volumen, delta * min(cota, volumen)
+    if verbose:
+        optimo = delta == 0 or volumen - cota <= 1e-4 * max(volumen, 1.0)   # MIPGap por defecto
+        estado = "optimo" if optimo else f"gap {(volumen - cota) / max(volumen, 1e-9):.2%}"
+        print(f"Lavado ({metodo}): {int(sol.arreglos['wwash'].sum())} pasadas en {n_dias} dias, "
+              f"{volumen:,.1f} m3 (cota {cota:,.1f} m3, {estado}) en {1000 * (time.perf_counter() - t0):.0f} ms")
+    return sol
+
+
+def fijar_lavado(m, variables, sol):
+    """Fija ell y wwash del modelo en los valores de sol (LB = UB)."""
+    for f in ("ell", "wwash"):
+        v = variables[f]
+        if isinstance(v, gp.tupledict):
+            if len(v):
+                valores = sol.arreglos[f].ravel().tolist()
+                m.setAttr("LB", list(v.values()), valores)
+                m.setAttr("UB", list(v.values()), valores)
+        else:
+            v.fijar(sol.arreglos[f], sol.ejes[f])
+    m.update()
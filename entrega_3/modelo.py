@@ -0,0 +1,915 @@
+# -------------------------------------------------------------
+#  Constructores del modelo MILP de Las Condes
+#  - "bucles"    : formulacion original, una llamada addConstr por fila
+#  - "matricial" : misma formulacion con la API matricial (addMVar /
+#                  addMConstr sobre matrices dispersas armadas con numpy)
+#  - "disperso"  : formulacion equivalente que solo crea las variables
+#                  admisibles (indices.py)
+#  - "diario"    : como "disperso", pero con horas agregadas: un conteo
+#                  entero de horas de valvula y un volumen por zona-dia
+# -------------------------------------------------------------
+import gurobipy as gp #type: ignore
+from gurobipy import GRB #type: ignore
+import numpy as np #type: ignore
+import scipy.sparse as sp #type: ignore
+from indices import indices_admisibles
+
+# Orden en que se crean las variables (igual en ambos constructores)
+FAMILIAS = ["omega", "y", "vpot", "vpozo", "I", "u", "ell", "wwash"]
+
+
+class _Cero:
+    """Variable inexistente (fijada a cero por construccion): X = Start = 0."""
+    X = 0.0
+    Start = 0.0
+
+    def __repr__(self):
+        return "<cero>"
+
+
+CERO = _Cero()
+
+
+class Vista:
+    """
+    Acceso por etiquetas a un MVar, para que el codigo de reportes siga
+    usando la notacion de tupledict: v[z, d, h].X
+
+    mvar      : gp.MVar de forma (len(eje_0), len(eje_1), ...)
+    ejes      : lista de listas de etiquetas, una por dimension
+    completos : (opcional) ejes del dominio completo. Una clave que esta en
+                el dominio completo pero no en ejes corresponde a una
+                variable que no se creo (formulacion dispersa) y devuelve CERO.
+    """
+    def __init__(self, mvar, ejes, completos=None):
+        self.mvar = mvar
+        self.ejes = [list(e) for e in ejes]
+        self._pos = [{e: i for i, e in enumerate(eje)} for eje in self.ejes]
+        self.completos = [list(e) for e in completos] if completos is not None else None
+        self._completos = [set(e) for e in completos] if completos is not None else None
+
+    def denso(self, ejes, atributo="X"):
+        """
+        Valores X como arreglo denso sobre los ejes dados (ceros donde no hay variable).
+        atributo : "ScenNX" para la solucion de un escenario (escenarios.py)
+        """
+        out = np.zeros([len(e) for e in ejes])
+        if self.mvar.size:
+            destino = [{e: i for i, e in enumerate(eje)} for eje in ejes]
+            pos = [[d[e] for e in eje] for d, eje in zip(destino, self.ejes)]
+            out[np.ix_(*pos)] = getattr(self.mvar, atributo)
+        return out
+
+    def fijar_start(self, arreglo, ejes):
+        """
+        Inverso de denso: toma de un arreglo sobre los ejes dados los
+        valores de las variables de la vista y los deja como Start.
+        NaN (sin dato) queda como GRB.UNDEFINED, para que Gurobi complete.
+        """
+        if not self.mvar.size:
+            return
+        valores = self._valores(arreglo, ejes)
+        self.mvar.Start = np.where(np.isnan(valores), GRB.UNDEFINED, valores)
+
+    def fijar(self, arreglo, ejes):
+        """Como fijar_start, pero fija las variables en esos valores (LB = UB); NaN las deja como estan."""
+        if not self.mvar.size:
+            return
+        valores = self._valores(arreglo, ejes)
+        libre = np.isnan(valores)
+        self.mvar.LB = np.where(libre, self.mvar.LB, valores)
+        self.mvar.UB = np.where(libre, self.mvar.UB, valores)
+
+    def _valores(self, arreglo, ejes):
+        """Valores de las variables de la vista dentro de un arreglo sobre los ejes dados."""
+        destino = [{e: i for i, e in enumerate(eje)} for eje in ejes]
+        pos = [[d[e] for e in eje] for d, eje in zip(destino, self.ejes)]
+        return np.asarray(arreglo, dtype=float)[np.ix_(*pos)]
+
+    def __getitem__(self, clave):
+        if not isinstance(clave, tuple):
+            clave = (clave,)
+        try:
+            pos = tuple(p[k] for p, k in zip(self._pos, clave))
+        except KeyError:
+            if self._completos is not None and all(k in c for k, c in zip(clave, self._completos)):
+                return CERO
+            raise
+        return self.mvar[pos].item()
+
+    def get(self, clave, defecto=None):
+        try:
+            return self[clave]
+        except KeyError:
+            return defecto
+
+    def __contains__(self, clave):
+        return self.get(clave) is not None
+
+    def __len__(self):
+        return self.mvar.size
+
+
+class VistaUnion:
+    """
+    Une vistas con ejes de zona disjuntos (p.ej. I = vpot en zonas N y
+    vpozo en zonas P en la formulacion dispersa).
+    """
+    def __init__(self, vistas):
+        self.vistas = list(vistas)
+
+    def denso(self, ejes, atributo="X"):
+        return sum(v.denso(ejes, atributo) for v in self.vistas)
+
+    def fijar_start(self, arreglo, ejes):
+        for v in self.vistas:
+            v.fijar_start(arreglo, ejes)
+
+    def fijar(self, arreglo, ejes):
+        for v in self.vistas:
+            v.fijar(arreglo, ejes)
+
+    def __getitem__(self, clave):
+        for v in self.vistas:
+            if clave[0] in v._pos[0]:
+                return v[clave]
+        raise KeyError(clave)
+
+    def get(self, clave, defecto=None):
+        try:
+            return self[clave]
+        except KeyError:
+            return defecto
+
+    def __contains__(self, clave):
+        return self.get(clave) is not None
+
+    def __len__(self):
+        return sum(len(v) for v in self.vistas)
+
+
+def repartir_horas(total, tasa, n_horas):
+    """
+    Reparte un total diario en las primeras horas a la tasa maxima:
+    hora k recibe min(tasa, total - k*tasa). Con tasa = M da los caudales
+    horarios de un volumen; con tasa = 1 da las valvulas abiertas (y) de
+    un conteo de horas.
+
+    total  : arreglo (...) de totales diarios
+    return : arreglo (..., n_horas)
+    """
+    k = np.arange(n_horas)
+    reparto = np.clip(np.asarray(total, dtype=float)[..., None] - k * tasa, 0.0, tasa)
+    reparto[reparto < 1e-9] = 0.0
+    return reparto
+
+
+class VistaHoraria:
+    """
+    Vista horaria de una variable diaria (formulacion "diaria"): el total
+    del dia se reparte en las primeras horas de H_riego con repartir_horas.
+
+    diaria : Vista sobre (zonas, D_riego)
+    H_r    : horas de riego, en el orden en que se llenan
+    tasa   : M para caudales, 1 para valvulas
+    """
+    def __init__(self, diaria, H_r, tasa):
+        self.diaria = diaria
+        self.H_r = list(H_r)
+        self.tasa = tasa
+
+    def denso(self, ejes, atributo="X"):
+        diario = self.diaria.denso(ejes[:2], atributo)
+        if self.tasa == 1:
+            diario = np.rint(diario)       # conteo de horas (entero)
+        out = np.zeros([len(e) for e in ejes])
+        pos_H = {h: i for i, h in enumerate(ejes[2])}
+        out[:, :, [pos_H[h] for h in self.H_r]] = repartir_horas(diario, self.tasa, len(self.H_r))
+        return out
+
+    def fijar_start(self, arreglo, ejes):
+        """El Start diario es la suma de las horas (NaN si falta alguna)."""
+        self.diaria.fijar_start(np.asarray(arreglo, dtype=float).sum(axis=2), ejes[:2])
+
+    def fijar(self, arreglo, ejes):
+        """Fija el total diario (suma de las horas)."""
+        self.diaria.fijar(np.asarray(arreglo, dtype=float).sum(axis=2), ejes[:2])
+
+    def __len__(self):
+        return len(self.diaria)
+
+
+def por_zona(valor, z):
+    """Parametro escalar o mapping {uga_id: valor}."""
+    return valor[z] if isinstance(valor, dict) else valor
+
+
+def matriz_et(ET_dict, G, D):
+    """ET[z, d] como arreglo (len(G) x len(D)); directo si ET_dict es una TablaET."""
+    if hasattr(ET_dict, 'arreglo'):
+        return np.asarray(ET_dict.arreglo(G, D), dtype=float)
+    return np.array([[ET_dict[z, d] for d in D] for z in G], dtype=float).reshape(len(G), len(D))
+
+
+def tensores(datos):
+    """
+    Pasa los conjuntos y diccionarios de `datos` (cargar_datos.py) a arreglos densos
+    (zona, dia, hora) que usa el constructor matricial.
+
+    datos  : dict con G, L, P, N, D, H, H_noc, D_proh, A, beta_z, pars, ET_dict
+    return : dict de arreglos numpy
+    """
+    G, D, H = datos['G'], datos['D'], datos['H']
+    pos_G = {z: i for i, z in enumerate(G)}
+    set_P = set(datos['P'])
+    set_proh = set(datos['D_proh'])
+    set_noc = set(datos['H_noc'])
+    pars = datos['pars']
+    return {
+        'A':      np.array([datos['A'][z] for z in G], dtype=float),
+        'ET':     matriz_et(datos['ET_dict'], G, D),
+        # umbrales de humedad por zona (escalar o mapping {uga_id: valor})
+        'omega_min': np.array([por_zona(pars['omega^{min}_z'], z) for z in G], dtype=float),
+        'omega_max': np.array([por_zona(pars['omega^{max}_z'], z) for z in G], dtype=float),
+        'idx_P':  np.array([pos_G[z] for z in datos['P']], dtype=int),
+        'idx_N':  np.array([pos_G[z] for z in datos['N']], dtype=int),
+        'idx_noP': np.array([i for i, z in enumerate(G) if z not in set_P], dtype=int),
+        'dias_proh': np.array([i for i, d in enumerate(D) if d in set_proh], dtype=int),
+        'horas_dia': np.array([i for i, h in enumerate(H) if h not in set_noc], dtype=int),
+        'cap_lav':   np.array([min(datos['beta_z'][l], datos['pars']['C_cam_m3']) for l in datos['L']], dtype=float),
+        'beta_lav':  np.array([datos['beta_z'][l] for l in datos['L']], dtype=float),
+        # multiplicidad de cada zona en la funcion objetivo (agregacion.py)
+        'peso':      np.array([datos.get('peso', {}).get(z, 1) for z in G], dtype=float),
+        # horizonte rodante (horizonte_rodante.py): humedad fija el primer dia
+        # y lavados de los 13 dias anteriores al horizonte (para R8)
+        'omega_inicial': (np.array([datos['omega_inicial'][z] for z in G], dtype=float)
+                          if datos.get('omega_inicial') is not None else None),
+        'historia_ell':  (np.asarray(datos['historia_ell'], dtype=float).reshape(len(datos['L']), 13)
+                          if datos.get('historia_ell') is not None else np.zeros((len(datos['L']), 13))),
+    }
+
+
+def _familia(m, nombre):
+    """
+    Marca el comienzo de una familia de variables o restricciones (None =
+    fin de la construccion) para el registro de perfil.py, si hay uno.
+    """
+    if m._registro is not None:
+        m._registro.marcar(m, nombre)
+
+
+def _peso(pars, clave):
+    return pars[clave] if pars[clave] is not None else 0.0
+
+
+# Formulaciones de R8: "ventanas" (suma de los 14 dias en cada fila) o
+# "acumulada" (volumen acumulado por tramo; cada ventana es una diferencia)
+COBERTURAS = ("ventanas", "acumulada")
+
+
+def _columnas_cobertura(nL, nD, cobertura):
+    """Columnas extra de la formulacion de R8 (acum_ell solo en "acumulada")."""
+    if cobertura not in COBERTURAS:
+        raise ValueError(f"cobertura desconocida: {cobertura!r} (opciones: {', '.join(COBERTURAS)})")
+    return [("acum_ell", (nL, nD), GRB.CONTINUOUS, 0.0)] if cobertura == "acumulada" else []
+
+
+# termino de la funcion objetivo (peso en pars) -> familias cuyas columnas lo llevan
+TERMINOS = {'alpha': ('u',), 'beta': ('I',), 'gamma': ('y',), 'delta': ('ell',)}
+
+
+def pesos_unitarios(datos):
+    """datos con todos los pesos de la funcion objetivo en 1 (ver columnas_objetivo)."""
+    return dict(datos, pars=dict(datos['pars'], **dict.fromkeys(TERMINOS, 1.0)))
+
+
+def _mvars(vista):
+    """MVars de una vista (Vista, VistaUnion o VistaHoraria)."""
+    if isinstance(vista, VistaUnion):
+        return [mv for v in vista.vistas for mv in _mvars(v)]
+    if isinstance(vista, VistaHoraria):
+        return _mvars(vista.diaria)
+    return [vista.mvar] if vista.mvar.size else []
+
+
+def columnas_objetivo(m, v):
+    """
+    Columnas de cada termino de la funcion objetivo con su coeficiente
+    actual. Sobre un modelo construido con pesos_unitarios son los
+    coeficientes unitarios (con el peso por zona de la agregacion), que
+    escenarios.py y multiobjetivo.py escalan o separan sin reconstruir.
+    Solo constructores matriciales.
+
+    return : dict termino -> lista de (MVar, coeficientes)
+    """
+    m.update()
+    return {k: [(mv, np.array(mv.Obj)) for f in familias for mv in _mvars(v[f])]
+            for k, familias in TERMINOS.items()}
+
+
+def _nombres(prefijo, ejes):
+    """Nombres 'prefijo[e0,e1,...]' iguales a los de addVars, en bloque."""
+    nombres = np.array([prefijo + "["], dtype=object)
+    for k, eje in enumerate(ejes):
+        forma = [1] * len(ejes)
+        forma[k] = len(eje)
+        etiquetas = np.array([str(e) for e in eje], dtype=object).reshape(forma)
+        nombres = nombres + ("," if k else "") + etiquetas
+    return (nombres + "]").astype(str)
+
+
+# -------------------------------------------------------------
+#  Constructor original (bucles)
+# -------------------------------------------------------------
+def construir_modelo_bucles(datos, env=None, registro=None, cobertura="ventanas"):
+    """
+    Formulacion original de gurobi.py, fila por fila.
+
+    return : (modelo, dict de tupledicts por familia de variables)
+    """
+    if any(p != 1 for p in datos.get('peso', {}).values()):
+        raise ValueError("La formulacion por bucles no admite zonas agregadas (peso); usa 'matricial' o 'disperso'")
+    if datos.get('omega_inicial') is not None or datos.get('historia_ell') is not None:
+        raise ValueError("La formulacion por bucles no admite ventanas de horizonte rodante; usa 'matricial' o 'disperso'")
+    if cobertura not in COBERTURAS:
+        raise ValueError(f"cobertura desconocida: {cobertura!r} (opciones: {', '.join(COBERTURAS)})")
+    G, L, P, N = datos['G'], datos['L'], datos['P'], datos['N']
+    D, H, H_noc, D_proh = datos['D'], datos['H'], datos['H_noc'], datos['D_proh']
+    A, beta_z, pars, ET_dict = datos['A'], datos['beta_z'], datos['pars'], datos['ET_dict']
+
+    m = gp.Model("Modelo_Hidrico_Las_Condes", env=env)
+    m._registro = registro
+
+    # -------------------- VARIABLES ------------------------------
+    _familia(m, "variables")
+    omega = m.addVars(G, D, name="omega", lb=0)
+    y     = m.addVars(G, D, H, vtype=GRB.BINARY, name="y")
+    vpot  = m.addVars(G, D, H, name="vpot",  lb=0)
+    vpozo = m.addVars(P, D, H, name="vpozo", lb=0)
+    I     = m.addVars(G, D, H, name="I",     lb=0)
+    u     = m.addVars(G, D, name="u",        lb=0)
+
+    ell   = m.addVars(L, D, name="ell",  lb=0)
+    wwash = m.addVars(L, D, vtype=GRB.BINARY, name="w")
+
+    # ------------- RESTRICCIONES DEL MODELO ---------------------
+    # R1: No regar en dias prohibidos
+    _familia(m, "R1")
+    for z in G:
+        for d in D_proh:
+            for h in H:
+                m.addConstr(y[z,d,h]==0)
+                m.addConstr(vpot[z,d,h]==0)
+                if z in P:
+                    m.addConstr(vpozo[z,d,h]==0)
+
+    # R2: Riego solo en horario nocturno permitido
+    _familia(m, "R2")
+    for z in G:
+        for d in D:
+            for h in set(H)-set(H_noc):
+                m.addConstr(y[z,d,h]==0)
+
+    # R3: Compatibilidad de fuentes de agua
+    _familia(m, "R3")
+    for z in N:
+        for d in D:
+            for h in H:
+                m.addConstr(vpozo.get((z,d,h),0)==0)
+    for z in P:
+        for d in D:
+            for h in H:
+                m.addConstr(vpot[z,d,h]==0)
+
+    # R4: Caudal total y restriccion Big-M
+    _familia(m, "R4")
+    M_val = pars['M_m3ph'] or 1e4
+    for z in G:
+        for d in D:
+            for h in H:
+                m.addConstr(I[z,d,h]==vpot[z,d,h]+vpozo.get((z,d,h),0))
+                m.addConstr(I[z,d,h]<=M_val*y[z,d,h])
+
+    # R5: Balance de humedad en el suelo
+    _familia(m, "R5")
+    ET = matriz_et(ET_dict, G, D)  # zonas x dias (calendario.py), sin buscar tuplas en el bucle
+    for i, z in enumerate(G):
+        for k, d in enumerate(list(D)[:-1]):
+            et_value = float(ET[i, k+1]) #este valor de ET es el real y ya incluye el kc multiplicado por el et_o.
+            m.addConstr(
+                omega[z,d+1] ==
+                omega[z,d] +
+                pars['eta']*1000/A[z] * gp.quicksum(I[z,d,h] for h in H)
+                - et_value
+                + u[z,d]
+            )
+
+    # R6: Limites de humedad
+    _familia(m, "R6")
+    for z in G:
+        for d in D:
+            m.addConstr(omega[z,d] >= por_zona(pars['omega^{min}_z'], z) - u[z,d])
+            m.addConstr(omega[z,d] <= por_zona(pars['omega^{max}_z'], z))
+
+    # R7: Capacidad de lavado
+    _familia(m, "R7")
+    for d in D:
+        m.addConstr(gp.quicksum(wwash[z,d] for z in L) <= 1)
+        for z in L:
+            m.addConstr(ell[z,d] <= min(beta_z[z], pars['C_cam_m3']) * wwash[z,d])
+
+    # R8: Cobertura de lavado en 14 dias
+    _familia(m, "R8")
+    if cobertura == "acumulada":
+        # acum[z,d] = ell[z,1] + ... + ell[z,d]; cada ventana es una diferencia
+        acum = m.addVars(L, D, name="acum_ell", lb=0)
+        for z in L:
+            for d in D:
+                m.addConstr(acum[z,d] == (acum[z,d-1] if d > 1 else 0) + ell[z,d])
+            for d in range(14, pars['D']+1):
+                m.addConstr(acum[z,d] - (acum[z,d-14] if d > 14 else 0) >= beta_z[z])
+    else:
+        for z in L:
+            for d in range(14, pars['D']+1):
+                m.addConstr(gp.quicksum(ell[z,dd] for dd in range(d-13, d+1)) >= beta_z[z])
+
+    # ------------------- FUNCIoN OBJETIVO ------------------------
+    _familia(m, "objetivo")
+    obj  = pars['alpha']*u.sum()  if pars['alpha'] is not None else 0
+    obj += pars['beta']*I.sum()   if pars['beta'] is not None else 0
+    obj += pars['gamma']*y.sum()  if pars['gamma'] is not None else 0
+    obj += pars['delta']*ell.sum() if pars['delta'] is not None else 0
+    m.setObjective(obj, GRB.MINIMIZE)
+
+    v = dict(omega=omega, y=y, vpot=vpot, vpozo=vpozo, I=I, u=u, ell=ell, wwash=wwash)
+    _familia(m, None)
+    return m, v
+
+
+# -------------------------------------------------------------
+#  Constructor matricial
+# -------------------------------------------------------------
+class Columnas:
+    """
+    Disposicion de las columnas del modelo: cada familia de variables es
+    un bloque contiguo de un unico MVar, en orden C (zona, dia, hora).
+
+    familias : lista de (nombre, forma, vtype, coef. objetivo)
+               el coef. puede ser escalar o arreglo con la forma del bloque
+    """
+    def __init__(self, familias):
+        self.forma, self.inicio = {}, {}
+        self._vtype, self._obj = [], []
+        total = 0
+        for nombre, forma, vtype, obj in familias:
+            n = int(np.prod(forma))
+            self.forma[nombre], self.inicio[nombre] = tuple(forma), total
+            self._vtype.append(np.full(n, vtype))
+            self._obj.append(np.broadcast_to(np.asarray(obj, dtype=float), forma).ravel())
+            total += n
+        self.total = total
+
+    def col(self, nombre, *idx):
+        """Indice global de columna para los indices (broadcast) de la familia."""
+        idx = np.broadcast_arrays(*[np.asarray(i) for i in idx])
+        return self.inicio[nombre] + np.ravel_multi_index(idx, self.forma[nombre])
+
+    def crear(self, m):
+        """Crea todas las columnas con un solo addMVar y devuelve un MVar por familia."""
+        x = m.addMVar(self.total, lb=0.0,
+                      obj=np.concatenate(self._obj) if self._obj else 0.0,
+                      vtype=np.concatenate(self._vtype) if self._vtype else GRB.CONTINUOUS)
+        return x, {f: x[self.inicio[f]:self.inicio[f] + int(np.prod(fm))].reshape(fm)
+                   for f, fm in self.forma.items()}
+
+
+def _malla(*ejes):
+    """Todas las combinaciones de los indices dados, aplanadas en orden C."""
+    return [e.ravel() for e in np.meshgrid(*[np.asarray(e) for e in ejes], indexing='ij')]
+
+
+def agregar_filas(m, x, ncols, bloques, sentido, rhs):
+    """
+    Agrega una familia de restricciones con un solo addMConstr.
+
+    bloques : lista de (fila, columna, coeficiente), arreglos del mismo largo
+              (un termino por entrada; varias entradas pueden ir a la misma fila)
+    rhs     : arreglo con el lado derecho de cada fila; define el nro. de filas
+    """
+    rhs = np.asarray(rhs, dtype=float).ravel()
+    if not len(rhs):
+        return None
+    if bloques:
+        filas = np.concatenate([np.broadcast_to(b[0], np.shape(b[1])).ravel() for b in bloques])
+        cols = np.concatenate([np.asarray(b[1]).ravel() for b in bloques])
+        coefs = np.concatenate([np.broadcast_to(np.asarray(b[2], dtype=float), np.shape(b[1])).ravel()
+                                for b in bloques])
+    else:
+        filas = cols = np.zeros(0, dtype=int)
+        coefs = np.zeros(0)
+    # Solo se pasa el rango de columnas que toca la familia: addMConstr
+    # recorre x completo en cada llamada y eso domina en modelos grandes.
+    c0 = int(cols.min()) if cols.size else 0
+    c1 = int(cols.max()) + 1 if cols.size else 1
+    A = sp.csr_matrix((coefs, (filas, cols - c0)), shape=(len(rhs), c1 - c0))
+    return m.addMConstr(A, x[c0:c1], sentido, rhs)
+
+
+def _limites_y_lavado(m, x, cols, datos, t):
+    """R6-R8: comunes a las formulaciones matricial y dispersa."""
+    n, col = cols.total, cols.col
+    nG, nD, nL = len(datos['G']), len(datos['D']), len(datos['L'])
+    rG, rD, rL = np.arange(nG), np.arange(nD), np.arange(nL)
+
+    # R6: Limites de humedad
+    # (filas en orden zona, dia; quedan en m._humedad para cambiar su lado
+    # derecho sin reconstruir el modelo, ver escenarios.py)
+    _familia(m, "R6")
+    zs, ds = _malla(rG, rD)
+    f = np.arange(zs.size)
+    m._humedad = {
+        'omega_min': agregar_filas(m, x, n, [(f, col('omega', zs, ds), 1.0),
+                                             (f, col('u', zs, ds), 1.0)], '>', t['omega_min'][zs]),
+        'omega_max': agregar_filas(m, x, n, [(f, col('omega', zs, ds), 1.0)], '<', t['omega_max'][zs]),
+    }
+
+    # R7: Capacidad de lavado
+    _familia(m, "R7")
+    ls, ds = _malla(rL, rD)
+    agregar_filas(m, x, n, [(ds, col('wwash', ls, ds), 1.0)], '<', np.ones(nD))
+    f = np.arange(ls.size)
+    agregar_filas(m, x, n, [(f, col('ell', ls, ds), 1.0),
+                            (f, col('wwash', ls, ds), -t['cap_lav'][ls])], '<', np.zeros(f.size))
+
+    # R8: Cobertura de lavado en 14 dias
+    # una fila por tramo y dia d >= 14 del horizonte (dias d-13..d); los dias
+    # anteriores al horizonte entran como constantes desde historia_ell
+    _familia(m, "R8")
+    d_fin = np.flatnonzero(np.asarray(datos['D']) >= 14)
+    n_vent = d_fin.size
+    if 'acum_ell' in cols.forma:
+        _cobertura_acumulada(m, x, cols, t, d_fin)
+        return
+    ls, ks, js = _malla(rL, np.arange(n_vent), np.arange(14))
+    p = d_fin[ks] - 13 + js
+    dentro = p >= 0
+    f = (ls * n_vent + ks)[dentro]
+    hist = np.zeros((nL, n_vent))
+    np.add.at(hist, (ls[~dentro], ks[~dentro]), t['historia_ell'][ls[~dentro], 13 + p[~dentro]])
+    agregar_filas(m, x, n, [(f, col('ell', ls[dentro], p[dentro]), 1.0)], '>',
+                  t['beta_lav'][:, None] - hist)
+
+
+def _cobertura_acumulada(m, x, cols, t, d_fin):
+    """
+    R8 con el volumen acumulado por tramo, acum[l,d] = ell[l,0] + ... + ell[l,d]:
+      acum[l,d] - acum[l,d-1] - ell[l,d] = 0
+      acum[l,e] - acum[l,e-14]            >= beta_l - historia en la ventana
+    Dos o tres no ceros por fila en vez de 14: la matriz crece lineal con el
+    horizonte y no con ventana x horizonte. Mismas filas de ventana y mismo
+    orden (tramo, dia) que la version con sumas.
+    """
+    n, col = cols.total, cols.col
+    nL, nD = cols.forma['acum_ell']
+    ls, ds = _malla(np.arange(nL), np.arange(nD))
+    f = np.arange(ls.size)
+    previo = ds > 0
+    agregar_filas(m, x, n, [(f, col('acum_ell', ls, ds), 1.0),
+                            (f[previo], col('acum_ell', ls[previo], ds[previo] - 1), -1.0),
+                            (f, col('ell', ls, ds), -1.0)], '=', np.zeros(f.size))
+    # historia (dias -13..-1) que cae en la ventana que termina en cada d_fin
+    acum_hist = np.concatenate([np.zeros((nL, 1)), np.cumsum(t['historia_ell'], axis=1)], axis=1)
+    hist = acum_hist[:, -1:] - acum_hist[:, np.minimum(d_fin, 13)]
+    ls, ks = _malla(np.arange(nL), np.arange(d_fin.size))
+    f = np.arange(ls.size)
+    e = d_fin[ks]
+    resta = e >= 14
+    agregar_filas(m, x, n, [(f, col('acum_ell', ls, e), 1.0),
+                            (f[resta], col('acum_ell', ls[resta], e[resta] - 14), -1.0)], '>',
+                  t['beta_lav'][:, None] - hist)
+
+
+def _fijar_omega_inicial(mv, t):
+    """Humedad del primer dia fija (continuidad entre ventanas del horizonte rodante)."""
+    if t['omega_inicial'] is not None and mv['omega'].size:
+        mv['omega'][:, 0].LB = t['omega_inicial']
+        mv['omega'][:, 0].UB = t['omega_inicial']
+
+
+def construir_modelo_matricial(datos, env=None, nombres=False, registro=None, cobertura="ventanas"):
+    """
+    Misma formulacion que construir_modelo_bucles, pero las variables se
+    crean con un solo addMVar y cada familia R1-R8 se agrega con un solo
+    addMConstr, armando la matriz dispersa con aritmetica de indices sobre
+    los tensores (zona, dia, hora). Las columnas quedan en el mismo orden
+    que con addVars, y las filas son las mismas (incluidas las filas vacias
+    0 <= 0 que genera R3 para las zonas N).
+
+    nombres : si True, pone a las variables los mismos nombres que addVars
+              (omega[1001,1], ...). Cuesta varios segundos en la instancia
+              completa, por eso viene apagado.
+    return  : (modelo, dict de Vista por familia de variables)
+    """
+    G, L, P, N = datos['G'], datos['L'], datos['P'], datos['N']
+    D, H = datos['D'], datos['H']
+    pars = datos['pars']
+    t = tensores(datos)
+    w = t['peso']
+    nG, nD, nH, nP, nL = len(G), len(D), len(H), len(P), len(L)
+    rG, rD, rH, rP = (np.arange(n) for n in (nG, nD, nH, nP))
+
+    m = gp.Model("Modelo_Hidrico_Las_Condes", env=env)
+    m._registro = registro
+    m.ModelSense = GRB.MINIMIZE
+
+    # -------------------- VARIABLES ------------------------------
+    # Los coeficientes de la funcion objetivo se cargan directo en obj
+    _familia(m, "variables")
+    cols = Columnas([
+        ("omega", (nG, nD),     GRB.CONTINUOUS, 0.0),
+        ("y",     (nG, nD, nH), GRB.BINARY,     _peso(pars, 'gamma') * w[:, None, None]),
+        ("vpot",  (nG, nD, nH), GRB.CONTINUOUS, 0.0),
+        ("vpozo", (nP, nD, nH), GRB.CONTINUOUS, 0.0),
+        ("I",     (nG, nD, nH), GRB.CONTINUOUS, _peso(pars, 'beta') * w[:, None, None]),
+        ("u",     (nG, nD),     GRB.CONTINUOUS, _peso(pars, 'alpha') * w[:, None]),
+        ("ell",   (nL, nD),     GRB.CONTINUOUS, _peso(pars, 'delta')),
+        ("wwash", (nL, nD),     GRB.BINARY,     0.0),
+    ] + _columnas_cobertura(nL, nD, cobertura))
+    x, mv = cols.crear(m)
+    n = cols.total
+    col = cols.col
+
+    if nombres:
+        for f, pref, ejes in [("omega", "omega", (G, D)), ("y", "y", (G, D, H)),
+                              ("vpot", "vpot", (G, D, H)), ("vpozo", "vpozo", (P, D, H)),
+                              ("I", "I", (G, D, H)), ("u", "u", (G, D)),
+                              ("ell", "ell", (L, D)), ("wwash", "w", (L, D))]:
+            if mv[f].size:
+                mv[f].VarName = _nombres(pref, ejes)
+
+    def fijar_cero(c):
+        """Una fila x_c == 0 por cada columna c."""
+        return agregar_filas(m, x, n, [(np.arange(c.size), c, 1.0)], '=', np.zeros(c.size))
+
+    # ------------- RESTRICCIONES DEL MODELO ---------------------
+    # R1: No regar en dias prohibidos
+    _familia(m, "R1")
+    dp = t['dias_proh']
+    fijar_cero(col('y', *_malla(rG, dp, rH)))
+    fijar_cero(col('vpot', *_malla(rG, dp, rH)))
+    fijar_cero(col('vpozo', *_malla(rP, dp, rH)))
+
+    # R2: Riego solo en horario nocturno permitido
+    _familia(m, "R2")
+    fijar_cero(col('y', *_malla(rG, rD, t['horas_dia'])))
+
+    # R3: Compatibilidad de fuentes de agua
+    # (las zonas N no tienen vpozo: la fila original queda vacia, 0 <= 0)
+    _familia(m, "R3")
+    agregar_filas(m, x, n, [], '<', np.zeros(len(N) * nD * nH))
+    fijar_cero(col('vpot', *_malla(t['idx_P'], rD, rH)))
+
+    # R4: Caudal total y restriccion Big-M
+    _familia(m, "R4")
+    M_val = pars['M_m3ph'] or 1e4
+    zs, ds, hs = _malla(t['idx_noP'], rD, rH)
+    f = np.arange(zs.size)
+    agregar_filas(m, x, n, [(f, col('I', zs, ds, hs), 1.0),
+                            (f, col('vpot', zs, ds, hs), -1.0)], '=', np.zeros(f.size))
+    ps, ds, hs = _malla(rP, rD, rH)
+    zs = t['idx_P'][ps]
+    f = np.arange(ps.size)
+    agregar_filas(m, x, n, [(f, col('I', zs, ds, hs), 1.0),
+                            (f, col('vpot', zs, ds, hs), -1.0),
+                            (f, col('vpozo', ps, ds, hs), -1.0)], '=', np.zeros(f.size))
+    zs, ds, hs = _malla(rG, rD, rH)
+    f = np.arange(zs.size)
+    agregar_filas(m, x, n, [(f, col('I', zs, ds, hs), 1.0),
+                            (f, col('y', zs, ds, hs), -M_val)], '<', np.zeros(f.size))
+
+    # R5: Balance de humedad en el suelo
+    # fila (z, d) para d = 0..nD-2:  omega[d+1] - omega[d] - coef_z*sum_h I[d,h] - u[d] = -ET[d+1]
+    # (quedan en m._balance, en orden zona, dia, para cambiar la ET sin
+    # reconstruir el modelo, ver replanificacion.py)
+    _familia(m, "R5")
+    coef = pars['eta'] * 1000 / t['A']
+    zs, ds = _malla(rG, rD[:-1])
+    f = np.arange(zs.size)
+    zh, dh, hh = _malla(rG, rD[:-1], rH)
+    m._balance = agregar_filas(m, x, n, [(f, col('omega', zs, ds + 1), 1.0),
+                                         (f, col('omega', zs, ds), -1.0),
+                                         (np.repeat(f, nH), col('I', zh, dh, hh), -coef[zh]),
+                                         (f, col('u', zs, ds), -1.0)], '=', -t['ET'][:, 1:])
+
+    _limites_y_lavado(m, x, cols, datos, t)
+    _fijar_omega_inicial(mv, t)
+
+    v = dict(
+        omega=Vista(mv['omega'], (G, D)), y=Vista(mv['y'], (G, D, H)),
+        vpot=Vista(mv['vpot'], (G, D, H)), vpozo=Vista(mv['vpozo'], (P, D, H)),
+        I=Vista(mv['I'], (G, D, H)), u=Vista(mv['u'], (G, D)),
+        ell=Vista(mv['ell'], (L, D)), wwash=Vista(mv['wwash'], (L, D)),
+    )
+    _familia(m, None)
+    return m, v
+
+
+# -------------------------------------------------------------
+#  Constructor disperso (solo tuplas admisibles)
+# -------------------------------------------------------------
+def construir_modelo_disperso(datos, env=None, registro=None, cobertura="ventanas"):
+    """
+    Formulacion equivalente que solo crea variables de riego para las
+    tuplas (zona, dia, hora) admisibles (ver indices.py):
+      - y       : zonas G x dias permitidos x horas de H_noc
+      - vpot    : zonas no P, mismos dias/horas
+      - vpozo   : zonas P, mismos dias/horas
+      - I       : no se crea; es vpot (zonas N) o vpozo (zonas P)
+    Con eso R1-R3 y la igualdad de R4 desaparecen, y no hace falta que
+    el presolve de Gurobi limpie las filas fijadas a cero. El optimo es
+    el mismo que el de la formulacion original.
+
+    return : (modelo, dict de vistas por familia de variables; las claves
+              no admisibles devuelven CERO)
+    """
+    G, L = datos['G'], datos['L']
+    D, H = datos['D'], datos['H']
+    pars = datos['pars']
+    t = tensores(datos)
+    w = t['peso']
+    idx = indices_admisibles(datos)
+    nG, nD, nL = len(G), len(D), len(L)
+    dias, horas = idx['dias'], idx['horas']
+    nDr, nHr = len(dias), len(horas)
+    nPot, nPozo = len(idx['zonas_pot']), len(idx['zonas_pozo'])
+    rG, rD = np.arange(nG), np.arange(nD)
+
+    m = gp.Model("Modelo_Hidrico_Las_Condes", env=env)
+    m._registro = registro
+    m.ModelSense = GRB.MINIMIZE
+
+    # -------------------- VARIABLES ------------------------------
+    _familia(m, "variables")
+    cols = Columnas([
+        ("omega", (nG, nD),          GRB.CONTINUOUS, 0.0),
+        ("y",     (nG, nDr, nHr),    GRB.BINARY,     _peso(pars, 'gamma') * w[:, None, None]),
+        ("vpot",  (nPot, nDr, nHr),  GRB.CONTINUOUS, _peso(pars, 'beta') * w[idx['zonas_pot'], None, None]),
+        ("vpozo", (nPozo, nDr, nHr), GRB.CONTINUOUS, _peso(pars, 'beta') * w[idx['zonas_pozo'], None, None]),
+        ("u",     (nG, nD),          GRB.CONTINUOUS, _peso(pars, 'alpha') * w[:, None]),
+        ("ell",   (nL, nD),          GRB.CONTINUOUS, _peso(pars, 'delta')),
+        ("wwash", (nL, nD),          GRB.BINARY,     0.0),
+    ] + _columnas_cobertura(nL, nD, cobertura))
+    x, mv = cols.crear(m)
+    n, col = cols.total, cols.col
+
+    # ------------- RESTRICCIONES DEL MODELO ---------------------
+    # R1-R3: implicitas en los indices
+    # R4: Big-M sobre el caudal de la unica fuente de cada zona
+    _familia(m, "R4")
+    M_val = pars['M_m3ph'] or 1e4
+    for fuente, zonas in [("vpot", idx['zonas_pot']), ("vpozo", idx['zonas_pozo'])]:
+        ks, ds, hs = _malla(np.arange(len(zonas)), np.arange(nDr), np.arange(nHr))
+        f = np.arange(ks.size)
+        agregar_filas(m, x, n, [(f, col(fuente, ks, ds, hs), 1.0),
+                                (f, col('y', zonas[ks], ds, hs), -M_val)], '<', np.zeros(f.size))
+
+    # R5: Balance de humedad en el suelo
+    # el riego del dia d solo aparece si d es un dia permitido (y no el ultimo)
+    _familia(m, "R5")
+    coef = pars['eta'] * 1000 / t['A']
+    zs, ds = _malla(rG, rD[:-1])
+    bloques = [(zs * (nD - 1) + ds, col('omega', zs, ds + 1), 1.0),
+               (zs * (nD - 1) + ds, col('omega', zs, ds), -1.0),
+               (zs * (nD - 1) + ds, col('u', zs, ds), -1.0)]
+    j_dias = np.arange(nDr)[dias < nD - 1]
+    for fuente, zonas in [("vpot", idx['zonas_pot']), ("vpozo", idx['zonas_pozo'])]:
+        ks, js, hs = _malla(np.arange(len(zonas)), j_dias, np.arange(nHr))
+        bloques.append((zonas[ks] * (nD - 1) + dias[js], col(fuente, ks, js, hs), -coef[zonas[ks]]))
+    m._balance = agregar_filas(m, x, n, bloques, '=', -t['ET'][:, 1:])
+
+    _limites_y_lavado(m, x, cols, datos, t)
+    _fijar_omega_inicial(mv, t)
+
+    D_r, H_r = idx['D_riego'], idx['H_riego']
+    vpot = Vista(mv['vpot'], (idx['G_pot'], D_r, H_r), completos=(G, D, H))
+    vpozo = Vista(mv['vpozo'], (idx['G_pozo'], D_r, H_r), completos=(idx['G_pozo'], D, H))
+    v = dict(
+        omega=Vista(mv['omega'], (G, D)),
+        y=Vista(mv['y'], (G, D_r, H_r), completos=(G, D, H)),
+        vpot=vpot, vpozo=vpozo, I=VistaUnion([vpot, vpozo]),
+        u=Vista(mv['u'], (G, D)),
+        ell=Vista(mv['ell'], (L, D)), wwash=Vista(mv['wwash'], (L, D)),
+    )
+    _familia(m, None)
+    return m, v
+
+
+# -------------------------------------------------------------
+#  Constructor diario (horas agregadas)
+# -------------------------------------------------------------
+def construir_modelo_diario(datos, env=None, registro=None, cobertura="ventanas"):
+    """
+    Las horas de H_noc de un dia permitido son intercambiables (ET es
+    diaria y y se cuenta linealmente en el objetivo), asi que basta con,
+    por zona y dia permitido:
+      - y     : horas de valvula abierta, entera en [0, |H_noc|]
+      - vpot  : volumen del dia (zonas no P)
+      - vpozo : volumen del dia (zonas P)
+    con R4 como volumen <= M * y. El optimo es el de la formulacion
+    original; las vistas devuelven el plan horario repartiendo el volumen
+    en las primeras horas de H_noc a caudal M (VistaHoraria).
+
+    return : (modelo, dict de vistas por familia con ejes horarios)
+    """
+    G, L = datos['G'], datos['L']
+    D = datos['D']
+    pars = datos['pars']
+    t = tensores(datos)
+    w = t['peso']
+    idx = indices_admisibles(datos)
+    nG, nD, nL = len(G), len(D), len(L)
+    dias, nHr = idx['dias'], len(idx['horas'])
+    nDr = len(dias)
+    nPot, nPozo = len(idx['zonas_pot']), len(idx['zonas_pozo'])
+    rG, rD = np.arange(nG), np.arange(nD)
+
+    m = gp.Model("Modelo_Hidrico_Las_Condes", env=env)
+    m._registro = registro
+    m.ModelSense = GRB.MINIMIZE
+
+    # -------------------- VARIABLES ------------------------------
+    _familia(m, "variables")
+    cols = Columnas([
+        ("omega", (nG, nD),     GRB.CONTINUOUS, 0.0),
+        ("y",     (nG, nDr),    GRB.INTEGER,    _peso(pars, 'gamma') * w[:, None]),
+        ("vpot",  (nPot, nDr),  GRB.CONTINUOUS, _peso(pars, 'beta') * w[idx['zonas_pot'], None]),
+        ("vpozo", (nPozo, nDr), GRB.CONTINUOUS, _peso(pars, 'beta') * w[idx['zonas_pozo'], None]),
+        ("u",     (nG, nD),     GRB.CONTINUOUS, _peso(pars, 'alpha') * w[:, None]),
+        ("ell",   (nL, nD),     GRB.CONTINUOUS, _peso(pars, 'delta')),
+        ("wwash", (nL, nD),     GRB.BINARY,     0.0),
+    ] + _columnas_cobertura(nL, nD, cobertura))
+    x, mv = cols.crear(m)
+    n, col = cols.total, cols.col
+    if mv['y'].size:
+        mv['y'].UB = nHr
+
+    # ------------- RESTRICCIONES DEL MODELO ---------------------
+    # R1-R3: implicitas en los indices
+    # R4: volumen del dia <= M * horas de valvula
+    _familia(m, "R4")
+    M_val = pars['M_m3ph'] or 1e4
+    for fuente, zonas in [("vpot", idx['zonas_pot']), ("vpozo", idx['zonas_pozo'])]:
+        ks, ds = _malla(np.arange(len(zonas)), np.arange(nDr))
+        f = np.arange(ks.size)
+        agregar_filas(m, x, n, [(f, col(fuente, ks, ds), 1.0),
+                                (f, col('y', zonas[ks], ds), -M_val)], '<', np.zeros(f.size))
+
+    # R5: Balance de humedad en el suelo
+    _familia(m, "R5")
+    coef = pars['eta'] * 1000 / t['A']
+    zs, ds = _malla(rG, rD[:-1])
+    bloques = [(zs * (nD - 1) + ds, col('omega', zs, ds + 1), 1.0),
+               (zs * (nD - 1) + ds, col('omega', zs, ds), -1.0),
+               (zs * (nD - 1) + ds, col('u', zs, ds), -1.0)]
+    j_dias = np.arange(nDr)[dias < nD - 1]
+    for fuente, zonas in [("vpot", idx['zonas_pot']), ("vpozo", idx['zonas_pozo'])]:
+        ks, js = _malla(np.arange(len(zonas)), j_dias)
+        bloques.append((zonas[ks] * (nD - 1) + dias[js], col(fuente, ks, js), -coef[zonas[ks]]))
+    m._balance = agregar_filas(m, x, n, bloques, '=', -t['ET'][:, 1:])
+
+    _limites_y_lavado(m, x, cols, datos, t)
+    _fijar_omega_inicial(mv, t)
+
+    D_r, H_r = idx['D_riego'], idx['H_riego']
+    vpot = VistaHoraria(Vista(mv['vpot'], (idx['G_pot'], D_r)), H_r, M_val)
+    vpozo = VistaHoraria(Vista(mv['vpozo'], (idx['G_pozo'], D_r)), H_r, M_val)
+    v = dict(
+        omega=Vista(mv['omega'], (G, D)),
+        y=VistaHoraria(Vista(mv['y'], (G, D_r)), H_r, 1),
+        vpot=vpot, vpozo=vpozo, I=VistaUnion([vpot, vpozo]),
+        u=Vista(mv['u'], (G, D)),
+        ell=Vista(mv['ell'], (L, D)), wwash=Vista(mv['wwash'], (L, D)),
+    )
+    _familia(m, None)
+    return m, v
+
+
+CONSTRUCTORES = {
+    "bucles": construir_modelo_bucles,
+    "matricial": construir_modelo_matricial,
+    "disperso": construir_modelo_disperso,
+    "diario": construir_modelo_diario,
+}
+
+
+def construir_modelo(datos, metodo="disperso", **kwargs):
+    """
+    Punto de entrada comun: elige el constructor por nombre.
+    registro : (opcional) perfil.RegistroFamilias, para medir filas, no
+               ceros y tiempo de cada familia R1-R8
+    cobertura : "ventanas" (por defecto) o "acumulada", formulacion de R8
+                (COBERTURAS)
+    """
+    if metodo not in CONSTRUCTORES:
+        raise ValueError(f"Constructor desconocido: {metodo!r} (opciones: {list(CONSTRUCTORES)})")
+    return CONSTRUCTORES[metodo](datos, **kwargs)
@@ -0,0 +1,129 @@
+# -------------------------------------------------------------
+#  Objetivo jerarquico (lexicografico)
+#  En vez de sumar deficit, volumen y activaciones con pesos muy
+#  distintos (alpha = 1000 frente a 1), cada nivel es un objetivo de
+#  Gurobi (setObjectiveN) con su prioridad: primero se minimiza el
+#  deficit de humedad, luego el volumen de agua sin empeorar el deficit
+#  mas alla de su tolerancia, y al final las activaciones de valvula.
+#  Dentro de un nivel los terminos se suman con sus pesos de pars
+#  (p.ej. beta*riego + delta*lavado). Cada nivel tiene su TimeLimit
+#  (getMultiobjEnv) y despues de resolver se informa el valor de cada uno.
+#
+#  Uso:
+#    python multiobjetivo.py --zonas 2 --dias 30    # compara con el ponderado
+# -------------------------------------------------------------
+import argparse
+import time
+
+import gurobipy as gp #type: ignore
+import pandas as pd #type: ignore
+
+from modelo import construir_modelo, pesos_unitarios, columnas_objetivo
+from solucion import Solucion, evaluar_objetivo
+
+# De mayor a menor prioridad. abstol/reltol: cuanto puede empeorar el
+# nivel cuando se optimizan los siguientes; TimeLimit en segundos (None = sin limite)
+NIVELES = [
+    {'nombre': 'deficit',      'terminos': ('alpha',),        'abstol': 1e-6, 'reltol': 0.0, 'TimeLimit': 600},
+    {'nombre': 'volumen',      'terminos': ('beta', 'delta'), 'abstol': 1e-6, 'reltol': 0.0, 'TimeLimit': 600},
+    {'nombre': 'activaciones', 'terminos': ('gamma',),        'abstol': 0.0,  'reltol': 0.0, 'TimeLimit': 300},
+]
+
+
+def construir_jerarquico(datos, metodo="disperso", niveles=NIVELES, construir=construir_modelo, **kwargs):
+    """
+    Construye el modelo y reemplaza la funcion objetivo ponderada por los niveles.
+
+    construir : funcion (datos, metodo, **kwargs) -> (m, v), p.ej.
+                cache_modelo.construir_con_cache
+    return    : (modelo, vistas) como construir_modelo
+    """
+    if metodo == "bucles":
+        raise ValueError("El objetivo jerarquico necesita un constructor matricial (matricial, disperso o diario)")
+    m, v = construir(pesos_unitarios(datos), metodo=metodo, **kwargs)
+    fijar_niveles(m, v, datos, niveles)
+    return m, v
+
+
+def fijar_niveles(m, v, datos, niveles=NIVELES):
+    """
+    m, v : modelo construido con pesos_unitarios(datos) (constructor matricial)
+    """
+    columnas = columnas_objetivo(m, v)
+    pars = datos['pars']
+    m.NumObj = len(niveles)
+    for i, nivel in enumerate(niveles):
+        expr = gp.LinExpr()
+        for k in nivel['terminos']:
+            peso = pars[k] if pars[k] is not None else 0.0
+            for mv, unidad in columnas[k]:
+                expr += (peso * unidad.ravel()) @ mv.reshape(-1)
+        m.setObjectiveN(expr, index=i, priority=len(niveles) - i, weight=1.0,
+                        abstol=nivel['abstol'], reltol=nivel['reltol'], name=nivel['nombre'])
+        if nivel.get('TimeLimit') is not None:
+            m.getMultiobjEnv(i).setParam("TimeLimit", nivel['TimeLimit'])
+
+
+def reporte_niveles(m, niveles=NIVELES, verbose=True):
+    """Valor de cada nivel en la solucion final (DataFrame, uno por fila)."""
+    filas = []
+    for i, nivel in enumerate(niveles):
+        m.Params.ObjNumber = i
+        filas.append({'nivel': nivel['nombre'], 'prioridad': m.ObjNPriority,
+                      'valor': m.ObjNVal if m.SolCount else float('nan'),
+                      'abstol': nivel['abstol'], 'reltol': nivel['reltol'],
+                      'TimeLimit': nivel.get('TimeLimit')})
+    tabla = pd.DataFrame(filas)
+    if verbose:
+        print("\n----- Objetivo jerarquico -----")
+        for f in filas:
+            print(f"  {f['prioridad']}. {f['nivel']:<13} {f['valor']:>14,.4f}")
+    return tabla
+
+
+def resolver_jerarquico(datos, metodo="disperso", niveles=NIVELES, params=None, env=None, verbose=True):
+    """
+    Construye, resuelve e informa los niveles.
+
+    return : (Solucion con objetivo = funcion ponderada de datos['pars'],
+              para comparar con el modo ponderado; tabla de reporte_niveles)
+    """
+    m, v = construir_jerarquico(datos, metodo=metodo, niveles=niveles, env=env)
+    for k, val in (params or {}).items():
+        m.setParam(k, val)
+    m.optimize()
+    tabla = reporte_niveles(m, niveles, verbose=verbose)
+    sol = Solucion.desde_variables(v, datos, m)
+    sol.objetivo = evaluar_objetivo(sol, datos)
+    m.discardMultiobjEnvs()
+    m.dispose()
+    return sol, tabla
+
+
+if __name__ == "__main__":
+    from benchmark_construccion import instancia
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--zonas", type=int, default=None)
+    ap.add_argument("--dias", type=int, default=None)
+    ap.add_argument("--constructor", default="disperso")
+    args = ap.parse_args()
+    datos = instancia(args.zonas, args.dias)
+
+    with gp.Env(params={"OutputFlag": 0}) as env:
+        t0 = time.perf_counter()
+        m, v = construir_modelo(datos, metodo=args.constructor, env=env)
+        m.optimize()
+        ponderada = Solucion.desde_variables(v, datos, m)
+        t_pond = time.perf_counter() - t0
+        m.dispose()
+
+        t0 = time.perf_counter()
+        jerarquica, tabla = resolver_jerarquico(datos, metodo=args.constructor, env=env)
+        t_jer = time.perf_counter() - t0
+
+    for nombre, sol, t in [("ponderado", ponderada, t_pond), ("jerarquico", jerarquica, t_jer)]:
+        a = sol.arreglos
+        print(f"{nombre:<11} {t:7.2f} s  objetivo ponderado {sol.objetivo:,.4f}  "
+              f"deficit {a['u'].sum():,.4f}  volumen {a['I'].sum() + a['ell'].sum():,.2f} m³  "
+              f"activaciones {a['y'].sum():,.0f}")
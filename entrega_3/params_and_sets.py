@@ -1,781 +1,21 @@
 # -------------------------------------------------------------
 # Conjuntos para el modelo de optimización
+# Se leen de params.yaml + zonas.csv (cargar_datos.py); este modulo
+# queda por compatibilidad con scripts que importan los nombres sueltos.
 # -------------------------------------------------------------
-
-# Zonas de riego (G)
-G = [
-    '1001',
-    '1002',
-    '1003',
-    '1004',
-    '1005',
-    '1006',
-    '1007',
-    '1008',
-    '1009',
-    '1010',
-    '2001',
-    '2002',
-    '2003',
-    '2004',
-    '2005',
-    '2006',
-    '2007',
-    '2008',
-    '2009',
-    '2010',
-    '3001',
-    '3002',
-    '3003',
-    '3004',
-    '3005',
-    '3006',
-    '3007',
-    '3008',
-    '3009',
-    '3010',
-    '4001',
-    '4002',
-    '4003',
-    '4004',
-    '4005',
-    '4006',
-    '4007',
-    '4008',
-    '4009',
-    '4010',
-    '5001',
-    '5002',
-    '5003',
-    '5004',
-    '5005',
-    '5006',
-    '5007',
-    '5008',
-    '5009',
-    '5010',
-    '6001',
-    '6002',
-    '6003',
-    '6004',
-    '6005',
-    '6006',
-    '6007',
-    '6008',
-    '6009',
-    '6010',
-    '7001',
-    '7002',
-    '7003',
-    '7004',
-    '7005',
-    '7006',
-    '7007',
-    '7008',
-    '7009',
-    '7010',
-    '8001',
-    '8002',
-    '8003',
-    '8004',
-    '8005',
-    '8006',
-    '8007',
-    '8008',
-    '8009',
-    '8010',
-    '9001',
-    '9002',
-    '9003',
-    '9004',
-    '9005',
-    '9006',
-    '9007',
-    '9008',
-    '9009',
-    '9010',
-    '10001',
-    '10002',
-    '10003',
-    '10004',
-    '10005',
-    '10006',
-    '10007',
-    '10008',
-    '10009',
-    '10010',
-    '11001',
-    '11002',
-    '11003',
-    '11004',
-    '11005',
-    '11006',
-    '11007',
-    '11008',
-    '11009',
-    '11010',
-    '12001',
-    '12002',
-    '12003',
-    '12004',
-    '12005',
-    '12006',
-    '12007',
-    '12008',
-    '12009',
-    '12010',
-    '13001',
-    '13002',
-    '13003',
-    '13004',
-    '13005',
-    '13006',
-    '13007',
-    '13008',
-    '13009',
-    '13010',
-    '14001',
-    '14002',
-    '14003',
-    '14004',
-    '14005',
-    '14006',
-    '14007',
-    '14008',
-    '14009',
-    '14010',
-    '15001',
-    '15002',
-    '15003',
-    '15004',
-    '15005',
-    '15006',
-    '15007',
-    '15008',
-    '15009',
-    '15010',
-    '16001',
-    '16002',
-    '16003',
-    '16004',
-    '16005',
-    '16006',
-    '16007',
-    '16008',
-    '16009',
-    '16010',
-    '17001',
-    '17002',
-    '17003',
-    '17004',
-    '17005',
-    '17006',
-    '17007',
-    '17008',
-    '17009',
-    '17010',
-    '18001',
-    '18002',
-    '18003',
-    '18004',
-    '18005',
-    '18006',
-    '18007',
-    '18008',
-    '18009',
-    '18010',
-    '19001',
-    '19002',
-    '19003',
-    '19004',
-    '19005',
-    '19006',
-    '19007',
-    '19008',
-    '19009',
-    '19010',
-    '20001',
-    '20002',
-    '20003',
-    '20004',
-    '20005',
-    '20006',
-    '20007',
-    '20008',
-    '20009',
-    '20010',
-    '21001',
-    '21002',
-    '21003',
-    '21004',
-    '21005',
-    '21006',
-    '21007',
-    '21008',
-    '21009',
-    '21010',
-    '22001',
-    '22002',
-    '22003',
-    '22004',
-    '22005',
-    '22006',
-    '22007',
-    '22008',
-    '22009',
-    '22010',
-    '23001',
-    '23002',
-    '23003',
-    '23004',
-    '23005',
-    '23006',
-    '23007',
-    '23008',
-    '23009',
-    '23010',
-]
-
-# Zonas de lavado (L)
-L = [
-    '101',
-    '102',
-    '103',
-    '104',
-    '105',
-    '106',
-    '107',
-    '108',
-    '109',
-    '110',
-    '111',
-    '112',
-    '113',
-    '114',
-]
-
-# Zonas grupo P (P)
-P = [
-    '6001',
-    '6002',
-    '6003',
-    '6004',
-    '6005',
-    '6006',
-    '6007',
-    '6008',
-    '6009',
-    '6010',
-    '13001',
-    '13002',
-    '13003',
-    '13004',
-    '13005',
-    '13006',
-    '13007',
-    '13008',
-    '13009',
-    '13010',
-    '21001',
-    '21002',
-    '21003',
-    '21004',
-    '21005',
-    '21006',
-    '21007',
-    '21008',
-    '21009',
-    '21010',
-]
-
-# Zonas grupo N (N)
-N = [
-    '1001',
-    '1002',
-    '1003',
-    '1004',
-    '1005',
-    '1006',
-    '1007',
-    '1008',
-    '1009',
-    '1010',
-    '2001',
-    '2002',
-    '2003',
-    '2004',
-    '2005',
-    '2006',
-    '2007',
-    '2008',
-    '2009',
-    '2010',
-    '3001',
-    '3002',
-    '3003',
-    '3004',
-    '3005',
-    '3006',
-    '3007',
-    '3008',
-    '3009',
-    '3010',
-    '4001',
-    '4002',
-    '4003',
-    '4004',
-    '4005',
-    '4006',
-    '4007',
-    '4008',
-    '4009',
-    '4010',
-    '5001',
-    '5002',
-    '5003',
-    '5004',
-    '5005',
-    '5006',
-    '5007',
-    '5008',
-    '5009',
-    '5010',
-    '7001',
-    '7002',
-    '7003',
-    '7004',
-    '7005',
-    '7006',
-    '7007',
-    '7008',
-    '7009',
-    '7010',
-    '8001',
-    '8002',
-    '8003',
-    '8004',
-    '8005',
-    '8006',
-    '8007',
-    '8008',
-    '8009',
-    '8010',
-    '9001',
-    '9002',
-    '9003',
-    '9004',
-    '9005',
-    '9006',
-    '9007',
-    '9008',
-    '9009',
-    '9010',
-    '10001',
-    '10002',
-    '10003',
-    '10004',
-    '10005',
-    '10006',
-    '10007',
-    '10008',
-    '10009',
-    '10010',
-    '11001',
-    '11002',
-    '11003',
-    '11004',
-    '11005',
-    '11006',
-    '11007',
-    '11008',
-    '11009',
-    '11010',
-    '12001',
-    '12002',
-    '12003',
-    '12004',
-    '12005',
-    '12006',
-    '12007',
-    '12008',
-    '12009',
-    '12010',
-    '14001',
-    '14002',
-    '14003',
-    '14004',
-    '14005',
-    '14006',
-    '14007',
-    '14008',
-    '14009',
-    '14010',
-    '15001',
-    '15002',
-    '15003',
-    '15004',
-    '15005',
-    '15006',
-    '15007',
-    '15008',
-    '15009',
-    '15010',
-    '16001',
-    '16002',
-    '16003',
-    '16004',
-    '16005',
-    '16006',
-    '16007',
-    '16008',
-    '16009',
-    '16010',
-    '17001',
-    '17002',
-    '17003',
-    '17004',
-    '17005',
-    '17006',
-    '17007',
-    '17008',
-    '17009',
-    '17010',
-    '18001',
-    '18002',
-    '18003',
-    '18004',
-    '18005',
-    '18006',
-    '18007',
-    '18008',
-    '18009',
-    '18010',
-    '19001',
-    '19002',
-    '19003',
-    '19004',
-    '19005',
-    '19006',
-    '19007',
-    '19008',
-    '19009',
-    '19010',
-    '20001',
-    '20002',
-    '20003',
-    '20004',
-    '20005',
-    '20006',
-    '20007',
-    '20008',
-    '20009',
-    '20010',
-    '22001',
-    '22002',
-    '22003',
-    '22004',
-    '22005',
-    '22006',
-    '22007',
-    '22008',
-    '22009',
-    '22010',
-    '23001',
-    '23002',
-    '23003',
-    '23004',
-    '23005',
-    '23006',
-    '23007',
-    '23008',
-    '23009',
-    '23010',
-]
-
-# Días del año (D)
-D = list(range(1, 366))  # 365 días
-
-# Horas del día (H)
-H = list(range(24))      # 24 horas
-
-# Horas permitidas de riego (H_noc)
-H_noc = [22, 23, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
-
-# Días prohibidos de riego (D_proh)
-D_proh = [3, 7, 10, 14, 17, 21, 24, 28, 31, 35, 38, 42, 45, 49, 52, 56, 59, 63, 66, 70, 73, 77, 80, 84, 87, 91, 94, 98, 101, 105, 108, 112, 115, 119, 122, 126, 129, 133, 136, 140, 143, 147, 150, 154, 157, 161, 164, 168, 171, 175, 178, 182, 185, 189, 192, 196, 199, 203, 206, 210, 213, 217, 220, 224, 227, 231, 234, 238, 241, 245, 248, 252, 255, 259, 262, 266, 269, 273, 276, 280, 283, 287, 290, 294, 297, 301, 304, 308, 311, 315, 318, 322, 325, 329, 332, 336, 339, 343, 346, 350, 353, 357, 360, 364]
-
-# Áreas de cada zona de riego (A)
-A = {
-    '1001': 515.7,
-    '1002': 515.7,
-    '1003': 515.7,
-    '1004': 515.7,
-    '1005': 515.7,
-    '1006': 515.7,
-    '1007': 515.7,
-    '1008': 515.7,
-    '1009': 515.7,
-    '1010': 515.7,
-    '2001': 5676.8,
-    '2002': 5676.8,
-    '2003': 5676.8,
-    '2004': 5676.8,
-    '2005': 5676.8,
-    '2006': 5676.8,
-    '2007': 5676.8,
-    '2008': 5676.8,
-    '2009': 5676.8,
-    '2010': 5676.8,
-    '3001': 9404.6,
-    '3002': 9404.6,
-    '3003': 9404.6,
-    '3004': 9404.6,
-    '3005': 9404.6,
-    '3006': 9404.6,
-    '3007': 9404.6,
-    '3008': 9404.6,
-    '3009': 9404.6,
-    '3010': 9404.6,
-    '4001': 19642.5,
-    '4002': 19642.5,
-    '4003': 19642.5,
-    '4004': 19642.5,
-    '4005': 19642.5,
-    '4006': 19642.5,
-    '4007': 19642.5,
-    '4008': 19642.5,
-    '4009': 19642.5,
-    '4010': 19642.5,
-    '5001': 2629.7,
-    '5002': 2629.7,
-    '5003': 2629.7,
-    '5004': 2629.7,
-    '5005': 2629.7,
-    '5006': 2629.7,
-    '5007': 2629.7,
-    '5008': 2629.7,
-    '5009': 2629.7,
-    '5010': 2629.7,
-    '6001': 14464.4,
-    '6002': 14464.4,
-    '6003': 14464.4,
-    '6004': 14464.4,
-    '6005': 14464.4,
-    '6006': 14464.4,
-    '6007': 14464.4,
-    '6008': 14464.4,
-    '6009': 14464.4,
-    '6010': 14464.4,
-    '7001': 2472.2,
-    '7002': 2472.2,
-    '7003': 2472.2,
-    '7004': 2472.2,
-    '7005': 2472.2,
-    '7006': 2472.2,
-    '7007': 2472.2,
-    '7008': 2472.2,
-    '7009': 2472.2,
-    '7010': 2472.2,
-    '8001': 2944.2,
-    '8002': 2944.2,
-    '8003': 2944.2,
-    '8004': 2944.2,
-    '8005': 2944.2,
-    '8006': 2944.2,
-    '8007': 2944.2,
-    '8008': 2944.2,
-    '8009': 2944.2,
-    '8010': 2944.2,
-    '9001': 5088.8,
-    '9002': 5088.8,
-    '9003': 5088.8,
-    '9004': 5088.8,
-    '9005': 5088.8,
-    '9006': 5088.8,
-    '9007': 5088.8,
-    '9008': 5088.8,
-    '9009': 5088.8,
-    '9010': 5088.8,
-    '10001': 15296.5,
-    '10002': 15296.5,
-    '10003': 15296.5,
-    '10004': 15296.5,
-    '10005': 15296.5,
-    '10006': 15296.5,
-    '10007': 15296.5,
-    '10008': 15296.5,
-    '10009': 15296.5,
-    '10010': 15296.5,
-    '11001': 18546.0,
-    '11002': 18546.0,
-    '11003': 18546.0,
-    '11004': 18546.0,
-    '11005': 18546.0,
-    '11006': 18546.0,
-    '11007': 18546.0,
-    '11008': 18546.0,
-    '11009': 18546.0,
-    '11010': 18546.0,
-    '12001': 2308.7,
-    '12002': 2308.7,
-    '12003': 2308.7,
-    '12004': 2308.7,
-    '12005': 2308.7,
-    '12006': 2308.7,
-    '12007': 2308.7,
-    '12008': 2308.7,
-    '12009': 2308.7,
-    '12010': 2308.7,
-    '13001': 9867.7,
-    '13002': 9867.7,
-    '13003': 9867.7,
-    '13004': 9867.7,
-    '13005': 9867.7,
-    '13006': 9867.7,
-    '13007': 9867.7,
-    '13008': 9867.7,
-    '13009': 9867.7,
-    '13010': 9867.7,
-    '14001': 53.0,
-    '14002': 53.0,
-    '14003': 53.0,
-    '14004': 53.0,
-    '14005': 53.0,
-    '14006': 53.0,
-    '14007': 53.0,
-    '14008': 53.0,
-    '14009': 53.0,
-    '14010': 53.0,
-    '15001': 4519.8,
-    '15002': 4519.8,
-    '15003': 4519.8,
-    '15004': 4519.8,
-    '15005': 4519.8,
-    '15006': 4519.8,
-    '15007': 4519.8,
-    '15008': 4519.8,
-    '15009': 4519.8,
-    '15010': 4519.8,
-    '16001': 9635.9,
-    '16002': 9635.9,
-    '16003': 9635.9,
-    '16004': 9635.9,
-    '16005': 9635.9,
-    '16006': 9635.9,
-    '16007': 9635.9,
-    '16008': 9635.9,
-    '16009': 9635.9,
-    '16010': 9635.9,
-    '17001': 33228.2,
-    '17002': 33228.2,
-    '17003': 33228.2,
-    '17004': 33228.2,
-    '17005': 33228.2,
-    '17006': 33228.2,
-    '17007': 33228.2,
-    '17008': 33228.2,
-    '17009': 33228.2,
-    '17010': 33228.2,
-    '18001': 909.1,
-    '18002': 909.1,
-    '18003': 909.1,
-    '18004': 909.1,
-    '18005': 909.1,
-    '18006': 909.1,
-    '18007': 909.1,
-    '18008': 909.1,
-    '18009': 909.1,
-    '18010': 909.1,
-    '19001': 7791.3,
-    '19002': 7791.3,
-    '19003': 7791.3,
-    '19004': 7791.3,
-    '19005': 7791.3,
-    '19006': 7791.3,
-    '19007': 7791.3,
-    '19008': 7791.3,
-    '19009': 7791.3,
-    '19010': 7791.3,
-    '20001': 233.6,
-    '20002': 233.6,
-    '20003': 233.6,
-    '20004': 233.6,
-    '20005': 233.6,
-    '20006': 233.6,
-    '20007': 233.6,
-    '20008': 233.6,
-    '20009': 233.6,
-    '20010': 233.6,
-    '21001': 10414.4,
-    '21002': 10414.4,
-    '21003': 10414.4,
-    '21004': 10414.4,
-    '21005': 10414.4,
-    '21006': 10414.4,
-    '21007': 10414.4,
-    '21008': 10414.4,
-    '21009': 10414.4,
-    '21010': 10414.4,
-    '22001': 387.6,
-    '22002': 387.6,
-    '22003': 387.6,
-    '22004': 387.6,
-    '22005': 387.6,
-    '22006': 387.6,
-    '22007': 387.6,
-    '22008': 387.6,
-    '22009': 387.6,
-    '22010': 387.6,
-    '23001': 2040.4,
-    '23002': 2040.4,
-    '23003': 2040.4,
-    '23004': 2040.4,
-    '23005': 2040.4,
-    '23006': 2040.4,
-    '23007': 2040.4,
-    '23008': 2040.4,
-    '23009': 2040.4,
-    '23010': 2040.4,
-}
-# Parámetro beta_z auxiliar para zonas de lavado
-beta_m_m3pkm = 0.60
-L_turno_km = 18
-beta_z = {z: beta_m_m3pkm * L_turno_km for z in L}
-
-# Parámetros generales
-pars = {
-    'D': 365,
-    'H': 24,
-    'H_noc': H_noc,
-    'D_proh': D_proh,
-    'L_turno_km': L_turno_km,
-    'beta_m_m3pkm': beta_m_m3pkm,
-    'C_cam_m3': 20,
-    'eta': 0.85,
-    'M_m3ph': 250,
-    'alpha': 1000,
-    'beta': 1,
-    'gamma': 1,
-    'delta': 1,
-    'omega^{min}_z': 75,
-    'omega^{max}_z':110,
-}
-
-# Diccionario de ET mensual 
-month_ET = {
-    1: 6.0, 2: 5.3, 3: 4.0, 4: 3.0,
-    5: 2.0, 6: 1.6, 7: 1.4, 8: 1.6,
-    9: 2.0, 10: 3.0, 11: 4.3, 12: 5.9,
-}
-Kc_avg = 0.75  # coeficiente de cultivo promedio
-
-# Función para definir el diccionario de ET en base a valores promedios mensuales y Kc
-def build_ET_dict(G, month_ET):
-    ET = {}
-    for z in G:
-        for d in D:
-            mes = ((d - 1) // 30) + 1
-            et_mensual = month_ET.get(mes, 4.0)
-            ET[z, d] = et_mensual * Kc_avg
-    return ET
-ET_dict = build_ET_dict(G, month_ET) 
\ No newline at end of file
+from cargar_datos import cargar_datos
+
+datos = cargar_datos()
+
+G = datos['G']            # Zonas de riego
+L = datos['L']            # Zonas de lavado
+P = datos['P']            # Zonas grupo P
+N = datos['N']            # Zonas grupo N
+D = datos['D']            # Días del año
+H = datos['H']            # Horas del día
+H_noc = datos['H_noc']    # Horas permitidas de riego
+D_proh = datos['D_proh']  # Días prohibidos de riego
+A = datos['A']            # Áreas de cada zona de riego
+beta_z = datos['beta_z']  # m3 por lavado de cada zona de lavado
+pars = datos['pars']      # Parámetros generales
+ET_dict = datos['ET_dict']
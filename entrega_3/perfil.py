@@ -0,0 +1,129 @@
+# -------------------------------------------------------------
+#  Perfil de una corrida: tiempos, memoria y tamaño del modelo
+#  - fases      : tiempo de pared y de CPU y pico de RSS al terminar
+#                 cada fase (datos, construccion, resolucion, ...)
+#  - familias   : filas, columnas, no ceros y segundos de construccion
+#                 por familia de variables / restricciones R1-R8
+#                 (marcadas en modelo.py con _familia)
+#  - gurobi     : presolve y branch & bound por separado, nodos,
+#                 iteraciones y trabajo de la resolucion
+#  Todo se escribe en un JSON junto a los resultados. Con activo=False
+#  las fases no miden nada y no se registra nada del modelo.
+# -------------------------------------------------------------
+import json
+import os
+import resource
+import time
+from datetime import datetime
+
+from gurobipy import GRB #type: ignore
+
+
+def _pico_rss_mb(quien=resource.RUSAGE_SELF):
+    """ru_maxrss viene en KB en Linux."""
+    return resource.getrusage(quien).ru_maxrss / 1024
+
+
+class RegistroFamilias:
+    """
+    Se pasa a construir_modelo(registro=...). Entre dos marcas hace
+    m.update() y anota la diferencia de filas, columnas y no ceros (el
+    update tambien es parte del costo de agregar la familia).
+    """
+    def __init__(self):
+        self.familias = {}
+        self._actual = None
+        self._t0 = None
+        self._conteo = (0, 0, 0)
+
+    def marcar(self, m, nombre):
+        m.update()
+        conteo = (m.NumConstrs, m.NumVars, m.NumNZs)
+        ahora = time.perf_counter()
+        if self._actual is not None:
+            previo = self.familias.setdefault(self._actual, dict(filas=0, columnas=0, nnz=0, segundos=0.0))
+            previo['filas'] += conteo[0] - self._conteo[0]
+            previo['columnas'] += conteo[1] - self._conteo[1]
+            previo['nnz'] += conteo[2] - self._conteo[2]
+            previo['segundos'] += ahora - self._t0
+        self._actual, self._t0, self._conteo = nombre, ahora, conteo
+
+
+class Perfil:
+    """
+    activo : False -> fase() no mide y guardar() no escribe
+    """
+    def __init__(self, activo=True):
+        self.activo = activo
+        self.inicio = datetime.now().isoformat(timespec="seconds")
+        # CPU gastada antes de crear el perfil (sobre todo importaciones)
+        uso = resource.getrusage(resource.RUSAGE_SELF)
+        self.cpu_previa_s = uso.ru_utime + uso.ru_stime
+        self.fases = []
+        self.registro = RegistroFamilias() if activo else None
+        self.gurobi = {}
+        self._t0 = time.perf_counter()
+        self._presolve = None
+        self._fase = None
+
+    def fase(self, nombre):
+        """
+        Cierra la fase en curso y empieza `nombre` (None = solo cerrar).
+        Las fases se marcan en secuencia, como las familias de modelo.py.
+        """
+        if not self.activo:
+            return
+        ahora, cpu = time.perf_counter(), time.process_time()
+        if self._fase is not None:
+            nombre_previo, t0, c0 = self._fase
+            self.fases.append(dict(nombre=nombre_previo, pared_s=ahora - t0, cpu_s=cpu - c0,
+                                   pico_rss_mb=_pico_rss_mb()))
+        self._fase = (nombre, ahora, cpu) if nombre is not None else None
+
+    def callback(self):
+        """Callback para m.optimize que anota cuando termina el presolve (None si inactivo)."""
+        if not self.activo:
+            return None
+
+        def cb(model, where):
+            if where == GRB.Callback.PRESOLVE:
+                self._presolve = model.cbGet(GRB.Callback.RUNTIME)
+        return cb
+
+    def resolucion(self, m):
+        """Estadisticas de Gurobi despues de optimize."""
+        if not self.activo:
+            return
+        runtime = m.Runtime
+        presolve = self._presolve if self._presolve is not None else 0.0
+        self.gurobi = dict(
+            estado=m.Status, vars=m.NumVars, filas=m.NumConstrs, nnz=m.NumNZs,
+            runtime_s=runtime, presolve_s=presolve, busqueda_s=max(runtime - presolve, 0.0),
+            trabajo=m.Work, iteraciones=m.IterCount,
+            nodos=m.NodeCount if m.IsMIP else 0,
+            objetivo=m.ObjVal if m.SolCount else None,
+            gap=m.MIPGap if m.IsMIP and m.SolCount and m.NumObj <= 1 else None,
+        )
+
+    def resumen(self):
+        uso = resource.getrusage(resource.RUSAGE_SELF)
+        return dict(
+            inicio=self.inicio,
+            total_s=time.perf_counter() - self._t0,
+            cpu_previa_s=self.cpu_previa_s,
+            cpu_total_s=uso.ru_utime + uso.ru_stime,
+            pico_rss_mb=_pico_rss_mb(),
+            pico_rss_hijos_mb=_pico_rss_mb(resource.RUSAGE_CHILDREN),
+            fases=self.fases,
+            familias=self.registro.familias if self.registro is not None else {},
+            gurobi=self.gurobi,
+        )
+
+    def guardar(self, ruta="perfil_corrida.json"):
+        """Escribe el JSON y devuelve la ruta (None si inactivo)."""
+        if not self.activo:
+            return None
+        self.fase(None)
+        with open(ruta, "w", encoding="utf-8") as fh:
+            json.dump(self.resumen(), fh, indent=2, ensure_ascii=False)
+        return os.path.abspath(ruta)
@@ -0,0 +1,261 @@
+# -------------------------------------------------------------
+#  Programacion dinamica para el riego de una zona
+#  Para una zona, R5-R6 son una recurrencia en una sola variable de
+#  estado (omega) y el costo del dia depende solo de cuanto sube omega:
+#    r = omega[d+1] - omega[d] + ET[d+1]      (mm aportados el dia d)
+#    costo(r) = beta * r / coef + gamma * ceil(r / Q)   si r <= K * Q
+#             + alpha * (r - K * Q)                       el exceso va a u
+#  con coef = eta*1000/A, Q = coef * M (mm por hora de valvula) y K las
+#  horas de H_noc (0 en dias prohibidos). Ademas u repone lo que falte
+#  para que omega[d] >= omega_min.
+#
+#  Se discretiza omega en una grilla de paso `paso` mm. Si ET, omega_min,
+#  omega_max (y omega_inicial) son multiplos del paso -- con los datos
+#  actuales lo son para paso = 0.025, que se elige solo -- el optimo de
+#  la grilla es el del MILP. La recursion hacia atras es, para cada
+#  banda de horas k, un minimo sobre una ventana de estados de
+#  (costo lineal + V); esos minimos se responden con una sparse table
+#  (O(1) por consulta), vectorizada sobre estados y zonas.
+# -------------------------------------------------------------
+import numpy as np #type: ignore
+
+from modelo import tensores, repartir_horas, _peso
+from indices import indices_admisibles
+from solucion import Solucion
+
+
+def _piso(x):
+    return np.floor(x + 1e-9).astype(np.int64)
+
+
+def _techo(x):
+    return np.ceil(x - 1e-9)
+
+
+def _tabla_minimos(W):
+    """
+    Sparse table de W (zonas x estados), aplanada para consultar con un
+    solo indice: tabla[j, z, i] = min W[z, i:i+2^j] (inf fuera de rango).
+    """
+    nZ, S = W.shape
+    niveles = [W]
+    j = 1
+    while (1 << j) <= S:
+        prev = niveles[-1]
+        mitad = 1 << (j - 1)
+        nivel = np.full((nZ, S), np.inf)
+        nivel[:, :S - mitad] = np.minimum(prev[:, :S - mitad], prev[:, mitad:])
+        niveles.append(nivel)
+        j += 1
+    return np.stack(niveles).ravel()
+
+
+def _consulta(tabla, l, r):
+    """Minimo de W[z, l:r+1] por celda (l, r de forma zonas x estados); inf si vacio."""
+    nZ, S = l.shape
+    vacio = l > r
+    largo = np.where(vacio, 1, r - l + 1)
+    j = np.log2(largo).astype(np.int64)
+    fila = (j * nZ + np.arange(nZ)[:, None]) * S
+    a = tabla[fila + np.where(vacio, 0, l)]
+    b = tabla[fila + np.where(vacio, 0, r - (1 << j) + 1)]
+    return np.where(vacio, np.inf, np.minimum(a, b))
+
+
+def _costo(r, c, gamma, alpha, Q, K):
+    """costo(r) por zona (r en mm, forma zonas x estados); inf si r < 0."""
+    K = np.asarray(K, dtype=float)
+    cap = (K * Q)[:, None]
+    dentro = np.minimum(r, cap)
+    horas = _techo(np.maximum(dentro, 0.0) / Q[:, None])
+    costo = c[:, None] * dentro + gamma * horas + alpha * np.maximum(r - cap, 0.0)
+    return np.where(r < -1e-9, np.inf, costo)
+
+
+def _resolver_bloque(ET, c, Q, K_dia, pars, paso, omega_inicial, w_min, w_max):
+    """
+    Resuelve exactamente (en la grilla) un bloque de zonas; w_min y w_max
+    son los umbrales de humedad de cada zona.
+
+    return : (costo optimo por zona, omega (z x D), u (z x D), r (z x D))
+    """
+    nZ, nD = ET.shape
+    alpha, gamma = _peso(pars, 'alpha'), _peso(pars, 'gamma')
+    i_max = np.rint(w_max / paso).astype(np.int64)
+    i_min = np.rint(w_min / paso).astype(np.int64)[:, None]
+    S = int(i_max.max()) + 1
+    estados = np.arange(S)
+    e = np.rint(ET / paso).astype(np.int64)            # ET en pasos de grilla
+    q = Q / paso                                        # mm por hora en pasos
+    # penalizacion u del dia; inf sobre omega_max de cada zona
+    u_pen = alpha * paso * np.maximum(i_min - estados[None, :], 0)
+    u_pen = np.where(estados[None, :] > i_max[:, None], np.inf, u_pen)
+
+    # V[d][z, i] = costo minimo desde el dia d con omega[d] = i*paso
+    V = np.empty((nD, nZ, S))
+    V[-1] = u_pen
+    for d in range(nD - 2, -1, -1):
+        Vs = V[d + 1]
+        ef = np.maximum(estados[None, :], i_min)        # nivel tras reponer con u
+        base = ef - e[:, d + 1][:, None]                # estado de llegada sin aporte
+        K = K_dia[d]
+        # sin aporte
+        mejor = np.where(base >= 0, np.take_along_axis(Vs, np.clip(base, 0, S - 1), axis=1), np.inf)
+        # bandas de horas: aporte en (k-1)Q, kQ] a costo lineal c
+        if K:
+            tabla = _tabla_minimos(c[:, None] * paso * estados[None, :] + Vs)
+            for k in range(1, K + 1):
+                l = np.maximum(_piso(base + (k - 1) * q[:, None]) + 1, 0)
+                if l.min() > S - 1:
+                    break                                # bandas fuera de la grilla
+                r = np.minimum(_piso(base + k * q[:, None]), S - 1)
+                m = _consulta(tabla, l, r) - c[:, None] * paso * base + gamma * k
+                mejor = np.minimum(mejor, m)
+        # exceso sobre la capacidad de riego: se paga con u a alpha
+        tope = base + K * q[:, None]
+        l = np.maximum(_piso(tope) + 1, 0)
+        if l.min() <= S - 1:
+            tabla = _tabla_minimos(alpha * paso * estados[None, :] + Vs)
+            r = np.full_like(l, S - 1)
+            m = (_consulta(tabla, l, r) - alpha * paso * tope + c[:, None] * K * Q[:, None]
+                 + gamma * K)
+            mejor = np.minimum(mejor, m)
+        V[d] = u_pen + mejor
+
+    # reconstruccion hacia adelante
+    filas = np.arange(nZ)
+    if omega_inicial is None:
+        i = np.argmin(V[0], axis=1)
+    else:
+        i = np.clip(np.rint(omega_inicial / paso).astype(np.int64), 0, S - 1)
+    costo = V[0][filas, i]
+    omega = np.zeros((nZ, nD))
+    u = np.zeros((nZ, nD))
+    r_dia = np.zeros((nZ, nD))
+    for d in range(nD):
+        omega[:, d] = i * paso
+        u[:, d] = paso * np.maximum(i_min[:, 0] - i, 0)
+        if d == nD - 1:
+            break
+        ef = np.maximum(i, i_min[:, 0])
+        r = (estados[None, :] - (ef - e[:, d + 1])[:, None]) * paso
+        total = _costo(r, c, gamma, alpha, Q, np.full(nZ, K_dia[d])) + V[d + 1]
+        j = np.argmin(total, axis=1)
+        r_dia[:, d] = r[filas, j]
+        i = j
+    return costo, omega, u, r_dia
+
+
+def _es_multiplo(valores, paso):
+    g = np.asarray(valores, dtype=float) / paso
+    return np.abs(g - np.rint(g)).max() < 1e-6
+
+
+def paso_exacto(valores, candidatos=(0.1, 0.05, 0.025, 0.0125, 0.01, 0.005, 0.0025, 0.00125, 0.001)):
+    """Paso de grilla mas grueso del que todos los valores son multiplos."""
+    for paso in candidatos:
+        if _es_multiplo(valores, paso):
+            return paso
+    raise ValueError("No hay un paso de grilla exacto para estos datos; pasa paso= explicitamente")
+
+
+def resolver_dp(datos, paso=None, bloque=16, verbose=True):
+    """
+    Riego optimo zona por zona con programacion dinamica (sin Gurobi).
+
+    datos  : dict como en gurobi.py (puede venir agregado)
+    paso   : resolucion de la grilla de omega [mm]; None -> la mas gruesa
+             que es exacta para los datos (0.025 con params.yaml)
+    bloque : zonas que se resuelven juntas (memoria ~ bloque * |D| * omega_max/paso)
+    return : Solucion con las familias de riego (ell y wwash quedan en cero);
+             objetivo = costo de riego (con pesos de la agregacion)
+    """
+    pars = datos['pars']
+    t = tensores(datos)
+    idx = indices_admisibles(datos)
+    nG, nD = t['ET'].shape
+    sol = Solucion.vacia(datos)
+    if nG == 0 or nD == 0:
+        sol.objetivo = 0.0
+        return sol
+    valores = [t['omega_min'], t['omega_max'], t['ET'].ravel()]
+    if t['omega_inicial'] is not None:
+        valores.append(t['omega_inicial'])
+    valores = np.concatenate(valores)
+    if paso is None:
+        paso = paso_exacto(valores)
+    elif not _es_multiplo(valores, paso) and verbose:
+        print(f"Aviso: los datos no son multiplos de paso={paso}; la solucion DP es aproximada")
+
+    horas = idx['horas']
+    M = pars['M_m3ph'] or 1e4
+    coef = pars['eta'] * 1000 / t['A']
+    c = _peso(pars, 'beta') / coef                       # costo por mm
+    Q = coef * M                                         # mm por hora
+    riega = np.zeros(nD, dtype=bool)
+    riega[idx['dias']] = True
+    riega[-1] = False
+    K_dia = np.where(riega, len(horas), 0)
+
+    costo = np.zeros(nG)
+    r_dia = np.zeros((nG, nD))
+    for z0 in range(0, nG, bloque):
+        z = slice(z0, min(z0 + bloque, nG))
+        w0 = t['omega_inicial'][z] if t['omega_inicial'] is not None else None
+        costo[z], sol.arreglos['omega'][z], sol.arreglos['u'][z], r_dia[z] = _resolver_bloque(
+            t['ET'][z], c[z], Q[z], K_dia, pars, paso, w0, t['omega_min'][z], t['omega_max'][z])
+
+    # aporte r -> riego (hasta K*Q) y u extra (el resto)
+    cap = K_dia[None, :] * Q[:, None]
+    riego = np.minimum(r_dia, cap)
+    sol.arreglos['u'] += r_dia - riego
+    volumen = riego / coef[:, None]
+    caudal = repartir_horas(volumen, M, len(horas))
+    I = sol.arreglos['I']
+    I[:, :, horas] = caudal
+    sol.arreglos['y'][:, :, horas] = caudal > 0
+    sol.arreglos['vpot'][idx['zonas_pot']] = I[idx['zonas_pot']]
+    sol.arreglos['vpozo'][:] = I[t['idx_P']]
+
+    sol.objetivo = float(t['peso'] @ costo)
+    if verbose:
+        print(f"Programacion dinamica: {nG} zonas, costo de riego {sol.objetivo:,.2f}")
+    return sol
+
+
+def verificar(datos, params=None):
+    """
+    Compara, zona por zona, el costo de la DP con el optimo de Gurobi
+    para el mismo subproblema (descomposicion.subproblemas).
+
+    return : diferencia maxima |MILP - DP|
+    """
+    from modelo import construir_modelo
+    from descomposicion import subproblemas
+    peor = 0.0
+    for nombre, sub in subproblemas(datos):
+        if not sub['G']:
+            continue
+        m, _ = construir_modelo(sub)
+        m.Params.OutputFlag = 0
+        m.Params.MIPGap = 0
+        for k, val in (params or {}).items():
+            m.setParam(k, val)
+        m.optimize()
+        dp = resolver_dp(sub, verbose=False).objetivo
+        peor = max(peor, abs(m.ObjVal - dp))
+        print(f"  {nombre:<12} MILP {m.ObjVal:>12,.4f}  DP {dp:>12,.4f}")
+        m.dispose()
+    print(f"Diferencia maxima: {peor:.2e}")
+    return peor
+
+
+if __name__ == "__main__":
+    import argparse
+    from benchmark_construccion import instancia
+    from agregacion import agregar_zonas
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dias", type=int, default=30)
+    args = ap.parse_args()
+    datos, _ = agregar_zonas(instancia(n_dias=args.dias))
+    verificar(datos)
@@ -0,0 +1,199 @@
+# -------------------------------------------------------------
+#  Replanificacion diaria sobre el modelo ya construido
+#  En operacion el plan anual se rehace cada mañana con la ET nueva y la
+#  humedad medida. En vez de reconstruir y resolver todo el año, el
+#  modelo se arma una sola vez y cada mañana se parcha:
+#    - actualizar_et : cambia solo el lado derecho de las filas de R5
+#                      (m._balance) cuya ET cambio, en dias futuros
+#    - registrar     : fija lo ya ejecutado (riego y lavado de los dias
+#                      previos), la humedad de esos dias segun lo ejecutado
+#                      y la humedad medida en la mañana; la diferencia entre
+#                      lo simulado y lo medido queda como ET efectiva del
+#                      ultimo dia
+#    - resolver      : re-optimiza con el plan anterior como MIP start
+#  Necesita un constructor matricial ("matricial", "disperso" o "diario").
+#
+#  Uso (simulacion de varias mañanas con ET y humedad perturbadas):
+#    python replanificacion.py --zonas 5 --dias 60 --mananas 5
+# -------------------------------------------------------------
+import argparse
+import time
+
+import numpy as np #type: ignore
+
+from modelo import construir_modelo, tensores, matriz_et
+from solucion import Solucion, FAMILIAS
+from arranque import FAMILIAS_ARRANQUE
+
+# decisiones que se fijan al registrar los dias ejecutados
+DECISIONES = ["y", "vpot", "vpozo", "I", "ell", "wwash"]
+
+
+class Replanificacion:
+    """
+    datos  : dict como en gurobi.py (sin agregar, o con las lecturas de las
+             zonas representantes)
+    params : parametros Gurobi de cada resolucion (TimeLimit, MIPGap, ...)
+    kwargs : se pasan al constructor (env, cobertura, ...)
+    """
+    def __init__(self, datos, metodo="disperso", params=None, verbose=True, **kwargs):
+        if metodo == "bucles":
+            raise ValueError("La replanificacion necesita un constructor matricial (matricial, disperso o diario)")
+        t0 = time.perf_counter()
+        self.datos = datos
+        self.verbose = verbose
+        self.m, self.v = construir_modelo(datos, metodo=metodo, **kwargs)
+        self.m.update()
+        if getattr(self.m, "_balance", None) is None:
+            raise RuntimeError(f"El modelo {metodo!r} no trae las filas de R5 (m._balance) "
+                               f"que se parchan al replanificar")
+        for k, val in (params or {}).items():
+            self.m.setParam(k, val)
+        t = tensores(datos)
+        self.ET = t['ET'].copy()
+        self.coef = datos['pars']['eta'] * 1000 / t['A']
+        self.omega_min, self.omega_max = t['omega_min'], t['omega_max']
+        self._pos_G = {z: i for i, z in enumerate(datos['G'])}
+        self._pos_D = {d: i for i, d in enumerate(datos['D'])}
+        self.hoy = 0          # posicion del primer dia no ejecutado
+        self.plan = None
+        self.t_construccion = time.perf_counter() - t0
+
+    def actualizar_et(self, et):
+        """
+        et     : dict {(zona, dia): ET} con los valores nuevos, o una TablaET
+                 completa (cargar_datos.py); las claves fuera del modelo se ignoran
+        return : filas de R5 cambiadas (solo dias posteriores a la ultima medicion)
+        """
+        if hasattr(et, 'arreglo'):
+            nuevo = matriz_et(et, self.datos['G'], self.datos['D'])
+        else:
+            nuevo = self.ET.copy()
+            for (z, d), valor in et.items():
+                if z in self._pos_G and d in self._pos_D:
+                    nuevo[self._pos_G[z], self._pos_D[d]] = valor
+        cambio = np.abs(nuevo - self.ET) > 1e-12
+        cambio[:, :self.hoy + 1] = False
+        zs, ds = np.nonzero(cambio)
+        if zs.size:
+            # la fila (z, d - 1) de R5 lleva -ET[z, d]
+            self._rhs(zs, ds, -nuevo[zs, ds])
+            self.ET[zs, ds] = nuevo[zs, ds]
+        return int(zs.size)
+
+    def _rhs(self, zs, ds, valores):
+        filas = self.m._balance.tolist()
+        n_dias = len(self.datos['D'])
+        self.m.setAttr("RHS", [filas[z * (n_dias - 1) + d - 1] for z, d in zip(zs, ds)],
+                       np.asarray(valores, dtype=float).tolist())
+
+    def registrar(self, dia, omega, ejecutado=None):
+        """
+        dia       : primer dia aun no ejecutado (el de la replanificacion)
+        omega     : humedad medida esa mañana, dict {zona: omega}; las zonas
+                    sin lectura quedan con la simulada
+        ejecutado : Solucion con lo que realmente se hizo antes de `dia`
+                    (NaN = lo planificado); None = se cumplio el plan
+        """
+        p = self._pos_D[dia]
+        if p < self.hoy:
+            raise ValueError(f"El dia {dia} ya fue registrado (hoy = {self.datos['D'][self.hoy]})")
+        if p > self.hoy and self.plan is None:
+            raise ValueError("Hay dias ejecutados sin plan: llama a resolver() antes de registrar")
+        hechos = {f: self.plan.arreglos[f].copy() for f in DECISIONES} if self.plan is not None else None
+        if ejecutado is not None and hechos is not None:
+            for f in DECISIONES:
+                real = ejecutado.arreglos[f]
+                hechos[f] = np.where(np.isnan(real), hechos[f], real)
+
+        # humedad de los dias ejecutados segun R5-R6 con el riego real
+        nG = len(self.datos['G'])
+        w = np.empty((nG, p + 1))
+        u = np.zeros((nG, p))
+        w[:, self.hoy] = self.plan.arreglos['omega'][:, self.hoy] if self.plan is not None else np.nan
+        riego = self.coef[:, None] * hechos['I'].sum(axis=2) if hechos is not None else None
+        for d in range(self.hoy, p):
+            u[:, d] = np.maximum(self.omega_min - w[:, d], 0.0)
+            w[:, d + 1] = np.minimum(w[:, d] + riego[:, d] + u[:, d] - self.ET[:, d + 1], self.omega_max)
+        medida = w[:, p].copy()
+        for z, valor in omega.items():
+            if z in self._pos_G:
+                medida[self._pos_G[z]] = valor
+        recortadas = int((medida > self.omega_max + 1e-9).sum())
+        medida = np.minimum(medida, self.omega_max)
+        w[:, p] = medida
+
+        # fija decisiones, humedad y deficit de [hoy, p) y la humedad medida en p
+        sol = Solucion.vacia(self.datos, valor=np.nan)
+        for f in DECISIONES if hechos is not None else []:
+            sol.arreglos[f][:, self.hoy:p] = hechos[f][:, self.hoy:p]
+        if p > self.hoy:
+            sol.arreglos['omega'][:, self.hoy:p] = w[:, self.hoy:p]
+            sol.arreglos['u'][:, self.hoy:p] = u[:, self.hoy:p]
+        sol.arreglos['omega'][:, p] = medida
+        for f in FAMILIAS:
+            if isinstance(self.v[f], dict):
+                continue
+            self.v[f].fijar(sol.arreglos[f], sol.ejes[f])
+        # ET efectiva de los dias ejecutados: la que cierra R5 con lo fijado
+        if p > self.hoy:
+            ds = np.arange(self.hoy + 1, p + 1)
+            efectiva = w[:, ds - 1] + riego[:, ds - 1] + u[:, ds - 1] - w[:, ds]
+            zs = np.repeat(np.arange(nG), ds.size)
+            self._rhs(zs, np.tile(ds, nG), -efectiva.ravel())
+            self.ET[:, ds] = efectiva
+        self.m.update()
+        self.hoy = p
+        if self.verbose and recortadas:
+            print(f"Aviso: {recortadas} lecturas de humedad sobre omega_max, se usan como omega_max")
+
+    def resolver(self):
+        """Re-optimiza desde el plan anterior (MIP start) y devuelve el plan nuevo."""
+        t0 = time.perf_counter()
+        if self.plan is not None:
+            for f in FAMILIAS_ARRANQUE:
+                self.v[f].fijar_start(self.plan.arreglos[f], self.plan.ejes[f])
+        self.m.optimize()
+        if not self.m.SolCount:
+            raise RuntimeError(f"Replanificacion sin solucion (status {self.m.Status})")
+        self.plan = Solucion.desde_variables(self.v, self.datos, self.m)
+        if self.verbose:
+            print(f"Plan desde el dia {self.datos['D'][self.hoy]}: objetivo {self.plan.objetivo:,.2f} "
+                  f"en {time.perf_counter() - t0:.2f} s")
+        return self.plan
+
+
+if __name__ == "__main__":
+    from benchmark_construccion import instancia
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--zonas", type=int, default=5)
+    ap.add_argument("--dias", type=int, default=60)
+    ap.add_argument("--mananas", type=int, default=5)
+    ap.add_argument("--ruido", type=float, default=0.1, help="desvio relativo de ET y humedad")
+    ap.add_argument("--constructor", default="disperso")
+    ap.add_argument("--time-limit", type=float, default=60)
+    ap.add_argument("--semilla", type=int, default=0)
+    args = ap.parse_args()
+
+    datos = instancia(args.zonas, args.dias)
+    rng = np.random.default_rng(args.semilla)
+    params = {"OutputFlag": 0, "TimeLimit": args.time_limit}
+    t0 = time.perf_counter()
+    r = Replanificacion(datos, metodo=args.constructor, params=params)
+    plan = r.resolver()
+    print(f"Construccion {r.t_construccion:.2f} s + primera resolucion = {time.perf_counter() - t0:.2f} s")
+
+    G, D = datos['G'], datos['D']
+    for k in range(1, args.mananas + 1):
+        t1 = time.perf_counter()
+        dia = D[k]
+        medida = {z: plan.arreglos['omega'][i, k] * (1 + args.ruido * rng.standard_normal())
+                  for i, z in enumerate(G)}
+        r.registrar(dia, medida)
+        futuro = {(z, d): r.ET[i, j] * (1 + args.ruido * rng.standard_normal())
+                  for i, z in enumerate(G) for j, d in enumerate(D) if j > k}
+        cambiadas = r.actualizar_et(futuro)
+        plan = r.resolver()
+        print(f"  mañana del dia {dia}: {cambiadas} filas de R5 cambiadas, "
+              f"replanificacion en {time.perf_counter() - t1:.2f} s")
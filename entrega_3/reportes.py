@@ -0,0 +1,160 @@
+# -------------------------------------------------------------
+#  Graficos del informe, sin ventanas y en paralelo
+#  Cada figura es una tarea (archivo, tipo, datos) armada de antemano
+#  desde el cubo de indicadores (indicadores.py): solo arreglos chicos,
+#  sin variables de Gurobi. Las tareas se dibujan con el backend Agg en
+#  procesos separados (spawn, como descomposicion.py), asi que no hay
+#  plt.show() que bloquee y el script puede seguir mientras se dibujan.
+#  Las series diarias usan areas apiladas y mapas de calor en vez de
+#  graficos de 365 barras.
+# -------------------------------------------------------------
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np #type: ignore
+
+
+def _top(etiquetas, valores, n=10, ordenar=True):
+    """Las n primeras (mayores si ordenar) como listas simples."""
+    valores = np.asarray(valores, dtype=float)
+    idx = np.argsort(-valores, kind='stable')[:n] if ordenar else np.arange(min(n, len(valores)))
+    return [str(etiquetas[i]) for i in idx], valores[idx].tolist()
+
+
+def _reducir_filas(matriz, max_filas=1000):
+    """Promedia bloques de filas para que el mapa de calor no pase de max_filas."""
+    n = matriz.shape[0]
+    if n <= max_filas:
+        return matriz
+    return np.stack([matriz[b].mean(axis=0) for b in np.array_split(np.arange(n), max_filas)])
+
+
+def tareas_reporte(kpi, datos):
+    """
+    kpi    : cubo de indicadores.cubo_kpi
+    return : lista de tareas (archivo, tipo, datos) para dibujar()
+    """
+    G, L, D = datos['G'], datos['L'], datos['D']
+    ejes_zona = dict(xlabel='Zona de riego (uga_id)', figsize=(10, 4))
+    ejes_grupo = dict(xlabel='Grupo de zonas de riego', figsize=(6, 4))
+    vol = kpi['vol_diario']
+    tareas = [
+        ('top10_agua_total_por_zona.png', 'barras', dict(
+            ejes_zona, etiquetas_valores=_top(G, kpi['agua_zona']), ylabel='Agua total aplicada [m³]',
+            titulo='Top 10 zonas de riego con mayor consumo anual de agua')),
+        ('top10_deficit_por_zona.png', 'barras', dict(
+            ejes_zona, etiquetas_valores=_top(G, kpi['dias_deficit_zona']), ylabel='Días con déficit de humedad',
+            titulo='Top 10 zonas con más días de déficit de humedad')),
+        ('top10_lavados_por_zona.png', 'barras', dict(
+            etiquetas_valores=_top(L, kpi['lavados_zona']), xlabel='Zona de lavado (uga_id)',
+            ylabel='Cantidad de lavados en el año', titulo='Top 10 zonas de lavado con más lavados',
+            figsize=(8, 4))),
+        ('top10_humedad_final_por_zona.png', 'barras', dict(
+            ejes_zona, etiquetas_valores=_top(G, kpi['humedad_final'], ordenar=False),
+            ylabel='Humedad final [mm]', titulo='Humedad final en las 10 primeras zonas al terminar el año')),
+        ('agua_total_por_grupo.png', 'barras', dict(
+            ejes_grupo, etiquetas_valores=(list(kpi['agua_grupo']), list(kpi['agua_grupo'].values())),
+            ylabel='Agua total aplicada [m³]', titulo='Consumo anual de agua por grupo de zonas')),
+        ('deficit_por_grupo.png', 'barras', dict(
+            ejes_grupo, etiquetas_valores=(list(kpi['deficit_grupo']), list(kpi['deficit_grupo'].values())),
+            ylabel='Total días con déficit de humedad', titulo='Días con déficit de humedad por grupo de zonas')),
+        ('lavados_total.png', 'barras', dict(
+            etiquetas_valores=(['Lavado'], [float(kpi['lavados_zona'].sum())]),
+            xlabel='Grupo de zonas de lavado', ylabel='Cantidad de lavados en el año',
+            titulo='Cantidad total de lavados', figsize=(4, 4))),
+        ('agua_promedio_diaria.png', 'linea', dict(
+            x=np.arange(1, len(D) + 1), y=kpi['agua_dia'], xlabel='Día del año',
+            ylabel='Agua total aplicada [m³]', titulo='Agua total aplicada por día (todas las zonas)',
+            figsize=(8, 4))),
+        ('boxplot_agua_por_grupo.png', 'caja', dict(
+            grupo=list(kpi['grupo']), valor=kpi['agua_zona'], xlabel='Grupo de zonas de riego',
+            ylabel='Agua total aplicada [m³]', titulo='Distribución de agua aplicada por grupo',
+            figsize=(6, 4))),
+        ('vol_diario_por_fuente.png', 'area', dict(
+            x=np.asarray(vol.index), series={c: vol[c].to_numpy() for c in vol.columns},
+            colores={"potable": "steelblue", "pozo": "seagreen", "lavado": "darkorange"},
+            xlabel="Día del año (1–365)", ylabel="Volumen [m³]",
+            titulo="Volumen diario por tipo de agua – Las Condes", figsize=(10, 4))),
+        ('mapa_agua_zona_dia.png', 'calor', dict(
+            matriz=_reducir_filas(kpi['I'].sum(axis=2)), xlabel='Día del año', ylabel='Zona de riego (posición en G)',
+            etiqueta='Agua aplicada [m³]', titulo='Agua aplicada por zona y día', figsize=(10, 5))),
+    ]
+    return tareas
+
+
+def dibujar(tarea, directorio="."):
+    """Dibuja una tarea con el backend Agg y devuelve la ruta del PNG."""
+    import matplotlib #type: ignore
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt #type: ignore
+
+    archivo, tipo, d = tarea
+    fig, ax = plt.subplots(figsize=d.get('figsize', (8, 4)))
+    if tipo == 'barras':
+        etiquetas, valores = d['etiquetas_valores']
+        ax.bar(etiquetas, valores)
+    elif tipo == 'linea':
+        ax.plot(d['x'], d['y'])
+    elif tipo == 'area':
+        nombres = list(d['series'])
+        ax.stackplot(d['x'], *[d['series'][n] for n in nombres], labels=nombres,
+                     colors=[d['colores'].get(n) for n in nombres], step='mid')
+        if len(d['x']):
+            ax.set_xlim(d['x'][0], d['x'][-1])
+        ax.legend(title="Fuente", ncol=3, loc="upper right", fontsize=8)
+    elif tipo == 'caja':
+        import seaborn as sns #type: ignore
+        sns.boxplot(x=d['grupo'], y=d['valor'], ax=ax)
+    elif tipo == 'calor':
+        im = ax.imshow(d['matriz'], aspect='auto', interpolation='nearest', cmap='viridis',
+                       extent=(0.5, d['matriz'].shape[1] + 0.5, d['matriz'].shape[0] - 0.5, -0.5))
+        fig.colorbar(im, ax=ax, label=d['etiqueta'])
+        ax.yaxis.get_major_locator().set_params(integer=True)
+    else:
+        raise ValueError(f"tipo de grafico desconocido: {tipo!r}")
+    ax.set_xlabel(d['xlabel'])
+    ax.set_ylabel(d['ylabel'])
+    ax.set_title(d['titulo'])
+    fig.tight_layout()
+    ruta = os.path.join(directorio, archivo)
+    fig.savefig(ruta, dpi=150)
+    plt.close(fig)
+    return ruta
+
+
+def _dibujar(args):
+    return dibujar(*args)
+
+
+def generar_reportes(kpi, datos, directorio=".", procesos=None, esperar=True):
+    """
+    Dibuja todas las figuras en un pool de procesos.
+
+    procesos : tamaño del pool (None -> os.cpu_count(); 0 -> en este proceso)
+    esperar  : False devuelve de inmediato (pool, futuros); el llamador
+               sigue trabajando y luego llama a esperar_reportes
+               (con procesos=0 las figuras ya estan: (None, rutas))
+    return   : lista de rutas (esperar=True) o (pool, futuros)
+    """
+    os.makedirs(directorio, exist_ok=True)
+    tareas = tareas_reporte(kpi, datos)
+    if procesos == 0:
+        rutas = [dibujar(t, directorio) for t in tareas]
+        return rutas if esperar else (None, rutas)
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(tareas)))
+    pool = ProcessPoolExecutor(max_workers=procesos, mp_context=mp.get_context("spawn"))
+    futuros = [pool.submit(_dibujar, (t, directorio)) for t in tareas]
+    if not esperar:
+        return pool, futuros
+    return esperar_reportes((pool, futuros))
+
+
+def esperar_reportes(pendiente):
+    """Espera las figuras lanzadas con esperar=False y devuelve sus rutas."""
+    pool, futuros = pendiente
+    if pool is None:                    # procesos=0: ya son las rutas
+        return list(futuros)
+    wait(futuros)
+    pool.shutdown()
+    return [f.result() for f in futuros]
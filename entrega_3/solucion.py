@@ -0,0 +1,147 @@
+# -------------------------------------------------------------
+#  Solucion del modelo como arreglos densos
+#  Cada familia de variables queda como un ndarray sobre sus ejes
+#  originales (omega: G x D, y/vpot/I: G x D x H, vpozo: P x D x H, ...),
+#  independiente de la formulacion o del metodo que la produjo
+#  (modelo monolitico, horizonte rodante, ...).
+# -------------------------------------------------------------
+import gurobipy as gp #type: ignore
+import numpy as np #type: ignore
+import pandas as pd #type: ignore
+from modelo import FAMILIAS, _nombres
+
+# nombre de la variable en el modelo original (wwash se llamaba "w")
+NOMBRES = {"wwash": "w"}
+
+
+def ejes_familias(datos):
+    """Ejes etiquetados de cada familia en la formulacion original."""
+    G, P, L, D, H = datos['G'], datos['P'], datos['L'], datos['D'], datos['H']
+    return {
+        'omega': (G, D), 'y': (G, D, H), 'vpot': (G, D, H), 'vpozo': (P, D, H),
+        'I': (G, D, H), 'u': (G, D), 'ell': (L, D), 'wwash': (L, D),
+    }
+
+
+class _Valor:
+    __slots__ = ("X",)
+
+    def __init__(self, x):
+        self.X = x
+
+
+class _VistaValores:
+    """Acceso v[z, d, h].X sobre un arreglo, igual que con las variables."""
+    def __init__(self, arreglo, ejes):
+        self.arreglo = arreglo
+        self._pos = [{e: i for i, e in enumerate(eje)} for eje in ejes]
+
+    def __getitem__(self, clave):
+        if not isinstance(clave, tuple):
+            clave = (clave,)
+        return _Valor(float(self.arreglo[tuple(p[k] for p, k in zip(self._pos, clave))]))
+
+    def get(self, clave, defecto=None):
+        try:
+            return self[clave]
+        except KeyError:
+            return defecto
+
+
+class Solucion:
+    """
+    arreglos : dict familia -> ndarray
+    ejes     : dict familia -> tupla de listas de etiquetas
+    objetivo : valor objetivo de la solucion (si se conoce)
+    cota     : cota inferior asociada (si se conoce)
+    """
+    def __init__(self, arreglos, ejes, objetivo=None, cota=None):
+        self.arreglos = arreglos
+        self.ejes = ejes
+        self.objetivo = objetivo
+        self.cota = cota
+
+    @classmethod
+    def vacia(cls, datos, valor=0.0):
+        """Solucion con todas las familias en valor (np.nan = sin dato, p.ej. para un MIP start parcial)."""
+        ejes = ejes_familias(datos)
+        return cls({f: np.full([len(e) for e in ejes[f]], valor) for f in FAMILIAS}, ejes)
+
+    @classmethod
+    def desde_variables(cls, variables, datos, m=None, atributo="X"):
+        """
+        Lee los valores X de una vez por familia (MVar.X) y los ubica en los
+        ejes originales; las variables que no existen en la formulacion
+        quedan en cero. Con atributo="ScenNX" lee la solucion del escenario
+        m.Params.ScenarioNumber (escenarios.py).
+        """
+        ejes = ejes_familias(datos)
+        arreglos = {}
+        for f in FAMILIAS:
+            v = variables[f]
+            if isinstance(v, gp.tupledict):
+                # constructor por bucles: mismo orden que el producto de los ejes
+                vals = m.getAttr(atributo, list(v.values())) if len(v) else []
+                arreglos[f] = np.array(vals, dtype=float).reshape([len(e) for e in ejes[f]])
+            else:
+                arreglos[f] = v.denso(ejes[f], atributo)
+        objetivo = cota = None
+        if atributo == "ScenNX":
+            objetivo, cota = m.ScenNObjVal, m.ScenNObjBound
+        elif m is not None and m.SolCount:
+            objetivo = m.ObjVal
+            # con varios objetivos (multiobjetivo.py) no hay una cota unica
+            cota = m.ObjBound if m.IsMIP and m.NumObj <= 1 else None
+        return cls(arreglos, ejes, objetivo, cota)
+
+    def insertar(self, parte):
+        """
+        Copia en esta solucion los valores de otra definida sobre un
+        subconjunto de los ejes (p.ej. una zona o un tramo de dias).
+        """
+        for f in FAMILIAS:
+            valores = parte.arreglos[f]
+            if not valores.size:
+                continue
+            pos = []
+            for eje, sub in zip(self.ejes[f], parte.ejes[f]):
+                indice = {e: i for i, e in enumerate(eje)}
+                pos.append([indice[e] for e in sub])
+            self.arreglos[f][np.ix_(*pos)] = valores
+        return self
+
+    def vistas(self):
+        """dict familia -> vista con acceso v[clave].X (para el codigo de reportes)."""
+        return {f: _VistaValores(self.arreglos[f], self.ejes[f]) for f in FAMILIAS}
+
+    def tabla_variables(self):
+        """Todas las variables como DataFrame (var, value), con nombres como addVars."""
+        partes = []
+        for f in FAMILIAS:
+            ejes, valores = self.ejes[f], self.arreglos[f]
+            if not valores.size:
+                continue
+            nombres = _nombres(NOMBRES.get(f, f), ejes).ravel()
+            partes.append(pd.DataFrame({"var": nombres, "value": valores.ravel()}))
+        return pd.concat(partes, ignore_index=True)
+
+
+def evaluar_objetivo(sol, datos):
+    """
+    Funcion objetivo del modelo original evaluada sobre una solucion
+    (sirve para soluciones armadas fuera de Gurobi: horizonte rodante,
+    heuristicas, ...). Respeta el peso por zona de la agregacion.
+    """
+    pars = datos['pars']
+    peso = np.array([datos.get('peso', {}).get(z, 1) for z in datos['G']], dtype=float)
+    a = sol.arreglos
+    obj = 0.0
+    if pars['alpha'] is not None:
+        obj += pars['alpha'] * float(peso @ a['u'].sum(axis=1))
+    if pars['beta'] is not None:
+        obj += pars['beta'] * float(peso @ a['I'].sum(axis=(1, 2)))
+    if pars['gamma'] is not None:
+        obj += pars['gamma'] * float(peso @ a['y'].sum(axis=(1, 2)))
+    if pars['delta'] is not None:
+        obj += pars['delta'] * float(a['ell'].sum())
+    return obj
@@ -0,0 +1,186 @@
+# -------------------------------------------------------------
+#  Telemetria de la resolucion con callbacks de Gurobi
+#  - serie     : (tiempo, trabajo, incumbente, cota, gap, nodos) en cada
+#                callback MIP, como mucho una fila cada `intervalo`
+#                segundos salvo que cambie el incumbente o la cota;
+#                se guarda al final como telemetria.npz (columnas float64)
+#  - incumbentes : cada solucion nueva se informa apenas aparece, con
+#                  sus indicadores clave (agua total en m3, dias-zona con
+#                  deficit), en consola y en telemetria_incumbentes.jsonl
+#  - rendimiento : cuando aparecio la ultima mejora y que gap habia a
+#                  distintas fracciones del tiempo, para ajustar TimeLimit
+#  Los indicadores respetan el peso por zona de la agregacion.
+#  Con el constructor "bucles" (tupledicts) solo se registra la serie.
+# -------------------------------------------------------------
+import json
+import sys
+
+import numpy as np #type: ignore
+from gurobipy import GRB #type: ignore
+
+from modelo import tensores, Vista, VistaUnion, VistaHoraria
+from indicadores import TOL_DEFICIT
+
+COLUMNAS = ("tiempo_s", "trabajo", "incumbente", "cota", "gap", "nodos")
+
+
+def _vistas(vista):
+    """Vistas simples (un MVar cada una) dentro de una vista compuesta."""
+    if isinstance(vista, VistaUnion):
+        return [s for v in vista.vistas for s in _vistas(v)]
+    if isinstance(vista, VistaHoraria):
+        return _vistas(vista.diaria)
+    return [vista] if isinstance(vista, Vista) and vista.mvar.size else []
+
+
+def _gap(incumbente, cota):
+    if abs(incumbente) >= GRB.INFINITY or abs(cota) >= GRB.INFINITY:
+        return np.inf
+    return abs(incumbente - cota) / max(abs(incumbente), 1e-10)
+
+
+def combinar(*callbacks):
+    """Un solo callback que llama a todos los dados (los None se ignoran)."""
+    activos = [cb for cb in callbacks if cb is not None]
+    if not activos:
+        return None
+
+    def cb(model, where):
+        for c in activos:
+            c(model, where)
+    return cb
+
+
+class Telemetria:
+    """
+    v, datos  : vistas y datos del modelo (para los indicadores de cada incumbente)
+    intervalo : segundos minimos entre filas de la serie sin cambios
+    ruta_incumbentes : jsonl donde se va escribiendo cada incumbente (None = no);
+                       se abre con el primer incumbente y se cierra con
+                       cerrar() / guardar() o al salir del bloque with
+    """
+    def __init__(self, v=None, datos=None, intervalo=1.0, ruta_incumbentes="telemetria_incumbentes.jsonl",
+                 verbose=True):
+        self.intervalo = intervalo
+        self.verbose = verbose
+        self.serie = []
+        self.incumbentes = []
+        self._ultimo = (None, None, -np.inf)      # incumbente, cota, tiempo de la ultima fila
+        self.ruta_incumbentes = ruta_incumbentes
+        self._fh = None
+        self._kpi = None
+        if v is not None and datos is not None and isinstance(v['omega'], Vista) and v['omega'].mvar.size:
+            t = tensores(datos)
+            peso = dict(zip(datos['G'], t['peso']))
+            self._kpi = dict(
+                agua=[(s.mvar, np.array([peso[z] for z in s.ejes[0]], dtype=float)) for s in _vistas(v['I'])],
+                lavado=[(s.mvar, None) for s in _vistas(v['ell'])],
+                omega=v['omega'].mvar,
+                omega_min=t['omega_min'], peso=t['peso'],
+            )
+
+    def indicadores(self, model):
+        """Indicadores clave de la solucion del callback MIPSOL."""
+        k = self._kpi
+        agua = sum(float(pesos @ np.asarray(model.cbGetSolution(mv)).reshape(len(pesos), -1).sum(axis=1))
+                   for mv, pesos in k['agua'])
+        lavado = sum(float(np.asarray(model.cbGetSolution(mv)).sum()) for mv, _ in k['lavado'])
+        omega = np.asarray(model.cbGetSolution(k['omega']))
+        dias_deficit = float(k['peso'] @ (omega <= k['omega_min'][:, None] + TOL_DEFICIT).sum(axis=1))
+        return dict(agua_riego_m3=agua, lavado_m3=lavado, agua_total_m3=agua + lavado,
+                    dias_deficit=dias_deficit)
+
+    def callback(self):
+        def cb(model, where):
+            if where == GRB.Callback.MIP:
+                t = model.cbGet(GRB.Callback.RUNTIME)
+                inc = model.cbGet(GRB.Callback.MIP_OBJBST)
+                cota = model.cbGet(GRB.Callback.MIP_OBJBND)
+                inc_previo, cota_previa, t_previo = self._ultimo
+                if inc != inc_previo or cota != cota_previa or t - t_previo >= self.intervalo:
+                    self.serie.append((t, model.cbGet(GRB.Callback.WORK), inc, cota, _gap(inc, cota),
+                                       model.cbGet(GRB.Callback.MIP_NODCNT)))
+                    self._ultimo = (inc, cota, t)
+            elif where == GRB.Callback.MIPSOL:
+                fila = dict(tiempo_s=model.cbGet(GRB.Callback.RUNTIME),
+                            objetivo=model.cbGet(GRB.Callback.MIPSOL_OBJ),
+                            cota=model.cbGet(GRB.Callback.MIPSOL_OBJBND),
+                            nodos=model.cbGet(GRB.Callback.MIPSOL_NODCNT))
+                fila['gap'] = _gap(fila['objetivo'], fila['cota'])
+                if self._kpi is not None:
+                    fila.update(self.indicadores(model))
+                self.incumbentes.append(fila)
+                if self.ruta_incumbentes:
+                    if self._fh is None:
+                        self._fh = open(self.ruta_incumbentes, "w", encoding="utf-8")
+                    self._fh.write(json.dumps(fila) + "\n")
+                    self._fh.flush()
+                if self.verbose:
+                    extra = (f"  agua {fila['agua_total_m3']:,.0f} m³  deficit {fila['dias_deficit']:,.0f} dias-zona"
+                             if self._kpi is not None else "")
+                    print(f"[telemetria] {fila['tiempo_s']:8.1f} s  incumbente {fila['objetivo']:,.2f}  "
+                          f"gap {fila['gap']:.2%}{extra}", flush=True)
+        return cb
+
+    def arreglo(self):
+        """Serie como arreglo (filas x COLUMNAS)."""
+        return np.array(self.serie, dtype=float).reshape(-1, len(COLUMNAS))
+
+    def guardar(self, ruta="telemetria.npz"):
+        """Escribe la serie (una columna por nombre de COLUMNAS) y cierra el jsonl."""
+        serie = self.arreglo()
+        np.savez_compressed(ruta, **{c: serie[:, j] for j, c in enumerate(COLUMNAS)})
+        self.cerrar()
+        return ruta
+
+    def cerrar(self):
+        """Cierra el jsonl de incumbentes (si se llego a abrir)."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+    def rendimiento(self, time_limit=None, verbose=True):
+        """
+        Cuanto aporto el tiempo: momento de la ultima mejora del incumbente
+        y gap alcanzado al 10/25/50/75/100 % del tiempo de resolucion.
+        """
+        serie = self.arreglo()
+        if not len(serie) or not self.incumbentes:
+            return {}
+        total = float(serie[-1, 0])
+        ultima = self.incumbentes[-1]['tiempo_s']
+        gaps = {}
+        for frac in (0.10, 0.25, 0.50, 0.75, 1.0):
+            hasta = serie[serie[:, 0] <= frac * total + 1e-9]
+            gaps[f"gap_{int(frac * 100)}pct"] = float(hasta[-1, 4]) if len(hasta) else np.inf
+        res = dict(tiempo_total_s=total, ultima_mejora_s=ultima,
+                   ultima_mejora_frac=ultima / time_limit if time_limit else ultima / max(total, 1e-9),
+                   n_incumbentes=len(self.incumbentes), **gaps)
+        if verbose:
+            base = "del TimeLimit" if time_limit else "del tiempo de resolucion"
+            print(f"\n----- Telemetria -----\n{len(self.incumbentes)} incumbentes; ultima mejora a los "
+                  f"{ultima:.1f} s ({res['ultima_mejora_frac']:.0%} {base})")
+            print("gap a 10/25/50/75/100 % del tiempo: "
+                  + "  ".join(f"{g:.2%}" for g in gaps.values()))
+        return res
+
+
+def leer_telemetria(ruta="telemetria.npz"):
+    """Serie guardada como dict columna -> arreglo."""
+    with np.load(ruta) as npz:
+        return {c: npz[c] for c in npz.files}
+
+
+if __name__ == "__main__":
+    # Resumen de una corrida anterior: python telemetria.py [telemetria.npz]
+    serie = leer_telemetria(sys.argv[1] if len(sys.argv) > 1 else "telemetria.npz")
+    n = len(serie['tiempo_s'])
+    for j in np.unique(np.linspace(0, n - 1, 10).astype(int)) if n else []:
+        print("  ".join(f"{c} {serie[c][j]:,.4g}" for c in COLUMNAS))